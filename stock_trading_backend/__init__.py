@@ -6,3 +6,18 @@ register(
     id='stock-market-v0',
     entry_point='stock_trading_backend.simulation:StockMarketSimulation'
 )
+
+register(
+    id='stock-market-vector-v0',
+    entry_point='stock_trading_backend.simulation:VectorStockMarketSimulation'
+)
+
+register(
+    id='stock-market-subprocess-v0',
+    entry_point='stock_trading_backend.simulation:SubprocessVectorStockMarketSimulation'
+)
+
+register(
+    id='stock-market-multi-portfolio-v0',
+    entry_point='stock_trading_backend.simulation:MultiPortfolioSimulation'
+)
@@ -1,5 +1,8 @@
 """__init__ file for agent sub-package
 """
+from stock_trading_backend.agent.action_search import ActionSearch, BeamActionSearch
+from stock_trading_backend.agent.action_search import ExhaustiveActionSearch, GreedyActionSearch
+from stock_trading_backend.agent.action_search_factory import create_action_search
 from stock_trading_backend.agent.agent import Agent
 from stock_trading_backend.agent.agent_factory import create_agent
 from stock_trading_backend.agent.following_feature_agent import FollowingFeatureAgent
@@ -0,0 +1,235 @@
+"""Classes for searching the best action with a model.
+"""
+from abc import ABCMeta, abstractmethod
+
+import numpy as np
+
+HOLD = 1
+
+
+class ActionSearch(metaclass=ABCMeta):
+    """Base class for action search.
+
+    Action search decides which legal actions are scored with model.predict. It returns the
+    scored actions with their values, and the agent picks one of them.
+    """
+    name = None
+
+    def __init__(self):
+        """Initializer for action search class.
+        """
+        self.id_str = self.name
+
+    @abstractmethod
+    def search(self, model, observation, env):
+        """Scores candidate actions for the observation.
+
+        Args:
+            model: the model used to score the actions (see Model.predict).
+            observation: current state of the environment.
+            env: the gym environment (provides legal_actions, owned_stocks and max_stock_owned).
+
+        Returns:
+            actions: (num_candidates, num_stocks) array with the scored actions.
+            values: (num_candidates,) array with the predicted values.
+        """
+        raise NotImplementedError()
+
+    @staticmethod
+    def _predict(model, observation, actions):
+        """Scores the actions with the model.
+
+        Args:
+            model: the model used to score the actions.
+            observation: current state of the environment.
+            actions: (num_actions, num_stocks) array with the actions.
+
+        Returns:
+            (num_actions,) array with the predicted values.
+        """
+        return np.asarray(model.predict(observation, actions), dtype=np.float64).reshape(-1)
+
+
+class ExhaustiveActionSearch(ActionSearch):
+    """Scores all of the legal actions.
+    """
+    name = "exhaustive"
+
+    def search(self, model, observation, env):
+        """Scores all of the legal actions for the observation.
+
+        Args:
+            model: the model used to score the actions (see Model.predict).
+            observation: current state of the environment.
+            env: the gym environment.
+
+        Returns:
+            actions: (num_candidates, num_stocks) array with the scored actions.
+            values: (num_candidates,) array with the predicted values.
+        """
+        actions = env.legal_actions()
+        return actions, self._predict(model, observation, actions)
+
+
+# pylint: disable=abstract-method
+class SubActionSearch(ActionSearch):
+    """Abstract base class for searches that build an action by changing one stock at a time.
+
+    Subclasses implement search. Starts from holding every stock. An owned stock can be sold (0) or held (1), a stock that
+    is not owned can be bought (2) or held (1), while the number of purchases is limited by
+    max_stock_owned. When there are no free slots, a stock can be bought instead of one of the
+    stocks that are bought by the action.
+    """
+    @staticmethod
+    def _expand(action, index, owned, num_free_slots):
+        """Returns the legal changes of the action for the ith stock.
+
+        Args:
+            action: the current action.
+            index: the index of the stock.
+            owned: boolean mask of the owned stocks.
+            num_free_slots: the number of stocks that can be bought.
+
+        Returns:
+            A list with the changed actions.
+        """
+        if action[index] != HOLD:
+            return []
+        changed_action = action.copy()
+        if owned[index]:
+            changed_action[index] = 0
+            return [changed_action]
+
+        changed_action[index] = 2
+        purchases = np.flatnonzero(action == 2)
+        if len(purchases) < num_free_slots:
+            return [changed_action]
+        changed_actions = []
+        for purchase_index in purchases:
+            swapped_action = changed_action.copy()
+            swapped_action[purchase_index] = HOLD
+            changed_actions.append(swapped_action)
+        return changed_actions
+
+    @staticmethod
+    def _ownership(env):
+        """Returns owned stocks mask and the number of stocks that can be bought.
+
+        Args:
+            env: the gym environment.
+        """
+        owned = np.asarray(env.owned_stocks) > 0
+        return owned, env.max_stock_owned - np.count_nonzero(owned)
+
+
+class GreedyActionSearch(SubActionSearch):
+    """Greedy coordinate ascent over the sub-actions of every stock.
+
+    Goes over the stocks num_passes times, and changes the sub-action of a stock if it increases
+    the predicted value. Scores at most num_passes * num_stocks * max_stock_owned + 1 actions.
+    """
+    name = "greedy"
+
+    def __init__(self, num_passes=1):
+        """Initializer for greedy action search class.
+
+        Args:
+            num_passes: the number of passes over the stocks.
+        """
+        super(GreedyActionSearch, self).__init__()
+        self.num_passes = num_passes
+        self.id_str = "{}_{}".format(self.name, num_passes)
+
+    def search(self, model, observation, env):
+        """Greedily builds the action for the observation.
+
+        Args:
+            model: the model used to score the actions (see Model.predict).
+            observation: current state of the environment.
+            env: the gym environment.
+
+        Returns:
+            actions: (num_candidates, num_stocks) array with the scored actions.
+            values: (num_candidates,) array with the predicted values.
+        """
+        owned, num_free_slots = self._ownership(env)
+        action = np.full(len(owned), HOLD, dtype=np.int8)
+        value = self._predict(model, observation, [action])[0]
+        actions = [action]
+        values = [value]
+        for _ in range(self.num_passes):
+            changed = False
+            for index in range(len(owned)):
+                # Changed sub-actions can be reverted to hold in the next passes.
+                if action[index] != HOLD:
+                    candidate = action.copy()
+                    candidate[index] = HOLD
+                    candidates = [candidate]
+                else:
+                    candidates = self._expand(action, index, owned, num_free_slots)
+                if not candidates:
+                    continue
+                candidate_values = self._predict(model, observation, candidates)
+                actions.extend(candidates)
+                values.extend(candidate_values)
+                best_index = np.argmax(candidate_values)
+                if candidate_values[best_index] > value:
+                    action, value = candidates[best_index], candidate_values[best_index]
+                    changed = True
+            if not changed:
+                break
+        return np.array(actions), np.array(values)
+
+
+class BeamActionSearch(SubActionSearch):
+    """Beam search over the sub-actions of every stock.
+
+    Decides the sub-actions stock by stock, keeping beam_width best actions after each stock.
+    Scores at most beam_width * num_stocks * max_stock_owned + 1 actions.
+    """
+    name = "beam"
+
+    def __init__(self, beam_width=4):
+        """Initializer for beam action search class.
+
+        Args:
+            beam_width: the number of actions kept after each stock.
+        """
+        super(BeamActionSearch, self).__init__()
+        if beam_width < 1:
+            raise ValueError("Expected positive beam width, got {}".format(beam_width))
+        self.beam_width = beam_width
+        self.id_str = "{}_{}".format(self.name, beam_width)
+
+    def search(self, model, observation, env):
+        """Builds the action for the observation with beam search.
+
+        Args:
+            model: the model used to score the actions (see Model.predict).
+            observation: current state of the environment.
+            env: the gym environment.
+
+        Returns:
+            actions: (num_candidates, num_stocks) array with the scored actions.
+            values: (num_candidates,) array with the predicted values.
+        """
+        owned, num_free_slots = self._ownership(env)
+        action = np.full(len(owned), HOLD, dtype=np.int8)
+        actions = [action]
+        values = [self._predict(model, observation, [action])[0]]
+        beam = [0]
+        for index in range(len(owned)):
+            candidates = []
+            for beam_index in beam:
+                candidates += self._expand(actions[beam_index], index, owned, num_free_slots)
+            if not candidates:
+                continue
+            # Swaps in different actions of the beam can give the same action, it is scored once.
+            candidates = list({candidate.tobytes(): candidate
+                               for candidate in candidates}.values())
+            # Holding the stock keeps the actions in the beam, so they compete with the changes.
+            beam += list(range(len(actions), len(actions) + len(candidates)))
+            actions.extend(candidates)
+            values.extend(self._predict(model, observation, candidates))
+            beam = sorted(beam, key=lambda i: values[i], reverse=True)[:self.beam_width]
+        return np.array(actions), np.array(values)
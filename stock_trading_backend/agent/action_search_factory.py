@@ -0,0 +1,31 @@
+"""Factory function for action search.
+"""
+from copy import deepcopy
+
+from stock_trading_backend.agent.action_search import BeamActionSearch
+from stock_trading_backend.agent.action_search import ExhaustiveActionSearch
+from stock_trading_backend.agent.action_search import GreedyActionSearch
+
+ACTION_SEARCH_CLASSES = [
+    BeamActionSearch,
+    ExhaustiveActionSearch,
+    GreedyActionSearch,
+]
+ACTION_SEARCH_NAME_MAPPING = {action_search.name:action_search
+                              for action_search in ACTION_SEARCH_CLASSES}
+
+def create_action_search(action_search_config=None):
+    """Factory for action search objects.
+
+    Args:
+        action_search_config: config for action search (exhaustive search if None).
+    """
+    if action_search_config is None:
+        return ExhaustiveActionSearch()
+    if action_search_config["name"] not in ACTION_SEARCH_NAME_MAPPING:
+        raise LookupError("Action search of type {} is not found.".format(
+            action_search_config["name"]))
+    action_search_config = deepcopy(action_search_config)
+    action_search_name = action_search_config["name"]
+    del action_search_config["name"]
+    return ACTION_SEARCH_NAME_MAPPING[action_search_name](**action_search_config)
@@ -5,6 +5,8 @@ import random
 import numpy as np
 import pandas as pd
 
+from stock_trading_backend.agent.action_search import ExhaustiveActionSearch
+from stock_trading_backend.agent.action_search_factory import create_action_search
 from stock_trading_backend.agent.agent import Agent
 from stock_trading_backend.agent.model_factory import create_model
 
@@ -17,7 +19,7 @@ class SARSALearningAgent(Agent):
 
     def __init__(self, data_collection_config, reward_config=None, model_config=None,
                  discount_factor=0.1, epsilon=0.1, learning_rate=0.1, num_epochs=5,
-                 initial_num_epochs=50):
+                 initial_num_epochs=50, action_search_config=None):
         """Initializer for FollowingFeatureAgent class.
 
         Args:
@@ -29,18 +31,24 @@ class SARSALearningAgent(Agent):
             learning_rate: learning rate of the agent.
             num_epochs: number of epochs to run for each apply_learning.
             initial_num_epochs: number of epochs to run on the first apply_learning.
+            action_search_config: configuration for the search of the best action (scores all
+                                  legal actions if None).
         """
         super(SARSALearningAgent, self).__init__(data_collection_config, reward_config,
                                                  model_config)
         if model_config is None:
             raise ValueError("Learning agents require model.")
         self.model = create_model(model_config)
+        self.action_search = create_action_search(action_search_config)
         self.discount_factor = discount_factor
         self.epsilon = epsilon
         self.learning_rate = learning_rate
         self.num_epochs = num_epochs
         self.initial_num_epochs = initial_num_epochs
         self.id_str = "{}_{}".format(self.name, discount_factor)
+        # Agents with the default exhaustive search keep the ids they had before action search.
+        if not isinstance(self.action_search, ExhaustiveActionSearch):
+            self.id_str = "{}_{}".format(self.id_str, self.action_search.id_str)
         self._add_id_with_hash_values()
 
     # pylint: disable=unused-argument
@@ -56,8 +64,8 @@ class SARSALearningAgent(Agent):
         Returns:
             action: the action that agent decided to take.
         """
-        possible_actions = list(env.action_space_generator())
-        state_action_values = self.model.predict(observation, possible_actions)
+        possible_actions, state_action_values = self.action_search.search(self.model, observation,
+                                                                          env)
         if training and random.random() < self.epsilon: # pragma: no cover
             index = random.randrange(0, len(possible_actions))
         else:
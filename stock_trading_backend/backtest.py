@@ -41,20 +41,20 @@ def backtest_agent(agent, from_date=None, to_date=None, start_balance=1000, comm
                                        max_start_balance=start_balance, commission=commission,
                                        max_stock_owned=max_stock_owned,
                                        reward_config=agent.reward_config)
+    # Rewards are calculated with calculate_batch after the episode, not on every step.
+    simulation.online_rewards = False
 
     net_worth_history = []
     balance_history = []
     owned_stocks_history = []
     stock_price_history = []
-    reward_history = []
     observation = simulation.reset()
     _, kwargs = agent.make_decision(observation, simulation, False)
     output = {key:[] for key in kwargs}
 
     def record_history():
         balance, net_worth, owned_stocks, _ = agent.unpack_observation(observation)
-        curr_date = simulation.available_dates[simulation.curr_date_index]
-        stock_prices = simulation.stock_data[curr_date].to_numpy()
+        stock_prices = simulation.data_collection.prices(simulation.curr_date_index).copy()
 
         # pylint: disable=no-member
         net_worth_history.append(net_worth)
@@ -71,8 +71,7 @@ def backtest_agent(agent, from_date=None, to_date=None, start_balance=1000, comm
         action, kwargs = agent.make_decision(observation, simulation)
         for key in kwargs:
             output[key].append(kwargs[key])
-        observation, reward, _ = simulation.step(action)
-        reward_history.append(reward)
+        observation, _, _ = simulation.step(action)
 
     record_history()
     net_worth_history = np.array(net_worth_history)
@@ -81,8 +80,13 @@ def backtest_agent(agent, from_date=None, to_date=None, start_balance=1000, comm
     stock_price_history = np.array(stock_price_history)
     action_history = owned_stocks_history[1:] - owned_stocks_history[:-1]
 
-    output["overall_reward"] = simulation.overall_reward
-    output["reward_history"] = reward_history
+    # Rewards for the whole net worth history are calculated at once.
+    dates = simulation.available_dates[simulation.from_date_index:simulation.curr_date_index + 1]
+    reward_history, overall_reward = simulation.reward_function.calculate_batch(
+        net_worth_history, dates)
+
+    output["overall_reward"] = overall_reward
+    output["reward_history"] = reward_history.tolist()
     output["stock_names"] = simulation.stock_names
     output["net_worth_history"] = net_worth_history
     output["balance_history"] = balance_history
@@ -2,6 +2,7 @@
 """
 from stock_trading_backend.data.comparator_analysis import ComparatorAnalysis
 from stock_trading_backend.data.data import DataType, Data
+from stock_trading_backend.data.data_cache import DataCache
 from stock_trading_backend.data.data_collection import DataCollection
 from stock_trading_backend.data.data_factory import create_data, create_data_collection
 from stock_trading_backend.data.generated_stock_data import GeneratedStockData
@@ -9,3 +10,5 @@ from stock_trading_backend.data.randomized_stock_data import RandomizedStockData
 from stock_trading_backend.data.real_stock_data import RealStockData
 from stock_trading_backend.data.running_average_analysis import RunningAverageAnalysis
 from stock_trading_backend.data.relative_stock_data import RelativeStockData
+from stock_trading_backend.data.resampled_stock_data import ResampledStockData
+from stock_trading_backend.data.technical_indicator_bank import TechnicalIndicatorBank
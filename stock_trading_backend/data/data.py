@@ -1,10 +1,20 @@
 """Base class for storing data.
 """
 from abc import ABCMeta
+from datetime import datetime
 from enum import Enum, auto
+from threading import Lock
 
 import pandas as pd
 
+from stock_trading_backend.util import RollingWindowEngine
+
+# Attributes that are state of the data rather than parameters of the preparation.
+STATE_ATTRIBUTES = ("data", "ready", "buffer", "bar_length", "visible", "rolling_window_cache")
+
+# Data of a collection is prepared by a thread pool, so the engines are built under a lock.
+ROLLING_WINDOW_LOCK = Lock()
+
 
 class DataType(Enum):
     """Enumerator class for types of data.
@@ -16,11 +26,19 @@ class DataType(Enum):
 
 class Data(metaclass=ABCMeta):
     """Base class for storing data.
+
+    Data with requires_reset set to True (e.g. randomized data) changes on every reset, so it and
+    the data depending on it is prepared again after reset. Other data is prepared only once.
+
+    Data with cacheable set to True is stored in the data cache of the data collection (if it is
+    set up), keyed by get_parameters, the keys of the dependencies, stock names and date range.
     """
     name = None
     data_type = DataType.NONE
     is_stock_specific = False
     expected_num_dependencies = 0
+    requires_reset = False
+    cacheable = True
 
     def __init__(self, dependencies=None, visible=True):
         """Initializer for Data class
@@ -35,6 +53,8 @@ class Data(metaclass=ABCMeta):
         self.ready = False
         self.feature_template = "{}"
         self.buffer = 0
+        self.bar_length = 1
+        self.rolling_window_cache = None
         if dependencies:
             self.dependencies = dependencies
         else:
@@ -56,6 +76,42 @@ class Data(metaclass=ABCMeta):
             dependencies: a list of prepared data dependencies.
         """
 
+    def get_rolling_window_engine(self):
+        """Returns the rolling window engine for the prepared data.
+
+        The engine is shared by all of the data that depends on this data (e.g. running averages
+        with different windows), and is built again when the data changes. It is built once even
+        if the dependent data is prepared by multiple threads.
+
+        Returns:
+            RollingWindowEngine over the columns of self.data.
+        """
+        rolling_window_cache = self.rolling_window_cache
+        if rolling_window_cache is None or rolling_window_cache[0] is not self.data:
+            with ROLLING_WINDOW_LOCK:
+                rolling_window_cache = self.rolling_window_cache
+                if rolling_window_cache is None or rolling_window_cache[0] is not self.data:
+                    rolling_window_cache = (self.data, RollingWindowEngine(self.data.to_numpy()))
+                    self.rolling_window_cache = rolling_window_cache
+        return rolling_window_cache[1]
+
+    def get_parameters(self):
+        """Returns the parameters the prepared data depends on.
+
+        By default these are the attributes with plain values (numbers, strings, dates and lists
+        of them), other than the state of the data.
+
+        Returns:
+            Dict with the parameters.
+        """
+        def is_parameter(value):
+            if isinstance(value, (list, tuple)):
+                return all(is_parameter(item) for item in value)
+            return value is None or isinstance(value, (bool, int, float, str, datetime))
+
+        return {key: value for key, value in vars(self).items()
+                if key not in STATE_ATTRIBUTES and is_parameter(value)}
+
     def reset(self, dependencies):
         """Reset for data object.
 
@@ -68,6 +124,17 @@ class Data(metaclass=ABCMeta):
         self.ready = all(dependencies)
         return self.ready
 
+    def set_bar_length(self, dependency_bar_lengths):
+        """Sets the number of days per row of the data (1 for daily data).
+
+        Windows of the data are counted in rows, so buffers of windows are scaled by the bar
+        length. By default the data has the bar length of its dependencies.
+
+        Args:
+            dependency_bar_lengths: The list of bar lengths of the dependencies.
+        """
+        self.bar_length = max(dependency_bar_lengths, default=1)
+
     def buffer_days(self, dependencies):
         """Figures out the buffer for the data.
 
@@ -0,0 +1,121 @@
+"""Persistent cache of prepared data.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+# Part of every cache key, bump it when the way data is prepared changes, so the data cached
+# by the previous version is not used.
+CACHE_FORMAT_VERSION = 2
+
+
+class DataCache:
+    """Content-addressed cache of prepared data stored in .npz files.
+
+    The key of prepared data is a hash of its name and parameters, the keys of its dependencies,
+    the stock names and the date range, so processes preparing the same data share the cached
+    files. Files are written atomically, so concurrent processes can use the same cache path.
+    """
+    def __init__(self, path):
+        """Initializer for the data cache.
+
+        Args:
+            path: path of the directory with the cached data.
+        """
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    @staticmethod
+    def get_key(data, dependency_keys, stock_names, from_date, to_date):
+        """Returns the cache key for the data.
+
+        Args:
+            data: the data object.
+            dependency_keys: a list of cache keys for the dependencies.
+            stock_names: a list of stock names.
+            from_date: datetime start of the date range.
+            to_date: datetime end of the date range.
+
+        Returns:
+            Hex digest string.
+        """
+        description = {
+            "version": CACHE_FORMAT_VERSION,
+            "name": data.name,
+            "parameters": data.get_parameters(),
+            "dependencies": dependency_keys,
+            "stock_names": stock_names,
+            "date_range": [from_date, to_date],
+        }
+        string = json.dumps(description, sort_keys=True, default=str)
+        return hashlib.sha256(string.encode()).hexdigest()
+
+    @staticmethod
+    def get_content_key(data_frame):
+        """Returns the key for the content of a DataFrame, used for the data that isn't cached.
+
+        Args:
+            data_frame: the prepared DataFrame.
+
+        Returns:
+            Hex digest string.
+        """
+        digest = hashlib.sha256()
+        digest.update(pd.util.hash_pandas_object(data_frame, index=True).to_numpy().tobytes())
+        digest.update(json.dumps([str(column) for column in data_frame.columns]).encode())
+        return digest.hexdigest()
+
+    def _filename(self, key):
+        """Returns the path of the file for the key.
+
+        Args:
+            key: the cache key.
+        """
+        return os.path.join(self.path, "{}.npz".format(key))
+
+    def load(self, key):
+        """Loads the cached data.
+
+        Args:
+            key: the cache key.
+
+        Returns:
+            DataFrame with the data, or None if it isn't cached.
+        """
+        filename = self._filename(key)
+        if not os.path.isfile(filename):
+            return None
+        try:
+            with np.load(filename, allow_pickle=False) as arrays:
+                index = pd.DatetimeIndex(arrays["index"], name=arrays["index_name"].item() or None)
+                return pd.DataFrame(arrays["values"], index=index,
+                                    columns=arrays["columns"].tolist())
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            return None
+
+    def save(self, key, data_frame):
+        """Stores the data in the cache.
+
+        Args:
+            key: the cache key.
+            data_frame: the prepared DataFrame with a date index.
+        """
+        values = data_frame.to_numpy()
+        if values.dtype == object:
+            return
+        descriptor, temp_filename = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                np.savez(file, values=values,
+                         index=data_frame.index.to_numpy(dtype="datetime64[ns]"),
+                         index_name=np.array(data_frame.index.name or ""),
+                         columns=np.array([str(column) for column in data_frame.columns]))
+            os.replace(temp_filename, self._filename(key))
+        except BaseException:
+            os.remove(temp_filename)
+            raise
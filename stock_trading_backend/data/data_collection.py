@@ -1,17 +1,33 @@
 """A class containing multiple Data classes.
 """
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+import numpy as np
 import pandas as pd
 from stock_trading_backend.data.data import DataType
+from stock_trading_backend.data.data_cache import DataCache
 from stock_trading_backend.data.randomized_stock_data import RandomizedStockData
 from stock_trading_backend.data.relative_stock_data import RelativeStockData
+from stock_trading_backend.data.resampled_stock_data import ResampledStockData
 
 
 # pylint: disable=too-many-instance-attributes
 class DataCollection:
     """Class that contains multiple Data classes.
+
+    The data is prepared by levels of a topological execution plan: data in a level depends only
+    on data in the previous levels. With num_workers > 1 the data in a level is prepared on a
+    thread pool, so e.g. running averages of the same stock data are computed in parallel.
+
+    With cache_path set, prepared data is stored in a DataCache and loaded from it instead of
+    being prepared again, also by other processes. Data that changes on reset is not cached.
     """
+    # pylint: disable=too-many-arguments
     def __init__(self, data_objects, stock_names, stock_data_randomization=False,
-                 use_relative_stock_data=False, scaling_factor=1):
+                 use_relative_stock_data=False, scaling_factor=1, randomization_variants=0,
+                 randomization_bank_path=None, resample_frequency=None, num_workers=1,
+                 cache_path=None):
         """Initializer for DataCollection class.
 
         Args:
@@ -21,19 +37,51 @@ class DataCollection:
             use_relative_stock_data: whether to use relative price as stock data. This works as a
                                      pseudo-normalization for stock price data.
             scaling_factor: scaling factor for relative stock data
+            randomization_variants: the number of pre-generated variants of the randomized stock
+                                    data (0 for fresh noise on every reset).
+            randomization_bank_path: path of the file to memory-map randomization noise from.
+            resample_frequency: "weekly" or "monthly" to turn the stock data into coarser bars,
+                                the data depending on stock data is computed from the bars.
+            num_workers: the number of threads preparing independent data at once.
+            cache_path: path of the directory to cache prepared data in.
         """
+        if num_workers < 1:
+            raise ValueError("Expected at least 1 worker, got {}".format(num_workers))
+        self.num_workers = num_workers
         self.stock_names = stock_names
         self.data_objects = []
         self.visible_data_objects = []
         self.visible_df = None
         self.id_to_data = {}
 
+        # Dense representation of the visible data, one row per available date.
+        self.available_dates = []
+        self.date_to_row = {}
+        self.feature_names = []
+        self.feature_matrix = None
+        self.price_matrix = None
+
+        # Sliding window views of the feature matrix, keyed by the window length.
+        self.window_views = {}
+
+        # Layout of the matrices, used to update the data changed by reset in place.
+        self.column_slices = {}
+        self.source_indexes = {}
+
         if data_objects[0].data_type != DataType.STOCK_DATA:
             raise ValueError("Expected first data to be stock data.")
         self.absolute_stock_data_id = data_objects[0].id_str
 
+        if resample_frequency is not None:
+            resampling_layer = ResampledStockData(dependencies=[self.absolute_stock_data_id],
+                                                  frequency=resample_frequency)
+            self.absolute_stock_data_id = resampling_layer.id_str
+            data_objects.insert(0, resampling_layer)
+
         if stock_data_randomization and not isinstance(data_objects[0], RandomizedStockData):
-            randomization_layer = RandomizedStockData(dependencies=[self.absolute_stock_data_id])
+            randomization_layer = RandomizedStockData(dependencies=[self.absolute_stock_data_id],
+                                                      num_variants=randomization_variants,
+                                                      bank_path=randomization_bank_path)
             self.absolute_stock_data_id = randomization_layer.id_str
             data_objects.insert(0, randomization_layer)
 
@@ -51,6 +99,21 @@ class DataCollection:
         self.busy = {}
         self.done = {}
         self.recursive_counter = 0
+        self.counter_lock = Lock()
+
+        # Levels of the topological execution plan, built on the first use.
+        self.plan = None
+
+        # Persistent cache of the prepared data, and the cache keys of the prepared data.
+        self.data_cache = DataCache(cache_path) if cache_path is not None else None
+        self.cache_keys = {}
+
+        # Ids of data that changes on reset: data that requires reset and its dependents.
+        self.volatile_ids = None
+        self.volatile_sources = {}
+
+        # Data derived from the variants of the randomized data, keyed by id and variants.
+        self.variant_cache = {}
 
         for data in data_objects:
             self.append(data)
@@ -82,6 +145,8 @@ class DataCollection:
             self.id_to_data[data_object.id_str] = data_object
             self.busy[data_object.id_str] = False
             self.done[data_object.id_str] = False
+            self.volatile_ids = None
+            self.plan = None
 
             if data_object.visible and data_object not in self.visible_data_objects:
                 self.visible_data_objects.append(data_object)
@@ -94,6 +159,8 @@ class DataCollection:
             from_date: datetime start of the date range.
             to_date: datetime end of the date range.
         """
+        if (from_date, to_date) != (self.from_date, self.to_date):
+            self.variant_cache = {}
         self.from_date = from_date
         self.to_date = to_date
 
@@ -135,52 +202,301 @@ class DataCollection:
         self.done[data_id] = True
         return result(data)
 
+    def execution_plan(self):
+        """Returns the topological execution plan for the data.
+
+        Returns:
+            A list of levels, each level is a list of ids of data that depends only on data in the
+            previous levels.
+        """
+        if self.plan is None:
+            levels = {}
+
+            def result(data):
+                return levels[data.id_str]
+
+            def function(data, dependencies):
+                levels[data.id_str] = max(dependencies, default=-1) + 1
+
+            self._reset_done()
+            for data_id in self.id_to_data:
+                self._recursive_apply(data_id, function, result)
+            self.plan = [[] for _ in range(max(levels.values()) + 1)]
+            for data_id in self.id_to_data:
+                self.plan[levels[data_id]].append(data_id)
+        return self.plan
+
     def get_buffer(self):
         """Returns number of buffer days.
         """
         def result(data):
-            return data.buffer
+            return data
 
         def function(data, dependencies):
             self.recursive_counter += 1
-            data.buffer_days(dependencies)
+            data.set_bar_length([dependency.bar_length for dependency in dependencies])
+            data.buffer_days([dependency.buffer for dependency in dependencies])
 
         self._reset_done()
-        return max([self._recursive_apply(id_str, function, result) for id_str in self.id_to_data])
+        return max([self._recursive_apply(id_str, function, result).buffer
+                    for id_str in self.id_to_data])
 
     def prepare_data(self):
         """Prepares all the data in the collection.
-        """
-        def result(data):
-            return data
-
-        def function(data, dependencies):
-            if not data.ready:
-                self.recursive_counter += 1
-                data.prepare_data(self.from_date, self.to_date, self.stock_names, dependencies)
 
+        Only the data that is not ready is prepared. If the prepared data keeps its dates and
+        columns (e.g. randomized data after reset), its columns are updated in place, otherwise
+        the visible data is rebuilt.
+        """
         if self.from_date is None or self.to_date is None:
             raise ValueError("Date range is not set-up.")
 
-        self._reset_done()
-        for id_str in self.id_to_data:
-            self._recursive_apply(id_str, function, result)
+        self.get_volatile_ids()
+        plan = self.execution_plan()
+        self.recursive_counter = 0
+        prepared_ids = set()
+        executor = ThreadPoolExecutor(self.num_workers) if self.num_workers > 1 else None
+        try:
+            for level in plan:
+                level_ids = [data_id for data_id in level if not self.id_to_data[data_id].ready]
+                if executor is None or len(level_ids) < 2:
+                    for data_id in level_ids:
+                        self._prepare_single(data_id)
+                else:
+                    list(executor.map(self._prepare_single, level_ids))
+                prepared_ids.update(level_ids)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        if self.feature_matrix is None or not self._patch_matrices(prepared_ids):
+            self._update_matrices()
+
+    def _prepare_single(self, data_id):
+        """Prepares a single data object, its dependencies have to be ready.
+
+        Args:
+            data_id: the id of the data to prepare.
+        """
+        data = self.id_to_data[data_id]
+        variant_key = self._variant_key(data)
+        if variant_key in self.variant_cache:
+            data.data = self.variant_cache[variant_key]
+            data.ready = True
+            return
+
+        cache_key = self._cache_key(data)
+        if cache_key is not None:
+            cached_data = self.data_cache.load(cache_key)
+            if cached_data is not None:
+                data.data = cached_data
+                data.ready = True
+                self.cache_keys[data_id] = cache_key
+                return
+
+        with self.counter_lock:
+            self.recursive_counter += 1
+        dependencies = [self.id_to_data[dep_id] for dep_id in data.dependencies]
+        data.prepare_data(self.from_date, self.to_date, self.stock_names, dependencies)
+        if variant_key is not None:
+            self.variant_cache[variant_key] = data.data
 
-        self.visible_df = pd.concat([data_object.data for data_object in self.visible_data_objects],
-                                    axis=1, join="inner", copy=False)
+        if cache_key is not None:
+            self.data_cache.save(cache_key, data.data)
+        elif self.data_cache is not None and data_id not in self.volatile_ids:
+            cache_key = DataCache.get_content_key(data.data)
+        self.cache_keys[data_id] = cache_key
+
+    def _cache_key(self, data):
+        """Returns the data cache key for the data.
+
+        Args:
+            data: the data object, its dependencies have to be prepared.
+
+        Returns:
+            The cache key, or None if the data can't be cached.
+        """
+        if self.data_cache is None or not data.cacheable or data.id_str in self.volatile_ids:
+            return None
+        dependency_keys = [self.cache_keys.get(dep_id) for dep_id in data.dependencies]
+        if None in dependency_keys:
+            return None
+        return self.data_cache.get_key(data, dependency_keys, self.stock_names, self.from_date,
+                                       self.to_date)
+
+    def _update_matrices(self):
+        """Materializes visible data and stock prices as C-contiguous arrays.
+
+        Row i of the matrices corresponds to the ith available date. visible_df is a view of the
+        feature matrix.
+        """
+        # The inner join is indexed by the intersection of the visible data, the available dates.
+        visible_df = pd.concat([data_object.data for data_object in self.visible_data_objects],
+                               axis=1, join="inner", copy=False)
+        index = visible_df.index
+        self.available_dates = index.tolist()
+        self.date_to_row = {date: row for row, date in enumerate(self.available_dates)}
+        self.feature_names = visible_df.columns.tolist()
+        self.feature_matrix = np.ascontiguousarray(visible_df.to_numpy(dtype=np.float64))
+        self.visible_df = pd.DataFrame(self.feature_matrix, index=index,
+                                       columns=self.feature_names, copy=False)
+        self.window_views = {}
+        stock_data = self.id_to_data[self.absolute_stock_data_id].data.reindex(index)
+        self.price_matrix = np.ascontiguousarray(stock_data.to_numpy(dtype=np.float64))
+
+        # Saving the layout of the matrices.
+        self.column_slices = {}
+        self.source_indexes = {}
+        start = 0
+        for data_object in self.visible_data_objects:
+            end = start + len(data_object.data.columns)
+            self.column_slices[data_object.id_str] = slice(start, end)
+            self.source_indexes[data_object.id_str] = data_object.data.index
+            start = end
+        self.source_indexes[self.absolute_stock_data_id] = (
+            self.id_to_data[self.absolute_stock_data_id].data.index)
+
+    def _patch_matrices(self, data_ids):
+        """Updates the matrices in place with the data that was prepared again.
+
+        Args:
+            data_ids: ids of the prepared data.
+
+        Returns:
+            False if the dates or columns of the data changed and the matrices need to be rebuilt.
+        """
+        changed_ids = [data_id for data_id in data_ids if data_id in self.source_indexes]
+        for data_id in changed_ids:
+            data = self.id_to_data[data_id].data
+            if not data.index.equals(self.source_indexes[data_id]):
+                return False
+            column_slice = self.column_slices.get(data_id, slice(0, len(data.columns)))
+            if len(data.columns) != column_slice.stop - column_slice.start:
+                return False
+
+        index = self.visible_df.index
+        for data_id in changed_ids:
+            data = self.id_to_data[data_id].data
+            if not data.index.equals(index):
+                data = data.reindex(index)
+            if data_id in self.column_slices:
+                self.feature_matrix[:, self.column_slices[data_id]] = data.to_numpy(np.float64)
+            if data_id == self.absolute_stock_data_id:
+                self.price_matrix[:] = data.to_numpy(np.float64)
+        return True
+
+    def row(self, index):
+        """Get the visible data for the ith available date.
+
+        Args:
+            index: the integer position of the date in the available dates.
+
+        Returns:
+            Array with the visible data (view into the feature matrix).
+        """
+        return self.feature_matrix[index]
+
+    def rows(self, index_slice):
+        """Get the visible data for a range of available dates.
+
+        Args:
+            index_slice: a slice of integer positions in the available dates.
+
+        Returns:
+            2-D array with the visible data (view into the feature matrix).
+        """
+        return self.feature_matrix[index_slice]
+
+    def history_windows(self, length):
+        """Get sliding windows over the visible data.
+
+        Args:
+            length: the number of dates in a window.
+
+        Returns:
+            Read-only (num_dates - length + 1, length, num_features) view into the feature matrix,
+            ith window contains dates from i to i + length - 1. The feature matrix is updated in
+            place when the data is prepared again, copy the windows to keep them.
+        """
+        if length not in self.window_views:
+            windows = np.lib.stride_tricks.sliding_window_view(self.feature_matrix, length, axis=0)
+            self.window_views[length] = windows.transpose(0, 2, 1)
+        return self.window_views[length]
+
+    def prices(self, index):
+        """Get the absolute stock prices for the ith available date.
+
+        Args:
+            index: the integer position of the date in the available dates.
+
+        Returns:
+            Array with the stock prices (view into the price matrix).
+        """
+        return self.price_matrix[index]
+
+    def get_volatile_ids(self):
+        """Returns ids of the data that changes on reset.
+
+        Also saves ids of the data that requires reset that each of them depends on in
+        volatile_sources.
+
+        Returns:
+            A set with ids of data that requires reset and of data that depends on it.
+        """
+        if self.volatile_ids is None:
+            sources = {}
+
+            def result(data):
+                return sources[data.id_str]
+
+            def function(data, dependencies):
+                data_sources = set().union(*dependencies)
+                if data.requires_reset:
+                    data_sources.add(data.id_str)
+                sources[data.id_str] = data_sources
+
+            self._reset_done()
+            for data_id in self.id_to_data:
+                self._recursive_apply(data_id, function, result)
+            self.volatile_sources = {data_id: sorted(data_sources)
+                                     for data_id, data_sources in sources.items() if data_sources}
+            self.volatile_ids = set(self.volatile_sources)
+        return self.volatile_ids
+
+    def _variant_key(self, data):
+        """Returns the variant cache key for the data.
+
+        Args:
+            data: the data object.
+
+        Returns:
+            Tuple with the id and the variants the data depends on, or None if it can't be cached.
+        """
+        if data.requires_reset or data.id_str not in self.volatile_sources:
+            return None
+        variants = [getattr(self.id_to_data[source_id], "variant", None)
+                    for source_id in self.volatile_sources[data.id_str]]
+        if None in variants:
+            return None
+        return (data.id_str,) + tuple(variants)
 
     def reset(self):
         """Resets ressetable data objects.
+
+        Only the data that changes on reset is reset, so without randomization this is a no-op.
         """
+        volatile_ids = self.get_volatile_ids()
+
         def result(data):
             return data.ready
 
         def function(data, dependencies):
-            self.recursive_counter += 1
-            data.reset(dependencies)
+            if data.id_str in volatile_ids:
+                self.recursive_counter += 1
+                data.reset(dependencies)
 
         self._reset_done()
-        for data_id in self.id_to_data:
+        for data_id in volatile_ids:
             self._recursive_apply(data_id, function, result)
 
     def __getitem__(self, date):
@@ -7,7 +7,9 @@ from stock_trading_backend.data.data_collection import DataCollection
 from stock_trading_backend.data.generated_stock_data import GeneratedStockData
 from stock_trading_backend.data.randomized_stock_data import RandomizedStockData
 from stock_trading_backend.data.real_stock_data import RealStockData
+from stock_trading_backend.data.resampled_stock_data import ResampledStockData
 from stock_trading_backend.data.running_average_analysis import RunningAverageAnalysis
+from stock_trading_backend.data.technical_indicator_bank import TechnicalIndicatorBank
 
 
 DATA_CLASSES = [
@@ -15,7 +17,9 @@ DATA_CLASSES = [
     GeneratedStockData,
     RandomizedStockData,
     RealStockData,
+    ResampledStockData,
     RunningAverageAnalysis,
+    TechnicalIndicatorBank,
 ]
 DATA_NAME_MAPPING = {data.name:data for data in DATA_CLASSES}
 
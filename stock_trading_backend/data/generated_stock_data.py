@@ -1,19 +1,21 @@
 """Class for storing generated stock data.
 """
-# pylint: disable=unused-import
-import math
-
 from datetime import datetime
 
 import numpy as np
 import pandas as pd
 
 from stock_trading_backend.data.stock_data import StockData
+from stock_trading_backend.util import compile_expression
 
 
 # pylint: disable=too-few-public-methods
 class GeneratedStockData(StockData):
     """Class for storing generated stock data.
+
+    Evaluation functions are arithmetic expressions of diff, the number of days from the anchor
+    date, e.g. "200 + 100 * math.sin(math.pi * 2 * diff / 300)". They are compiled once into
+    numpy functions and evaluated for all of the days at once.
     """
     name = "generated_stock_data"
 
@@ -23,12 +25,14 @@ class GeneratedStockData(StockData):
         Args:
             dependencies: a list of dependency ids for the data.
             visible: whether the data is visible in data_collection[date].
-            evaluation_functions: the functions used for evaluating stock data.
+            evaluation_functions: the expressions used for evaluating stock data.
         """
         super(GeneratedStockData, self).__init__(dependencies, visible)
         if not evaluation_functions:
             raise ValueError("No evaluation functions provided.")
         self.evaluation_functions = evaluation_functions
+        self.compiled_functions = [compile_expression(evaluation_function)
+                                   for evaluation_function in evaluation_functions]
         self.anchor_date = datetime(2010, 1, 1)
 
     def prepare_data(self, from_date, to_date, stock_names, dependencies):
@@ -45,15 +49,11 @@ class GeneratedStockData(StockData):
         anchor_date = datetime(2010, 1, 1)
         num_days = (to_date - from_date).days + 1
         diff = from_date - anchor_date if from_date > anchor_date else anchor_date - from_date
-        diff = diff.days
+        diff = np.arange(diff.days, diff.days + num_days, dtype=np.float64)
         array = np.zeros((num_days, len(stock_names)))
-        for day_index in range(num_days):
-            for stock_index in range(len(stock_names)):
-                evaluation_function_index = stock_index % len(self.evaluation_functions)
-                evaluation_function = self.evaluation_functions[evaluation_function_index]
-                # pylint: disable=eval-used
-                array[day_index][stock_index] = eval(evaluation_function)
-            diff += 1
+        for stock_index in range(len(stock_names)):
+            function = self.compiled_functions[stock_index % len(self.compiled_functions)]
+            array[:, stock_index] = function(diff)
         index = pd.Index(pd.date_range(from_date, to_date))
         self.data = pd.DataFrame(array, index=index, columns=stock_names)
         self.ready = True
@@ -1,17 +1,54 @@
 """Class for storing randomized stock data.
 """
+import json
+import os
+import tempfile
+
 import numpy as np
 
 from stock_trading_backend.data.stock_data import StockData
 
 
+def _replace_file(path, write, mode="wb"):
+    """Writes a file atomically, to a temporary file in the same directory moved into place.
+
+    Args:
+        path: the path of the file.
+        write: function that writes the contents to the open file.
+        mode: "wb" for binary files, "w" for text files.
+    """
+    descriptor, temp_filename = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+                                                 suffix=".tmp")
+    try:
+        encoding = None if "b" in mode else "utf-8"
+        with os.fdopen(descriptor, mode, encoding=encoding) as file:
+            write(file)
+        os.replace(temp_filename, path)
+    except BaseException:
+        os.remove(temp_filename)
+        raise
+
+
 class RandomizedStockData(StockData):
     """Class for storing randomized stock data.
+
+    By default fresh noise is generated every time the data is prepared. With num_variants > 0
+    a bank of num_variants noise arrays is generated once (and stored in bank_path if set), and
+    every preparation picks one of the variants. Data collection caches the data derived from
+    each variant, so it is not computed again.
+
+    The mean and stdev of a stored bank are saved next to it (bank_path + ".json"), a bank
+    generated with other parameters is generated again. Both files are replaced atomically and
+    the parameters are written last, so processes sharing bank_path never use a partially
+    written bank or a bank with parameters of another one.
     """
     name = "randomized_stock_data"
     expected_num_dependencies = 1
+    requires_reset = True
 
-    def __init__(self, dependencies=None, visible=False, mean=0, stdev=0.025):
+    # pylint: disable=too-many-arguments
+    def __init__(self, dependencies=None, visible=False, mean=0, stdev=0.025, num_variants=0,
+                 bank_path=None):
         """Initializer for Randomized Stock Data class
 
         Args:
@@ -19,11 +56,60 @@ class RandomizedStockData(StockData):
             visible: whether the data is visible in data_collection[date].
             mean: the mean relative difference for the randomized data.
             stdev: the standart deviation for the relative difference.
+            num_variants: the number of pre-generated noise variants (0 for fresh noise).
+            bank_path: path of the .npy file to memory-map the noise bank from.
         """
         super(RandomizedStockData, self).__init__(dependencies, visible)
         self.id_str = "randomized_{}".format(self.dependencies[0])
         self.mean = mean
         self.stdev = stdev
+        self.num_variants = num_variants
+        self.bank_path = bank_path
+        self.noise_bank = None
+        self.noise_bank_parameters = None
+        self.variant = None
+
+    def _get_noise_bank(self, shape):
+        """Returns the noise bank, generates or loads it if needed.
+
+        Args:
+            shape: the shape of the noise for a single variant.
+
+        Returns:
+            (num_variants, *shape) array with the noise.
+        """
+        shape = (self.num_variants,) + tuple(shape)
+        parameters = {"mean": self.mean, "stdev": self.stdev}
+        if (self.noise_bank is not None and self.noise_bank.shape == shape
+                and self.noise_bank_parameters == parameters):
+            return self.noise_bank
+
+        parameters_path = None
+        if self.bank_path is not None:
+            parameters_path = self.bank_path + ".json"
+        if self.bank_path is not None and os.path.isfile(self.bank_path):
+            saved_parameters = None
+            if os.path.isfile(parameters_path):
+                with open(parameters_path, encoding="utf-8") as parameters_file:
+                    saved_parameters = json.load(parameters_file)
+            noise_bank = np.load(self.bank_path, mmap_mode="r")
+            if noise_bank.shape == shape and saved_parameters == parameters:
+                self.noise_bank = noise_bank
+                self.noise_bank_parameters = parameters
+                return self.noise_bank
+
+        noise_bank = 1 + np.random.normal(self.mean, self.stdev, shape)
+        if self.bank_path is not None:
+            # Without parameters the bank isn't used while it is replaced.
+            try:
+                os.remove(parameters_path)
+            except FileNotFoundError:
+                pass
+            _replace_file(self.bank_path, lambda file: np.save(file, noise_bank))
+            _replace_file(parameters_path, lambda file: json.dump(parameters, file), mode="w")
+        self.noise_bank = noise_bank
+        self.noise_bank_parameters = parameters
+        return self.noise_bank
 
     def prepare_data(self, from_date, to_date, stock_names, dependencies):
         """Data preparation.
@@ -38,7 +124,12 @@ class RandomizedStockData(StockData):
         """
         self.ready = True
         other_data = dependencies[0].data
-        noise = 1 + np.random.normal(self.mean, self.stdev, [len(other_data), len(stock_names)])
+        shape = [len(other_data), len(stock_names)]
+        if self.num_variants > 0:
+            self.variant = np.random.randint(self.num_variants)
+            noise = self._get_noise_bank(shape)[self.variant]
+        else:
+            noise = 1 + np.random.normal(self.mean, self.stdev, shape)
         self.data = other_data.copy() * noise
 
     def reset(self, dependencies):
@@ -7,8 +7,12 @@ from stock_trading_backend.util import get_stock_data
 # pylint: disable=too-few-public-methods
 class RealStockData(StockData):
     """Class for storing real stock data.
+
+    The stock data is already stored on disk and updated when it is missing, so it is not put in
+    the data cache, the data depending on it is keyed by the content of the stock data.
     """
     name = "real_stock_data"
+    cacheable = False
 
     def prepare_data(self, from_date, to_date, stock_names, dependencies):
         """Data preparation.
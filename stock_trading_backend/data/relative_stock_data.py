@@ -49,4 +49,4 @@ class RelativeStockData(StockData):
         Returns:
             Number buffer days.
         """
-        self.buffer = dependencies[0] + 1
+        self.buffer = dependencies[0] + self.bar_length
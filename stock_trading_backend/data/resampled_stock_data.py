@@ -0,0 +1,72 @@
+"""Class for storing resampled stock data.
+"""
+from stock_trading_backend.data.stock_data import StockData
+
+
+# Pandas period frequency and approximate length in days for each resample frequency.
+RESAMPLE_FREQUENCIES = {
+    "weekly": ("W", 7),
+    "monthly": ("M", 31),
+}
+
+
+class ResampledStockData(StockData):
+    """Class for storing resampled stock data.
+
+    Turns daily stock data into weekly or monthly bars. Each bar is the last price of the period
+    and is indexed by the last date of the period that is in the data, so the bars stay on
+    trading dates. The last bar of the date range can cover only a part of the period.
+
+    For example (weekly): Mon 100, Tue 110, Fri 120, Mon 130 -> Fri 120, Mon 130
+    """
+    name = "resampled_stock_data"
+    expected_num_dependencies = 1
+
+    def __init__(self, dependencies=None, visible=False, frequency="weekly"):
+        """Initializer for resampled stock data class
+
+        Args:
+            dependencies: a list of dependency ids for the data.
+            visible: whether the data is visible in data_collection[date].
+            frequency: "weekly" or "monthly".
+        """
+        super(ResampledStockData, self).__init__(dependencies, visible)
+        if frequency not in RESAMPLE_FREQUENCIES:
+            raise ValueError("Resample frequency {} is not supported.".format(frequency))
+        self.frequency = frequency
+        self.id_str = "{}_{}".format(frequency, self.dependencies[0])
+
+    def prepare_data(self, from_date, to_date, stock_names, dependencies):
+        """Data preparation.
+
+        Gets the data prepared.
+
+        Args:
+            from_date: datetime start of the date range.
+            to_date: datetime end of the date range.
+            stock_names: a list of stock names to prepare.
+            dependencies: a list of prepared data dependencies.
+        """
+        other_data = dependencies[0].data
+        periods = other_data.index.to_period(RESAMPLE_FREQUENCIES[self.frequency][0])
+        self.data = other_data[~periods.duplicated(keep="last")]
+        self.ready = True
+
+    def set_bar_length(self, dependency_bar_lengths):
+        """Sets the number of days per bar, so windows of the dependent data cover whole bars.
+
+        Args:
+            dependency_bar_lengths: The list of bar lengths of the dependencies.
+        """
+        self.bar_length = RESAMPLE_FREQUENCIES[self.frequency][1]
+
+    def buffer_days(self, dependencies):
+        """Figures out the buffer for the resampled stock data.
+
+        Args:
+            dependencies: The list of buffer values for the dependencies.
+
+        Returns:
+            Number buffer days.
+        """
+        self.buffer = dependencies[0] + RESAMPLE_FREQUENCIES[self.frequency][1]
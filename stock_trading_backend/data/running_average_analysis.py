@@ -1,24 +1,36 @@
 """Class for running average analysis data.
 """
+import pandas as pd
+
 from stock_trading_backend.data.stock_data_analysis import StockDataAnalysis
 
+BACKENDS = ["prefix_sum", "pandas"]
+
 
 class RunningAverageAnalysis(StockDataAnalysis):
     """Class for running average analysis data.
+
+    With the default "prefix_sum" backend the averages are computed from the rolling window
+    engine of the dependency, which is shared by the running averages of the same data, so each
+    window is a single subtraction of prefix sums. The "pandas" backend uses rolling().mean().
     """
     name = "running_average_analysis"
     expected_num_dependencies = 1
 
-    def __init__(self, dependencies=None, visible=True, num_days=1):
+    def __init__(self, dependencies=None, visible=True, num_days=1, backend="prefix_sum"):
         """Initializer for Running Average Analysis class
 
         Args:
             dependencies: a list of dependency ids for the data.
             visible: whether the data is visible in data_collection[date].
             num_days: number of days to take the average of.
+            backend: "prefix_sum" or "pandas".
         """
         super(RunningAverageAnalysis, self).__init__(dependencies, visible)
+        if backend not in BACKENDS:
+            raise ValueError("Backend {} is not supported.".format(backend))
         self.num_days = num_days
+        self.backend = backend
         self.id_str = "running_average_{}_for_{}".format(num_days, dependencies[0])
         self.feature_template = "ra_{}_{}_".format(num_days, dependencies[0]) + "{}"
 
@@ -33,7 +45,12 @@ class RunningAverageAnalysis(StockDataAnalysis):
             stock_names: a list of stock names to prepare.
             dependencies: a list of prepared data dependencies.
         """
-        self.data = dependencies[0].data.rolling(self.num_days).mean().dropna()
+        if self.backend == "pandas":
+            self.data = dependencies[0].data.rolling(self.num_days).mean().dropna()
+        else:
+            engine = dependencies[0].get_rolling_window_engine()
+            self.data = pd.DataFrame(engine.mean(self.num_days), index=dependencies[0].data.index,
+                                     columns=dependencies[0].data.columns).dropna()
         self.data.columns = [self.feature_template.format(name) for name in stock_names]
         self.ready = True
 
@@ -46,4 +63,4 @@ class RunningAverageAnalysis(StockDataAnalysis):
         Returns:
             Number buffer days.
         """
-        self.buffer = dependencies[0] + self.num_days
+        self.buffer = dependencies[0] + self.num_days * self.bar_length
@@ -0,0 +1,186 @@
+"""Class for a bank of technical indicators computed in a single pass.
+"""
+import numpy as np
+import pandas as pd
+
+from stock_trading_backend.data.stock_data_analysis import StockDataAnalysis
+from stock_trading_backend.util import RollingWindowEngine
+
+RSI_TOLERANCE = 1e-9
+
+
+# pylint: disable=too-many-instance-attributes
+class TechnicalIndicatorBank(StockDataAnalysis):
+    """Class for a bank of technical indicators of the stock data.
+
+    Computes all of the configured indicators for all of the stocks at once into a single
+    DataFrame. Intermediates shared by the indicators (the rolling window engine of the prices,
+    day-to-day differences, EMAs) are computed once.
+
+    Indicators (the features are named "{indicator}_{dependency}_{stock}"):
+        sma_{window}: simple moving average.
+        ema_{window}: exponential moving average with span window (pandas ewm(adjust=False)).
+        std_{window}, bb_upper_{window}, bb_lower_{window}: rolling standard deviation and
+            Bollinger bands (SMA +- bollinger_num_std standard deviations).
+        rsi_{window}: relative strength index with simple averages of gains and losses.
+        macd_{fast}_{slow}, macd_signal_{fast}_{slow}_{signal}: MACD line and its signal line.
+        roc_{window}: rate of change, price / price window days ago - 1.
+
+    Rows before all of the indicators are defined are dropped.
+    """
+    name = "technical_indicator_bank"
+    expected_num_dependencies = 1
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, dependencies=None, visible=True, sma_windows=None, ema_windows=None,
+                 bollinger_windows=None, rsi_windows=None, macd=None, roc_windows=None,
+                 bollinger_num_std=2):
+        """Initializer for Technical Indicator Bank class
+
+        Args:
+            dependencies: a list of dependency ids for the data.
+            visible: whether the data is visible in data_collection[date].
+            sma_windows: a list of windows for simple moving averages.
+            ema_windows: a list of spans for exponential moving averages.
+            bollinger_windows: a list of windows for rolling std and Bollinger bands.
+            rsi_windows: a list of windows for relative strength indexes.
+            macd: [fast, slow, signal] spans for MACD, or None.
+            roc_windows: a list of windows for rates of change.
+            bollinger_num_std: the width of Bollinger bands in standard deviations.
+        """
+        super(TechnicalIndicatorBank, self).__init__(dependencies, visible)
+        self.sma_windows = list(sma_windows or [])
+        self.ema_windows = list(ema_windows or [])
+        self.bollinger_windows = list(bollinger_windows or [])
+        self.rsi_windows = list(rsi_windows or [])
+        self.macd = list(macd) if macd else []
+        self.roc_windows = list(roc_windows or [])
+        self.bollinger_num_std = bollinger_num_std
+        if self.macd and len(self.macd) != 3:
+            raise ValueError("Expected [fast, slow, signal] for MACD, got {}".format(self.macd))
+        windows = (self.sma_windows + self.ema_windows + self.bollinger_windows
+                   + self.rsi_windows + self.macd + self.roc_windows)
+        if not windows:
+            raise ValueError("No indicators provided.")
+        if min(windows) < 1:
+            raise ValueError("Expected positive windows, got {}".format(windows))
+
+        parts = []
+        for prefix, values in [("sma", self.sma_windows), ("ema", self.ema_windows),
+                               ("bb", self.bollinger_windows), ("rsi", self.rsi_windows),
+                               ("macd", self.macd), ("roc", self.roc_windows)]:
+            if values:
+                parts.append("_".join([prefix] + [str(value) for value in values]))
+        self.id_str = "indicators_{}_for_{}".format("_".join(parts), self.dependencies[0])
+        self.feature_template = "{}_" + self.dependencies[0] + "_{}"
+
+    def _indicator_names(self):
+        """Returns the names of the indicators in the order of the features.
+        """
+        names = ["sma_{}".format(window) for window in self.sma_windows]
+        names += ["ema_{}".format(window) for window in self.ema_windows]
+        for window in self.bollinger_windows:
+            names += ["std_{}".format(window), "bb_upper_{}".format(window),
+                      "bb_lower_{}".format(window)]
+        names += ["rsi_{}".format(window) for window in self.rsi_windows]
+        if self.macd:
+            fast, slow, signal = self.macd
+            names += ["macd_{}_{}".format(fast, slow),
+                      "macd_signal_{}_{}_{}".format(fast, slow, signal)]
+        names += ["roc_{}".format(window) for window in self.roc_windows]
+        return names
+
+    @staticmethod
+    def _ema(values, span):
+        """Returns exponential moving averages of the columns, pandas ewm(span, adjust=False).
+
+        Args:
+            values: (num_days, num_stocks) array.
+            span: the span of the average.
+        """
+        return pd.DataFrame(values).ewm(span=span, adjust=False).mean().to_numpy()
+
+    # pylint: disable=too-many-locals
+    def prepare_data(self, from_date, to_date, stock_names, dependencies):
+        """Data preparation.
+
+        Gets the data prepared.
+
+        Args:
+            from_date: datetime start of the date range.
+            to_date: datetime end of the date range.
+            stock_names: a list of stock names to prepare.
+            dependencies: a list of prepared data dependencies.
+        """
+        prices = dependencies[0].data.to_numpy(dtype=np.float64)
+        engine = dependencies[0].get_rolling_window_engine()
+        num_days, num_stocks = prices.shape
+        names = self._indicator_names()
+        array = np.empty((num_days, len(names) * num_stocks))
+        outputs = iter(array[:, index * num_stocks:(index + 1) * num_stocks]
+                       for index in range(len(names)))
+
+        emas = {}
+
+        def ema(span):
+            if span not in emas:
+                emas[span] = self._ema(prices, span)
+            return emas[span]
+
+        for window in self.sma_windows:
+            next(outputs)[:] = engine.mean(window)
+        for window in self.ema_windows:
+            next(outputs)[:] = ema(window)
+        for window in self.bollinger_windows:
+            std = np.sqrt(engine.variance(window))
+            mean = engine.mean(window)
+            next(outputs)[:] = std
+            next(outputs)[:] = mean + self.bollinger_num_std * std
+            next(outputs)[:] = mean - self.bollinger_num_std * std
+
+        if self.rsi_windows:
+            diffs = np.diff(prices, axis=0)
+            gain_engine = RollingWindowEngine(np.maximum(diffs, 0))
+            loss_engine = RollingWindowEngine(np.maximum(-diffs, 0))
+            for window in self.rsi_windows:
+                output = next(outputs)
+                output[:1] = np.nan
+                gains = np.maximum(gain_engine.sum(window), 0)
+                losses = np.maximum(loss_engine.sum(window), 0)
+                total = gains + losses
+                # Flat windows give sums that are zero up to the rounding of the prefix sums.
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    output[1:] = np.where(total > RSI_TOLERANCE, 100 * gains / total, 50)
+                output[1:][np.isnan(total)] = np.nan
+
+        if self.macd:
+            fast, slow, signal = self.macd
+            macd = ema(fast) - ema(slow)
+            next(outputs)[:] = macd
+            next(outputs)[:] = self._ema(macd, signal)
+
+        for window in self.roc_windows:
+            output = next(outputs)
+            output[:window] = np.nan
+            output[window:] = prices[window:] / prices[:-window] - 1
+
+        columns = [self.feature_template.format(name, stock_name)
+                   for name in names for stock_name in stock_names]
+        self.data = pd.DataFrame(array, index=dependencies[0].data.index, columns=columns)
+        self.data = self.data.dropna()
+        self.ready = True
+
+    def buffer_days(self, dependencies):
+        """Figures out the buffer for the indicators.
+
+        Args:
+            dependencies: The list of buffer values for the dependencies.
+
+        Returns:
+            Number buffer days.
+        """
+        windows = (self.sma_windows + self.ema_windows + self.bollinger_windows
+                   + [window + 1 for window in self.rsi_windows] + self.roc_windows)
+        if self.macd:
+            windows.append(self.macd[1] + self.macd[2])
+        self.buffer = dependencies[0] + max(windows + [0]) * self.bar_length
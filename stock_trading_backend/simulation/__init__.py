@@ -1,4 +1,11 @@
 """__init__ file for simulation sub-package
 """
+from stock_trading_backend.simulation.market_data import MarketData
+from stock_trading_backend.simulation.multi_portfolio_simulation import MultiPortfolioSimulation
 from stock_trading_backend.simulation.reward_factory import create_reward
 from stock_trading_backend.simulation.stock_market_simulation import StockMarketSimulation
+from stock_trading_backend.simulation.subprocess_vector_simulation import (
+    SubprocessVectorStockMarketSimulation)
+from stock_trading_backend.simulation.trading_session import TradingSession
+from stock_trading_backend.simulation.vector_stock_market_simulation import (
+    EpisodeView, VectorStockMarketSimulation)
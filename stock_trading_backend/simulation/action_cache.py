@@ -0,0 +1,153 @@
+"""Cache of legal actions for the stock market simulation.
+"""
+import itertools
+
+import numpy as np
+
+# Action ids are base-3 numbers, so they fit into int64 only for up to 39 stocks.
+MAX_ENCODED_STOCKS = 39
+
+def generate_actions(owned_stocks, max_stock_owned):
+    """Generator for all legitimate actions given the owned stocks.
+
+    Args:
+        owned_stocks: a list with the number of owned shares for each stock.
+        max_stock_owned: a maximum number of different stocks that can be owned.
+
+    Returns:
+        Generator obejct with all possible actions.
+    """
+    num_owned_stocks = np.count_nonzero(owned_stocks)
+    num_not_owned_stocks = len(owned_stocks) - num_owned_stocks
+    num_possible_to_purchase = max_stock_owned - num_owned_stocks
+
+    for num_purchases in range(num_possible_to_purchase + 1):
+        indexes_iter = itertools.combinations(range(num_not_owned_stocks), num_purchases)
+        for indexes in indexes_iter:
+            sell_actions = itertools.product([0, 1], repeat=num_owned_stocks)
+            purchase_action = [1] * num_not_owned_stocks
+            for i in indexes:
+                purchase_action[i] = 2
+            for sell_action in sell_actions:
+                action = [0] * len(owned_stocks)
+                sell_index, purchase_index = 0, 0
+                for i, owned_num in enumerate(owned_stocks):
+                    if owned_num > 0:
+                        action[i] = sell_action[sell_index]
+                        sell_index += 1
+                    else:
+                        action[i] = purchase_action[purchase_index]
+                        purchase_index += 1
+                yield action
+
+
+class ActionCache:
+    """Cache of legal actions.
+
+    The set of legal actions depends only on which stocks are owned and on max_stock_owned, so
+    legal actions are enumerated once per ownership mask and stored as read-only
+    (num_actions, num_stocks) integer arrays.
+
+    Actions can also be encoded as integer ids: sum(action[i] * 3 ** i).
+    """
+    def __init__(self, num_stocks, max_stock_owned):
+        """Initializer for the action cache.
+
+        Args:
+            num_stocks: the number of stocks in the simulation.
+            max_stock_owned: a maximum number of different stocks that can be owned.
+        """
+        self.num_stocks = num_stocks
+        self.max_stock_owned = max_stock_owned
+        self.powers = 3 ** np.arange(min(num_stocks, MAX_ENCODED_STOCKS), dtype=np.int64)
+        self.actions = {}
+        self.action_ids = {}
+
+    @staticmethod
+    def ownership_key(owned_stocks):
+        """Returns the ownership bitmask of the owned stocks as a hashable key.
+
+        Args:
+            owned_stocks: a list with the number of owned shares for each stock.
+        """
+        return np.packbits(np.asarray(owned_stocks) > 0).tobytes()
+
+    def legal_actions(self, owned_stocks):
+        """Returns all legal actions given the owned stocks.
+
+        Args:
+            owned_stocks: a list with the number of owned shares for each stock.
+
+        Returns:
+            Read-only (num_actions, num_stocks) array with the actions.
+        """
+        key = self.ownership_key(owned_stocks)
+        if key not in self.actions:
+            actions = list(generate_actions(owned_stocks, self.max_stock_owned))
+            actions = np.array(actions, dtype=np.int8).reshape(-1, self.num_stocks)
+            actions.flags.writeable = False
+            self.actions[key] = actions
+        return self.actions[key]
+
+    def legal_action_ids(self, owned_stocks):
+        """Returns ids of all legal actions given the owned stocks.
+
+        Args:
+            owned_stocks: a list with the number of owned shares for each stock.
+
+        Returns:
+            Read-only (num_actions,) array with the action ids.
+        """
+        key = self.ownership_key(owned_stocks)
+        if key not in self.action_ids:
+            action_ids = self.encode(self.legal_actions(owned_stocks))
+            action_ids.flags.writeable = False
+            self.action_ids[key] = action_ids
+        return self.action_ids[key]
+
+    def _check_encodable(self):
+        """Raises error if the actions can't be encoded as int64 ids.
+        """
+        if self.num_stocks > MAX_ENCODED_STOCKS:
+            raise ValueError("Action ids support up to {} stocks, got {}".format(
+                MAX_ENCODED_STOCKS, self.num_stocks))
+
+    def encode(self, actions):
+        """Encodes actions as integer ids.
+
+        Args:
+            actions: array of actions with num_stocks as the last dimension.
+
+        Returns:
+            Array of action ids.
+        """
+        self._check_encodable()
+        return np.asarray(actions, dtype=np.int64) @ self.powers
+
+    def decode(self, action_ids):
+        """Decodes integer ids into actions.
+
+        Args:
+            action_ids: an action id or array of action ids.
+
+        Returns:
+            Array of actions with num_stocks as the last dimension.
+        """
+        self._check_encodable()
+        action_ids = np.asarray(action_ids, dtype=np.int64)
+        return ((action_ids[..., np.newaxis] // self.powers) % 3).astype(np.int8)
+
+
+ACTION_CACHES = {}
+
+def get_action_cache(num_stocks, max_stock_owned):
+    """Returns a shared action cache for the number of stocks and max stock owned.
+
+    Args:
+        num_stocks: the number of stocks in the simulation.
+        max_stock_owned: a maximum number of different stocks that can be owned.
+    """
+    key = (num_stocks, max_stock_owned)
+    if key not in ACTION_CACHES:
+        ACTION_CACHES[key] = ActionCache(num_stocks, max_stock_owned)
+    return ACTION_CACHES[key]
@@ -1,5 +1,7 @@
 """Class for constant reward.
 """
+import numpy as np
+
 from stock_trading_backend.simulation.reward import Reward
 
 
@@ -35,3 +37,14 @@ class ConstantReward(Reward):
         """Calculates the value of the reward for the whole episode.
         """
         return self.value
+
+    def _calculate_batch(self, net_worth, dates):
+        """Calculates the rewards for (num_episodes, num_days + 1) net worth array.
+
+        Args:
+            net_worth: (num_episodes, num_days + 1) array with the net worth of every episode.
+            dates: a list of num_days + 1 dates of the trajectories.
+        """
+        num_episodes, num_days = net_worth.shape[0], net_worth.shape[1] - 1
+        return (np.full((num_episodes, num_days), self.value, dtype=np.float64),
+                np.full(num_episodes, self.value, dtype=np.float64))
@@ -0,0 +1,98 @@
+"""Class for drawdown penalized net worth growth reward.
+"""
+import numpy as np
+
+from stock_trading_backend.simulation.reward import Reward
+from stock_trading_backend.util import MaxDrawdown
+
+
+class DrawdownPenaltyReward(Reward):
+    """Drawdown penalized net worth growth reward class.
+
+    The daily reward is the net worth growth ratio minus penalty times the growth of the maximum
+    drawdown, so the sum of the rewards over the episode is penalized by penalty times the
+    maximum drawdown of the episode.
+    """
+    name = "drawdown_penalty_reward"
+    state_attributes = ("prev_net_worth", "first_net_worth", "num_days", "drawdown")
+
+    # pylint: disable=unused-argument, too-many-arguments
+    def __init__(self, from_date=None, to_date=None, scaling_factor=1, penalty=1, bias=0):
+        """Initializer for reward class.
+
+        Args:
+            from_date: datetime start of the date range.
+            to_date: datetime end of the date range.
+            scaling_factor: number to multiply the output by.
+            penalty: the weight of the maximum drawdown.
+            bias: the reward when there is no change in the net worth.
+        """
+        super(DrawdownPenaltyReward, self).__init__(from_date, to_date)
+        self.id_str = "{}_{}_{}_{}".format(self.name, scaling_factor, penalty, bias)
+        self.scaling_factor = scaling_factor
+        self.penalty = penalty
+        self.bias = bias
+        self.prev_net_worth = 0
+        self.first_net_worth = 0
+        self.num_days = 0
+        self.drawdown = MaxDrawdown()
+
+    # pylint: disable=unused-argument
+    def calculate_value(self, observation, date):
+        """Calculates the value of the reward given the observation.
+
+        Args:
+            observation: observation from the environemnt.
+            date: datetime current date in the environment
+        """
+        if self.prev_net_worth <= 0:
+            return -1
+        curr_net_worth = observation["net_worth"]
+        prev_max_drawdown = self.drawdown.max_drawdown
+        self.drawdown.update(curr_net_worth)
+        result = curr_net_worth / self.prev_net_worth - 1
+        result -= self.penalty * (self.drawdown.max_drawdown - prev_max_drawdown)
+        self.prev_net_worth = curr_net_worth
+        self.num_days += 1
+        return result * self.scaling_factor + self.bias
+
+    def calculate_overall_reward(self):
+        """Calculates the value of the reward for the whole episode.
+        """
+        result = self.prev_net_worth / self.first_net_worth - 1
+        result -= self.penalty * self.drawdown.max_drawdown
+        return result / self.num_days * self.scaling_factor + self.bias
+
+    def _calculate_batch(self, net_worth, dates):
+        """Calculates the rewards for (num_episodes, num_days + 1) net worth array.
+
+        Args:
+            net_worth: (num_episodes, num_days + 1) array with the net worth of every episode.
+            dates: a list of num_days + 1 dates of the trajectories.
+        """
+        valid, num_days = self._valid_steps(net_worth[:, :-1] > 0)
+        peak = np.maximum.accumulate(net_worth, axis=1)
+        drawdown = np.where(peak > 0, 1 - net_worth / peak, 0)
+        max_drawdown = np.maximum.accumulate(drawdown, axis=1)
+        result = net_worth[:, 1:] / net_worth[:, :-1] - 1
+        result -= self.penalty * np.diff(max_drawdown, axis=1)
+        rewards = np.where(valid, result * self.scaling_factor + self.bias, -1)
+
+        episodes = np.arange(len(net_worth))
+        overall_rewards = net_worth[episodes, num_days] / net_worth[:, 0] - 1
+        overall_rewards -= self.penalty * max_drawdown[episodes, num_days]
+        return rewards, overall_rewards / num_days * self.scaling_factor + self.bias
+
+    # pylint: disable=unused-argument
+    def reset(self, observation, date):
+        """Resets the internal reward state.
+
+        Args:
+            observation: state of the reset environment.
+            date: datetime current date in the environment
+        """
+        self.prev_net_worth = observation["net_worth"]
+        self.first_net_worth = observation["net_worth"]
+        self.num_days = 0
+        self.drawdown = MaxDrawdown()
+        self.drawdown.update(self.first_net_worth)
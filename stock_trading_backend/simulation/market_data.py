@@ -0,0 +1,126 @@
+"""Class for the market data shared by the simulation sessions.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+from datetime import datetime, timedelta
+
+from stock_trading_backend.data import create_data_collection
+from stock_trading_backend.util import read_config_file
+
+DEFAULT_DATA_COLLECTION_CONFIG_FILE = "data/default.yaml"
+
+
+# pylint: disable=too-many-instance-attributes
+class MarketData:
+    """Read-only market data for a date range.
+
+    Holds the prepared data collection (stock prices and visible features for every available
+    date) and the observation layout. Sessions (see TradingSession) only read the market data,
+    so any number of them, also from different threads, can share a single copy of it.
+
+    Reset prepares the data for the next episode (e.g. new randomized stock data). The data is
+    updated for all of the sessions, so only the owner of the market data should reset it.
+
+    With prefetch=True and randomized data, the data for the next episode is prepared in a
+    background thread in a second data collection, and reset swaps the data collections. Call
+    close() to stop the background thread.
+    """
+    # pylint: disable=too-many-arguments
+    def __init__(self, data_collection_config=None, from_date=None, to_date=None,
+                 stock_data_randomization=False, resample_frequency=None, prefetch=False):
+        """Initializer for the market data class.
+
+        Args:
+            data_collection_config: configuration of the data configuration.
+            from_date: datetime date for the start of the range
+            to_date: datetime date for the end of the range
+            stock_data_randomization: whether to add stock data randomization.
+            resample_frequency: "weekly" or "monthly" to use coarser bars instead of days.
+            prefetch: whether to prepare the data for the next episode in background.
+        """
+        if data_collection_config is None:
+            data_collection_config = read_config_file(DEFAULT_DATA_COLLECTION_CONFIG_FILE)
+        # The config of the caller (e.g. of an agent) is kept as it is.
+        data_collection_config = deepcopy(data_collection_config)
+        data_collection_config["stock_data_randomization"] = stock_data_randomization
+        if resample_frequency is not None:
+            data_collection_config["resample_frequency"] = resample_frequency
+        self.data_collection_config = data_collection_config
+
+        if from_date is None and to_date is None:
+            from_date = datetime(2014, 1, 1)
+            to_date = datetime(2016, 1, 1)
+        elif from_date is None or to_date is None:
+            raise ValueError("Either both from and to dates are None or none of them.")
+
+        self.data_collection = create_data_collection(data_collection_config)
+        self.stock_names = self.data_collection.stock_names
+
+        # Adding buffer days.
+        buffer = self.data_collection.get_buffer()
+        from_date -= timedelta(days=buffer)
+        self.from_date = from_date
+        self.to_date = to_date
+
+        # Setting date range for data collection.
+        self.data_collection.set_date_range(from_date, to_date)
+        self.data_collection.prepare_data()
+
+        # Setting up data prefetch, only data that changes on reset needs to be prepared.
+        self.prefetch_collection = None
+        self.prefetch_executor = None
+        self.prefetch_future = None
+        if prefetch and self.data_collection.get_volatile_ids():
+            self.prefetch_collection = create_data_collection(data_collection_config)
+            self.prefetch_collection.set_date_range(from_date, to_date)
+            self.prefetch_executor = ThreadPoolExecutor(max_workers=1)
+            self.prefetch_future = self.prefetch_executor.submit(self._prepare_data,
+                                                                 self.prefetch_collection)
+
+        # Setting up observation layout.
+        feature_names = ["owned_{}".format(name) for name in self.stock_names]
+        feature_names += ["balance", "net_worth"]
+        feature_names += self.data_collection.feature_names
+        self.feature_index = {name: index for index, name in enumerate(feature_names)}
+
+    @property
+    def available_dates(self):
+        """Property, a list of the available dates.
+        """
+        return self.data_collection.available_dates
+
+    @property
+    def stock_data(self):
+        """Property, absolute stock data (the data the trades are executed with).
+        """
+        return self.data_collection.id_to_data[self.data_collection.absolute_stock_data_id]
+
+    @staticmethod
+    def _prepare_data(data_collection):
+        """Prepares the data collection for the next episode.
+
+        Args:
+            data_collection: the data collection to prepare.
+        """
+        data_collection.reset()
+        data_collection.prepare_data()
+
+    def reset(self):
+        """Prepares the data for the next episode, or swaps in the prefetched data.
+        """
+        if self.prefetch_future is None:
+            self._prepare_data(self.data_collection)
+        else:
+            self.prefetch_future.result()
+            self.data_collection, self.prefetch_collection = (self.prefetch_collection,
+                                                              self.data_collection)
+            self.prefetch_future = self.prefetch_executor.submit(self._prepare_data,
+                                                                 self.prefetch_collection)
+
+    def close(self):
+        """Stops the data prefetch.
+        """
+        if self.prefetch_executor is not None:
+            self.prefetch_executor.shutdown()
+            self.prefetch_executor = None
+            self.prefetch_future = None
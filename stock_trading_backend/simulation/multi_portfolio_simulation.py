@@ -0,0 +1,111 @@
+"""Class for running multiple portfolios on the same market path.
+"""
+import random
+
+import numpy as np
+
+from stock_trading_backend.simulation.vector_stock_market_simulation import (
+    VectorStockMarketSimulation)
+
+
+class MultiPortfolioSimulation(VectorStockMarketSimulation):
+    """
+    Description:
+        A simulation of the stock market, in which num_portfolios independent portfolios trade
+        over the same date window.
+
+        One date cursor drives all of the portfolios, so the market data is looked up once per
+        day and shared by the observations of all portfolios. Balances, owned stocks and net
+        worths are vectorized across portfolios, every portfolio has its own reward function.
+        Use episode(index) to let different agents make decisions for different portfolios.
+
+        Observations, actions, rewards and done masks have the same format as in
+        VectorStockMarketSimulation with num_envs equal to num_portfolios. commission can be an
+        array with one value per portfolio.
+
+    Starting State:
+        The date window is selected once for all of the portfolios. Starting balances are either
+        set with start_balances, or selected uniformly in the given range for every portfolio.
+    """
+    # pylint: disable=too-many-arguments
+    def __init__(self, data_collection_config=None, from_date=None, to_date=None, min_duration=0,
+                 max_duration=0, min_start_balance=1000, max_start_balance=1000, commission=0,
+                 max_stock_owned=1, stock_data_randomization=False, reward_config=None,
+                 observation_mode="series", num_portfolios=4, start_balances=None,
+                 prefetch=False, decision_interval=1, resample_frequency=None):
+        """Initializer for the multi-portfolio simulation class.
+
+        Args:
+            data_collection_config: configuration of the data configuration.
+            from_date: datetime date for the start of the range
+            to_date: datetime date for the end of the range
+            min_duration: minimum length of the episode.
+            max_duration: maximum length of the episode (if 0 will run for all available dates).
+            min_start_balance: minimum starting balance.
+            max_start_balance: maximum starting balance. Balance selected unifromly.
+            commission: relative commission for each transcation (or one per portfolio).
+            max_stock_owned: a maximum number of different stocks that can be owned.
+            stock_data_randomization: whether to add stock data randomization.
+            reward_config: the configuration for the reward.
+            observation_mode: "series" for pandas DataFrame observations, "array" for numpy ones.
+            num_portfolios: the number of portfolios.
+            start_balances: a list with the starting balance of every portfolio (overrides
+                            num_portfolios and the starting balance range).
+            prefetch: whether to prepare the data for the next episode in background.
+            decision_interval: the number of trading days per step.
+            resample_frequency: "weekly" or "monthly" to step over coarser bars instead of days.
+        """
+        if start_balances is not None:
+            num_portfolios = len(start_balances)
+        super(MultiPortfolioSimulation, self).__init__(
+            data_collection_config, from_date, to_date, min_duration, max_duration,
+            min_start_balance, max_start_balance, commission, max_stock_owned,
+            stock_data_randomization, reward_config, observation_mode, num_portfolios, prefetch,
+            decision_interval, resample_frequency)
+        self.num_portfolios = num_portfolios
+        self.start_balances = start_balances
+
+    def _market_rows(self):
+        """Returns the visible data for the current date, shared by all of the portfolios.
+        """
+        row = self.data_collection.row(self.curr_date_index[0])
+        return np.broadcast_to(row, (self.num_envs, len(row)))
+
+    def _market_prices(self):
+        """Returns the stock prices for the current date, shared by all of the portfolios.
+        """
+        prices = self.data_collection.prices(self.curr_date_index[0])
+        return np.broadcast_to(prices, (self.num_envs, len(prices)))
+
+    def reset(self):
+        """Resets all of the portfolios, all of them start on the same date.
+        """
+        self._reset_data()
+
+        # Setting from date, to date for the next episode.
+        duration = random.randint(self.min_duration, self.max_duration)
+        curr_date_index = random.randint(self.min_start_index,
+                                         len(self.available_dates) - duration)
+        self.from_date_index[:] = curr_date_index
+        self.curr_date_index[:] = curr_date_index
+        self.to_date_index[:] = curr_date_index + duration - 1
+
+        # Setting balance and net worth for the first day.
+        if self.start_balances is not None:
+            self.balance = np.array(self.start_balances, dtype=np.float64)
+        else:
+            self.balance = np.array([random.randint(self.min_start_balance,
+                                                    self.max_start_balance)
+                                     for _ in range(self.num_envs)], dtype=np.float64)
+        self.net_worth = self.balance.copy()
+        self.owned_stocks = np.zeros((self.num_envs, len(self.stock_names)))
+
+        # Reset observation cache.
+        self.saved_observation = None
+
+        # Reset the reward functions.
+        curr_date = self.available_dates[curr_date_index]
+        for index, reward_function in enumerate(self.reward_functions):
+            reward_function.set_available_dates(self.available_dates)
+            reward_function.reset(self._reward_observation(index), curr_date)
+        return self.observation
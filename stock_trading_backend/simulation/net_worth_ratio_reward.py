@@ -1,5 +1,7 @@
 """Class for net worth growth ratio reward.
 """
+import numpy as np
+
 from stock_trading_backend.simulation.reward import Reward
 
 
@@ -7,6 +9,7 @@ class NetWorthRatioReward(Reward):
     """Net worth growth ratio reward class.
     """
     name = "net_worth_ratio_reward"
+    state_attributes = ("prev_net_worth", "first_net_worth", "num_days")
 
     # pylint: disable=unused-argument
     def __init__(self, from_date=None, to_date=None, scaling_factor=1, bias=-0.05):
@@ -48,6 +51,21 @@ class NetWorthRatioReward(Reward):
         result = ((self.prev_net_worth / self.first_net_worth)  - 1) / self.num_days
         return result * self.scaling_factor + self.bias
 
+    def _calculate_batch(self, net_worth, dates):
+        """Calculates the rewards for (num_episodes, num_days + 1) net worth array.
+
+        Args:
+            net_worth: (num_episodes, num_days + 1) array with the net worth of every episode.
+            dates: a list of num_days + 1 dates of the trajectories.
+        """
+        valid, num_days = self._valid_steps(net_worth[:, :-1] > 0)
+        ratio = net_worth[:, 1:] / net_worth[:, :-1] - 1
+        rewards = np.where(valid, ratio * self.scaling_factor + self.bias, -1)
+
+        last_net_worth = net_worth[np.arange(len(net_worth)), num_days]
+        overall_rewards = (last_net_worth / net_worth[:, 0] - 1) / num_days
+        return rewards, overall_rewards * self.scaling_factor + self.bias
+
     # pylint: disable=unused-argument
     def reset(self, observation, date):
         """Resets the internal reward state.
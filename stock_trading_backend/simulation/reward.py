@@ -1,12 +1,24 @@
 """Base class for reward.
 """
-from abc import ABCMeta
+from abc import ABCMeta, abstractmethod
+import copy
+
+import numpy as np
 
 
 class Reward(metaclass=ABCMeta):
     """Base class for reward.
+
+    Attributes listed in state_attributes make up the internal reward state, which can be saved
+    with get_state and restored with set_state.
+
+    Rewards implement reset, calculate_value and calculate_overall_reward, which are used
+    online, step by step. calculate_batch computes the same rewards for whole net worth
+    trajectories of many episodes at once, by default with the online methods, rewards override
+    _calculate_batch with a vectorized version.
     """
     name = None
+    state_attributes = ()
 
     def __init__(self, from_date=None, to_date=None):
         """Initializer for base class.
@@ -17,23 +29,113 @@ class Reward(metaclass=ABCMeta):
         """
         self.id_str = self.name
 
+    @abstractmethod
     def calculate_value(self, observation, date):
         """Calculates the value of the reward given the observation.
 
         Args:
             observation: observation from the environemnt.
             date: datetime current date in the environment
+
+        Returns:
+            The reward for the step.
         """
+        raise NotImplementedError()
 
+    @abstractmethod
     def calculate_overall_reward(self):
         """Calculates the value of the reward for the whole episode.
+
+        Returns:
+            The reward for the episode.
+        """
+        raise NotImplementedError()
+
+    def calculate_batch(self, net_worth, dates=None):
+        """Calculates the rewards for whole net worth trajectories.
+
+        Gives the same values as reset followed by calculate_value for every step, but doesn't
+        change the internal reward state.
+
+        Args:
+            net_worth: (num_episodes, num_days + 1) array with the net worth of every episode,
+                       starting with the net worth on reset, or (num_days + 1) array.
+            dates: a list of num_days + 1 dates of the trajectories.
+
+        Returns:
+            rewards: (num_episodes, num_days) array with the reward for every step.
+            overall_rewards: (num_episodes,) array with the overall reward for every episode.
         """
+        net_worth = np.asarray(net_worth, dtype=np.float64)
+        single_episode = net_worth.ndim == 1
+        if single_episode:
+            net_worth = net_worth[np.newaxis]
+        if dates is None:
+            dates = [None] * net_worth.shape[1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rewards, overall_rewards = self._calculate_batch(net_worth, dates)
+        if single_episode:
+            return rewards[0], overall_rewards[0]
+        return rewards, overall_rewards
+
+    def _calculate_batch(self, net_worth, dates):
+        """Calculates the rewards for (num_episodes, num_days + 1) net worth array.
+
+        Replays the trajectories through calculate_value, rewards override it with vectorized
+        versions.
+
+        Args:
+            net_worth: (num_episodes, num_days + 1) array with the net worth of every episode.
+            dates: a list of num_days + 1 dates of the trajectories.
+
+        Returns:
+            rewards: (num_episodes, num_days) array with the reward for every step.
+            overall_rewards: (num_episodes,) array with the overall reward for every episode.
+        """
+        state = self.get_state()
+        rewards = np.empty((net_worth.shape[0], net_worth.shape[1] - 1))
+        overall_rewards = np.empty(net_worth.shape[0])
+        for index, episode_net_worth in enumerate(net_worth):
+            self.reset({"net_worth": episode_net_worth[0]}, dates[0])
+            for day, (value, date) in enumerate(zip(episode_net_worth[1:], dates[1:])):
+                rewards[index, day] = self.calculate_value({"net_worth": value}, date)
+            overall_rewards[index] = self.calculate_overall_reward()
+        self.set_state(state)
+        return rewards, overall_rewards
+
+    @staticmethod
+    def _valid_steps(condition):
+        """Returns the mask of the steps that are calculated, the others give -1.
+
+        Rewards stop tracking the net worth after the first previous net worth that fails the
+        condition, so the valid steps are a prefix of the trajectory.
+
+        Args:
+            condition: (num_episodes, num_days) boolean array, the condition for the previous net
+                       worth of every step.
+
+        Returns:
+            mask: (num_episodes, num_days) boolean array.
+            num_steps: (num_episodes,) array with the number of valid steps.
+        """
+        mask = np.logical_and.accumulate(condition, axis=1)
+        return mask, mask.sum(axis=1)
 
     def __hash__(self):
         """Returns hash of self.id_str
         """
         return hash(self.id_str)
 
+    def set_available_dates(self, dates):
+        """Sets the dates the reward is calculated for, called by the simulations on reset.
+
+        Rewards that look up data by date (e.g. benchmark prices) align it to the dates once
+        here. The default implementation does nothing.
+
+        Args:
+            dates: a list of dates, e.g. the available dates of a data collection.
+        """
+
     def reset(self, observation, date):
         """Resets the internal reward state.
 
@@ -41,3 +143,20 @@ class Reward(metaclass=ABCMeta):
             observation: state of the reset environment.
             date: datetime current date in the environment
         """
+
+    def get_state(self):
+        """Returns a copy of the internal reward state.
+
+        Returns:
+            Dict with the values of state_attributes.
+        """
+        return {name: copy.copy(getattr(self, name)) for name in self.state_attributes}
+
+    def set_state(self, state):
+        """Restores the internal reward state.
+
+        Args:
+            state: the state returned by get_state.
+        """
+        for name, value in state.items():
+            setattr(self, name, copy.copy(value))
@@ -3,14 +3,18 @@
 from copy import deepcopy
 
 from stock_trading_backend.simulation.constant_reward import ConstantReward
+from stock_trading_backend.simulation.drawdown_penalty_reward import DrawdownPenaltyReward
 from stock_trading_backend.simulation.net_worth_ratio_reward import NetWorthRatioReward
 from stock_trading_backend.simulation.sharpe_ratio_reward import SharpeRatioReward
+from stock_trading_backend.simulation.sortino_ratio_reward import SortinoRatioReward
 
 
 REWARD_CLASSES = [
     ConstantReward,
+    DrawdownPenaltyReward,
     NetWorthRatioReward,
     SharpeRatioReward,
+    SortinoRatioReward,
 ]
 REWARD_NAME_MAPPING = {reward.name:reward for reward in REWARD_CLASSES}
 
@@ -3,13 +3,23 @@
 import numpy as np
 
 from stock_trading_backend.simulation.reward import Reward
-from stock_trading_backend.util import get_stock_data
+from stock_trading_backend.util import get_benchmark, RunningMoments
+
+BENCHMARK_NAME = "SPY"
 
 
 class SharpeRatioReward(Reward):
     """Sharpe ratio reward class.
+
+    Returns are tracked with running statistics, so every step takes constant time. Market
+    returns are taken from the shared benchmark series, which is loaded on the first reset.
+    The benchmark is aligned to the available dates of the simulation once (see
+    set_available_dates), so steps read the market returns by the position of the date. Both
+    the steps and calculate_batch raise LookupError for dates the benchmark doesn't cover.
     """
     name = "sharpe_ratio_reward"
+    state_attributes = ("first_net_worth", "prev_net_worth", "first_market_value",
+                        "prev_market_value", "prev_position", "returns", "market_returns")
 
     def __init__(self, from_date=None, to_date=None, scaling_factor=1):
         """Initializer for reward class.
@@ -26,12 +36,61 @@ class SharpeRatioReward(Reward):
         self.prev_net_worth = 0
         self.first_market_value = 0
         self.prev_market_value = 0
-        self.returns = []
-        self.market_returns = []
-        if not from_date is None and not to_date is None:
-            self.market_data = get_stock_data(["SPY"], from_date, to_date)
-        else:
-            self.market_data = None
+        self.returns = RunningMoments()
+        self.market_returns = RunningMoments()
+        self.from_date = from_date
+        self.to_date = to_date
+        self.benchmark_series = None
+        self.batch_benchmark = None
+
+        # Benchmark aligned to the available dates.
+        self.aligned_dates = None
+        self.date_to_position = {}
+        self.aligned_values = None
+        self.aligned_returns = None
+        self.prev_position = None
+
+    @property
+    def benchmark(self):
+        """Property, the benchmark series for the date range, loaded on the first use.
+        """
+        if self.benchmark_series is None:
+            if self.from_date is None or self.to_date is None:
+                raise ValueError("The date range is needed for the benchmark.")
+            self.benchmark_series = get_benchmark(BENCHMARK_NAME, self.from_date, self.to_date)
+        return self.benchmark_series
+
+    @property
+    def market_data(self):
+        """Property, DataFrame with the benchmark prices.
+        """
+        return self.benchmark.data
+
+    def set_available_dates(self, dates):
+        """Aligns the benchmark prices and returns to the dates.
+
+        Args:
+            dates: a list of dates, e.g. the available dates of a data collection.
+        """
+        if dates is self.aligned_dates:
+            return
+        self.aligned_dates = dates
+        self.date_to_position = {date: position for position, date in enumerate(dates)}
+        # Dates before the benchmark get NaN, they raise LookupError when they are used.
+        self.aligned_values = self.benchmark.align(dates, allow_before_start=True)
+        self.aligned_returns = np.zeros(len(self.aligned_values))
+        self.aligned_returns[1:] = self.aligned_values[1:] / self.aligned_values[:-1] - 1
+
+    def _market_value(self, date, position):
+        """Returns the benchmark price for the date.
+
+        Args:
+            date: the date.
+            position: the position of the date in the aligned dates, or None.
+        """
+        if position is None or np.isnan(self.aligned_values[position]):
+            return self.benchmark.value(date)
+        return self.aligned_values[position]
 
     def calculate_value(self, observation, date):
         """Calculates the value of the reward given the observation.
@@ -44,19 +103,24 @@ class SharpeRatioReward(Reward):
             return -1
 
         curr_net_worth = observation["net_worth"]
-        curr_market_value = self.market_data.loc[date].item()
+        position = self.date_to_position.get(date)
+        curr_market_value = self._market_value(date, position)
+        if position is not None and self.prev_position == position - 1:
+            market_return = self.aligned_returns[position]
+        else:
+            market_return = curr_market_value / self.prev_market_value - 1
 
         curr_return = curr_net_worth / self.prev_net_worth - 1
-        market_return = curr_market_value / self.prev_market_value - 1
-        self.returns.append(curr_return)
-        self.market_returns.append(market_return)
+        self.returns.update(curr_return)
+        self.market_returns.update(market_return)
 
-        result = np.mean(self.returns) - np.mean(self.market_returns)
-        if len(self.returns) > 1:
-            result /= np.std(self.returns)
+        result = self.returns.mean - self.market_returns.mean
+        if self.returns.count > 1:
+            result /= self.returns.std
 
         self.prev_net_worth = curr_net_worth
         self.prev_market_value = curr_market_value
+        self.prev_position = position
         return result * self.scaling_factor
 
     def calculate_overall_reward(self):
@@ -65,12 +129,61 @@ class SharpeRatioReward(Reward):
         agent_return = self.prev_net_worth / self.first_net_worth - 1
         market_return = self.prev_market_value / self.first_market_value - 1
 
-        result = (agent_return - market_return) / len(self.returns)
-        if len(self.returns) > 1:
-            result /= np.std(self.returns)
+        result = (agent_return - market_return) / self.returns.count
+        if self.returns.count > 1:
+            result /= self.returns.std
 
         return result * self.scaling_factor
 
+    # pylint: disable=arguments-differ
+    def calculate_batch(self, net_worth, dates=None, benchmark=None):
+        """Calculates the rewards for whole net worth trajectories.
+
+        Args:
+            net_worth: (num_episodes, num_days + 1) array with the net worth of every episode,
+                       starting with the net worth on reset, or (num_days + 1) array.
+            dates: a list of num_days + 1 dates of the trajectories.
+            benchmark: (num_days + 1) or (num_episodes, num_days + 1) array with the benchmark
+                       prices, aligned from the benchmark series to the dates if None.
+
+        Returns:
+            rewards: (num_episodes, num_days) array with the reward for every step.
+            overall_rewards: (num_episodes,) array with the overall reward for every episode.
+        """
+        if benchmark is None:
+            benchmark = self.benchmark.align(dates)
+        self.batch_benchmark = np.asarray(benchmark, dtype=np.float64)
+        try:
+            return super(SharpeRatioReward, self).calculate_batch(net_worth, dates)
+        finally:
+            self.batch_benchmark = None
+
+    def _calculate_batch(self, net_worth, dates):
+        """Calculates the rewards for (num_episodes, num_days + 1) net worth array.
+
+        Args:
+            net_worth: (num_episodes, num_days + 1) array with the net worth of every episode.
+            dates: a list of num_days + 1 dates of the trajectories.
+        """
+        benchmark = np.broadcast_to(self.batch_benchmark, net_worth.shape)
+        valid, num_days = self._valid_steps(net_worth[:, :-1] != 0)
+        returns = np.where(valid, net_worth[:, 1:] / net_worth[:, :-1] - 1, 0)
+        market_returns = np.where(valid, benchmark[:, 1:] / benchmark[:, :-1] - 1, 0)
+        count = np.cumsum(valid, axis=1)
+        mean = np.cumsum(returns, axis=1) / count
+        std = np.sqrt(np.maximum(np.cumsum(returns ** 2, axis=1) / count - mean ** 2, 0))
+        result = mean - np.cumsum(market_returns, axis=1) / count
+        result = np.where(count > 1, result / std, result)
+        rewards = np.where(valid, result * self.scaling_factor, -1)
+
+        episodes = np.arange(len(net_worth))
+        agent_return = net_worth[episodes, num_days] / net_worth[:, 0] - 1
+        market_return = benchmark[episodes, num_days] / benchmark[:, 0] - 1
+        overall_rewards = (agent_return - market_return) / num_days
+        last_std = std[episodes, np.maximum(num_days - 1, 0)]
+        overall_rewards = np.where(num_days > 1, overall_rewards / last_std, overall_rewards)
+        return rewards, overall_rewards * self.scaling_factor
+
     def reset(self, observation, date):
         """Resets the internal reward state.
 
@@ -79,8 +192,9 @@ class SharpeRatioReward(Reward):
             date: datetime current date in the environment
         """
         self.prev_net_worth = observation["net_worth"]
-        self.prev_market_value = self.market_data.loc[date].item()
+        self.prev_position = self.date_to_position.get(date)
+        self.prev_market_value = self._market_value(date, self.prev_position)
         self.first_net_worth = self.prev_net_worth
         self.first_market_value = self.prev_market_value
-        self.returns = []
-        self.market_returns = []
+        self.returns = RunningMoments()
+        self.market_returns = RunningMoments()
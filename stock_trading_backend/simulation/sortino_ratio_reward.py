@@ -0,0 +1,98 @@
+"""Class for sortino ratio reward.
+"""
+import numpy as np
+
+from stock_trading_backend.simulation.reward import Reward
+from stock_trading_backend.util import DownsideDeviation, RunningMoments
+
+
+class SortinoRatioReward(Reward):
+    """Sortino ratio reward class.
+
+    Mean daily return above the target return divided by the downside deviation of the daily
+    returns, so only losses are penalized as risk. Until there is a loss, the excess return is
+    used as is.
+    """
+    name = "sortino_ratio_reward"
+    state_attributes = ("prev_net_worth", "returns", "downside_deviation")
+
+    # pylint: disable=unused-argument
+    def __init__(self, from_date=None, to_date=None, scaling_factor=1, target_return=0):
+        """Initializer for reward class.
+
+        Args:
+            from_date: datetime start of the date range.
+            to_date: datetime end of the date range.
+            scaling_factor: number by which to multiply output.
+            target_return: the minimum acceptable daily return.
+        """
+        super(SortinoRatioReward, self).__init__(from_date, to_date)
+        self.id_str = "{}_{}_{}".format(self.name, scaling_factor, target_return)
+        self.scaling_factor = scaling_factor
+        self.target_return = target_return
+        self.prev_net_worth = 0
+        self.returns = RunningMoments()
+        self.downside_deviation = DownsideDeviation(target_return)
+
+    def _ratio(self):
+        """Returns the sortino ratio of the returns so far.
+        """
+        result = self.returns.mean - self.target_return
+        if self.downside_deviation.value > 0:
+            result /= self.downside_deviation.value
+        return result * self.scaling_factor
+
+    # pylint: disable=unused-argument
+    def calculate_value(self, observation, date):
+        """Calculates the value of the reward given the observation.
+
+        Args:
+            observation: observation from the environemnt.
+            date: datetime current date in the environment
+        """
+        if self.prev_net_worth <= 0:
+            return -1
+        curr_net_worth = observation["net_worth"]
+        curr_return = curr_net_worth / self.prev_net_worth - 1
+        self.returns.update(curr_return)
+        self.downside_deviation.update(curr_return)
+        self.prev_net_worth = curr_net_worth
+        return self._ratio()
+
+    def calculate_overall_reward(self):
+        """Calculates the value of the reward for the whole episode.
+        """
+        return self._ratio()
+
+    def _calculate_batch(self, net_worth, dates):
+        """Calculates the rewards for (num_episodes, num_days + 1) net worth array.
+
+        Args:
+            net_worth: (num_episodes, num_days + 1) array with the net worth of every episode.
+            dates: a list of num_days + 1 dates of the trajectories.
+        """
+        valid, num_days = self._valid_steps(net_worth[:, :-1] > 0)
+        returns = np.where(valid, net_worth[:, 1:] / net_worth[:, :-1] - 1, 0)
+        count = np.cumsum(valid, axis=1)
+        shortfalls = np.where(valid, np.minimum(returns - self.target_return, 0), 0)
+        result = np.cumsum(returns, axis=1) / count - self.target_return
+        downside_deviation = np.sqrt(np.cumsum(shortfalls ** 2, axis=1) / count)
+        result = np.where(downside_deviation > 0, result / downside_deviation, result)
+        rewards = np.where(valid, result * self.scaling_factor, -1)
+
+        # The overall reward is the ratio after the last valid step.
+        last_result = result[np.arange(len(net_worth)), np.maximum(num_days - 1, 0)]
+        overall_rewards = np.where(num_days > 0, last_result, -self.target_return)
+        return rewards, overall_rewards * self.scaling_factor
+
+    # pylint: disable=unused-argument
+    def reset(self, observation, date):
+        """Resets the internal reward state.
+
+        Args:
+            observation: state of the reset environment.
+            date: datetime current date in the environment
+        """
+        self.prev_net_worth = observation["net_worth"]
+        self.returns = RunningMoments()
+        self.downside_deviation = DownsideDeviation(self.target_return)
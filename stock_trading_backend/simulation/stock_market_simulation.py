@@ -1,20 +1,31 @@
 """Class for running a simulation.
 """
-from datetime import datetime, timedelta
-
 import random
-import math
-import itertools
 
 import gym
 import numpy as np
-import pandas as pd
 
-from stock_trading_backend.data import create_data_collection
+from stock_trading_backend.simulation.market_data import MarketData
 from stock_trading_backend.simulation.reward_factory import create_reward
-from stock_trading_backend.util import read_config_file
+from stock_trading_backend.simulation.trade_execution import execute_trades
+from stock_trading_backend.simulation.trading_session import TradingSession
+
+
+def _delegate(owner, name):
+    """Returns a property that forwards an attribute to one of the components.
+
+    Args:
+        owner: the name of the component attribute.
+        name: the name of the attribute of the component.
+    """
+    def getter(self):
+        return getattr(getattr(self, owner), name)
+
+    def setter(self, value):
+        setattr(getattr(self, owner), name, value)
+
+    return property(getter, setter, doc="Property, {}.{}".format(owner, name))
 
-DEFAULT_DATA_COLLECTION_CONFIG_FILE = "data/default.yaml"
 
 # pylint: disable=too-many-instance-attributes
 class StockMarketSimulation(gym.Env):
@@ -30,6 +41,20 @@ class StockMarketSimulation(gym.Env):
 
         Note: See data sub-package for more information.
 
+        With observation_mode="array" the observation is a float vector with a fixed layout:
+        owned_<stock> flags, balance, net_worth and then the data collection features. The
+        layout is declared by observation_space, and feature_index maps feature names to
+        positions. The vector is a preallocated buffer that is overwritten on every step, copy
+        it if you need to keep it.
+
+        With observation_mode="history" the observation is a dict with "history", a read-only
+        (history_length, num_features) view of the data collection features for the last
+        history_length days (the current day is the last row), and "portfolio", a vector with
+        owned_<stock> flags, balance and net_worth. Episodes start at least history_length - 1
+        days after the first available date, so the history is always full. The features are
+        updated in place when the data changes on reset (e.g. randomized data, prefetch), so
+        copy the history if you need to keep it, e.g. in a replay buffer.
+
     Actions:
         Type: MultiDiscrete([3] * len(stock_names))
         Num Action
@@ -43,12 +68,21 @@ class StockMarketSimulation(gym.Env):
         Note: The simulation spends about 1 / max_stock_owned of the net-worth on each stock
         purchase.
 
+        Note: With decision_interval=k every step trades on the first day and holds the position
+        for the next k - 1 days (or until the end of the episode), the reward is the sum of the
+        daily rewards.
+
+        Note: step also accepts an integer action id (sum(action[i] * 3 ** i)). Legal actions and
+        their ids are cached per ownership mask, see legal_actions and legal_action_ids.
+
     Reward:
         Reward can be set up with the reward_config parameter. Available rewards:
 
         Name                Description
         sharpe_ratio        Returns sharpe ratio for the agent. Only works with real stock data.
         net_worth_ratio     Returns net_worth growth ratio - 1. (default)
+        sortino_ratio       Returns sortino ratio of the daily returns.
+        drawdown_penalty    Returns net_worth growth ratio - 1, penalized by max drawdown growth.
         constant            Returns the same value.
 
         Note: See reward classes for more information.
@@ -60,11 +94,62 @@ class StockMarketSimulation(gym.Env):
 
     Episode Termination:
         Episode length is greater than allowed.
+
+    Prefetch:
+        With prefetch=True and randomized data, the data for the next episode is prepared in a
+        background thread in a second data collection while the current episode runs, and reset
+        swaps the data collections. Call close() to stop the background thread.
+
+    Shared market data:
+        Market data (data collection, stock data, available dates) lives in a MarketData object
+        and the episode state (balance, owned stocks, reward state, observation cache) lives in
+        a TradingSession, the simulation forwards the attributes to them. Pass market_data to
+        run several simulations over a single copy of the prepared data. Shared market data is
+        not prepared again on reset, its owner calls market_data.reset() for new randomized data.
+
+    Snapshots:
+        snapshot() returns a token with the episode state (dates, balance, net worth, owned stocks,
+        reward state and observation cache), restore(token) brings the simulation back to it.
+        Market data is not copied, so a token is only valid until the next reset.
     """
+    # Market data, shared by the simulations created with the same MarketData.
+    data_collection_config = _delegate("market_data", "data_collection_config")
+    data_collection = _delegate("market_data", "data_collection")
+    stock_data = _delegate("market_data", "stock_data")
+    stock_names = _delegate("market_data", "stock_names")
+    available_dates = _delegate("market_data", "available_dates")
+    feature_index = _delegate("market_data", "feature_index")
+    from_date = _delegate("market_data", "from_date")
+    to_date = _delegate("market_data", "to_date")
+    prefetch_collection = _delegate("market_data", "prefetch_collection")
+    prefetch_executor = _delegate("market_data", "prefetch_executor")
+
+    # Episode state and settings of the session.
+    curr_date_index = _delegate("session", "curr_date_index")
+    from_date_index = _delegate("session", "from_date_index")
+    to_date_index = _delegate("session", "to_date_index")
+    balance = _delegate("session", "balance")
+    net_worth = _delegate("session", "net_worth")
+    owned_stocks = _delegate("session", "owned_stocks")
+    reward_config = _delegate("session", "reward_config")
+    reward_function = _delegate("session", "reward_function")
+    online_rewards = _delegate("session", "online_rewards")
+    saved_date_index = _delegate("session", "saved_date_index")
+    saved_observation = _delegate("session", "saved_observation")
+    observation_buffer = _delegate("session", "observation_buffer")
+    observation_mode = _delegate("session", "observation_mode")
+    decision_interval = _delegate("session", "decision_interval")
+    history_length = _delegate("session", "history_length")
+    commission = _delegate("session", "commission")
+    max_stock_owned = _delegate("session", "max_stock_owned")
+    hold_action = _delegate("session", "hold_action")
+
     # pylint: disable=too-many-arguments
     def __init__(self, data_collection_config=None, from_date=None, to_date=None, min_duration=0,
                  max_duration=0, min_start_balance=1000, max_start_balance=1000, commission=0,
-                 max_stock_owned=1, stock_data_randomization=False, reward_config=None):
+                 max_stock_owned=1, stock_data_randomization=False, reward_config=None,
+                 observation_mode="series", prefetch=False, decision_interval=1,
+                 history_length=1, resample_frequency=None, market_data=None):
         """Initializer for the simulation class.
 
         Args:
@@ -79,40 +164,31 @@ class StockMarketSimulation(gym.Env):
             max_stock_owned: a maximum number of different stocks that can be owned.
             stock_data_randomization: whether to add stock data randomization.
             reward_config: the configuration for the reward.
+            observation_mode: "series" for pandas Series observations, "array" for numpy ones,
+                              "history" for windows of features (see Observation).
+            prefetch: whether to prepare the data for the next episode in background.
+            decision_interval: the number of trading days per step.
+            history_length: the number of days in the history observation.
+            resample_frequency: "weekly" or "monthly" to step over coarser bars instead of days.
+            market_data: shared MarketData, if set, the data arguments above are ignored.
         """
-        if data_collection_config is None:
-            data_collection_config = read_config_file(DEFAULT_DATA_COLLECTION_CONFIG_FILE)
-        data_collection_config["stock_data_randomization"] = stock_data_randomization
-        self.data_collection_config = data_collection_config
-
-        if from_date is None and to_date is None:
-            from_date = datetime(2014, 1, 1)
-            to_date = datetime(2016, 1, 1)
-        elif from_date is None or to_date is None:
-            raise ValueError("Either both from and to dates are None or none of them.")
-
-        self.data_collection = create_data_collection(data_collection_config)
-
-        # Setup of simulation data.
-        stock_data_id = self.data_collection.absolute_stock_data_id
-        self.stock_data = self.data_collection.id_to_data[stock_data_id]
-        self.stock_names = self.data_collection.stock_names
-        self.balance = 0
-        self.net_worth = 0
-        self.owned_stocks = None
-
-        # Adding buffer days.
-        buffer = self.data_collection.get_buffer()
-        from_date -= timedelta(days=buffer)
-
-        # Setting date range for data collection.
-        self.data_collection.set_date_range(from_date, to_date)
-        self.data_collection.prepare_data()
-        self.available_dates = self.data_collection.get_available_dates()
-
-        # Setting duration range.
-        max_duration = min(max_duration, len(self.available_dates))
-        self.max_duration = max_duration if max_duration > 0 else len(self.available_dates)
+        TradingSession.check_settings(observation_mode, decision_interval, history_length)
+        self.owns_market_data = market_data is None
+        if market_data is None:
+            market_data = MarketData(data_collection_config, from_date, to_date,
+                                     stock_data_randomization, resample_frequency, prefetch)
+        self.market_data = market_data
+        self.session = TradingSession(market_data, reward_config, commission, max_stock_owned,
+                                      observation_mode, decision_interval, history_length)
+
+        # Setting duration range, episodes start after the first days of the history.
+        self.min_start_index = history_length - 1 if observation_mode == "history" else 0
+        num_dates = len(self.available_dates) - self.min_start_index
+        if self.min_start_index > 0 and num_dates < 1:
+            raise ValueError("History of {} days doesn't fit into {} available dates.".format(
+                history_length, len(self.available_dates)))
+        max_duration = min(max_duration, num_dates)
+        self.max_duration = max_duration if max_duration > 0 else num_dates
         self.min_duration = min_duration if min_duration > 0 else self.max_duration
         self.min_duration = min(self.max_duration, self.min_duration)
 
@@ -120,28 +196,21 @@ class StockMarketSimulation(gym.Env):
         self.min_start_balance = min_start_balance
         self.max_start_balance = max_start_balance
 
-        # Setting date tracking.
-        self.curr_date_index = -1
-        self.from_date_index = -1
-        self.to_date_index = -1
-
-        # Setting commission and max stock owned.
-        self.commission = commission
-        self.max_stock_owned = max_stock_owned
-
         # Setting up action space.
-        self.action_space = (
-            gym.spaces.MultiDiscrete([3] * len(self.data_collection.stock_names))
-        )
-
-        # Setting up reward function.
-        if reward_config is None:
-            reward_config = {"name": "net_worth_ratio_reward"}
-        self.reward_function = create_reward(reward_config, from_date, to_date)
-
-        # Setting up observation cache.
-        self.saved_date_index = -1
-        self.saved_observation = None
+        self.action_space = gym.spaces.MultiDiscrete([3] * len(self.stock_names))
+
+        # Setting up observation space.
+        self.observation_space = gym.spaces.Box(low=-np.inf, high=np.inf,
+                                                shape=(len(self.feature_index),),
+                                                dtype=np.float64)
+        if observation_mode == "history":
+            num_features = len(self.data_collection.feature_names)
+            self.observation_space = gym.spaces.Dict({
+                "history": gym.spaces.Box(low=-np.inf, high=np.inf,
+                                          shape=(history_length, num_features), dtype=np.float64),
+                "portfolio": gym.spaces.Box(low=-np.inf, high=np.inf,
+                                            shape=(len(self.stock_names) + 2,), dtype=np.float64),
+            })
 
     def action_space_generator(self):
         """Generator for action space.
@@ -153,130 +222,177 @@ class StockMarketSimulation(gym.Env):
         Returns:
             Generator obejct with all possible actions.
         """
-        num_owned_stocks = np.count_nonzero(self.owned_stocks)
-        num_not_owned_stocks = len(self.owned_stocks) - num_owned_stocks
-        num_possible_to_purchase = self.max_stock_owned - num_owned_stocks
-
-        for num_purchases in range(num_possible_to_purchase + 1):
-            indexes_iter = itertools.combinations(range(num_not_owned_stocks), num_purchases)
-            for indexes in indexes_iter:
-                sell_actions = itertools.product([0, 1], repeat=num_owned_stocks)
-                purchase_action = [1] * num_not_owned_stocks
-                for i in indexes:
-                    purchase_action[i] = 2
-                for sell_action in sell_actions:
-                    action = [0] * len(self.owned_stocks)
-                    sell_index, purchase_index = 0, 0
-                    for i, owned_num in enumerate(self.owned_stocks):
-                        if owned_num > 0:
-                            action[i] = sell_action[sell_index]
-                            sell_index += 1
-                        else:
-                            action[i] = purchase_action[purchase_index]
-                            purchase_index += 1
-                    yield action
+        return iter(self.legal_actions().tolist())
+
+    @property
+    def action_cache(self):
+        """Property, shared cache of legal actions for the simulation set up.
+        """
+        return self.session.action_cache
+
+    def legal_actions(self):
+        """Returns all legal actions for the current owned stocks.
+
+        Returns:
+            Read-only (num_actions, num_stocks) array with the actions.
+        """
+        return self.session.legal_actions()
+
+    def legal_action_ids(self):
+        """Returns ids of all legal actions for the current owned stocks.
+
+        Returns:
+            Read-only (num_actions,) array with the action ids.
+        """
+        return self.session.legal_action_ids()
 
     @property
     def overall_reward(self):
         """Property, returns overall reward for the current episode.
         """
-        return self.reward_function.calculate_overall_reward()
+        return self.session.overall_reward
 
     @property
     def done(self):
         """Property, true if episode finished.
         """
-        return self.curr_date_index >= self.to_date_index
+        return self.session.done
 
     @property
     def observation(self):
         """Property for current observation.
         """
-        if self.saved_date_index == self.curr_date_index:
-            return self.saved_observation
-
-        self.saved_date_index = self.curr_date_index
-        owned_stocks = pd.Series(np.where(self.owned_stocks > 0, 1, 0),
-                                 ["owned_{}".format(name) for name in self.stock_names])
-        balance_and_net_worth = pd.Series([self.balance, self.net_worth], ["balance", "net_worth"])
-        data = self.data_collection[self.available_dates[self.curr_date_index]]
-        self.saved_observation = pd.concat([owned_stocks, balance_and_net_worth, data])
-        return self.saved_observation
-
-    # pylint: disable=too-many-locals
+        return self.session.observation
+
+    @property
+    def reward_observation(self):
+        """Property, observation that is passed to the reward function.
+        """
+        return self.session.reward_observation
+
     def step(self, action):
-        """Simulate a single day of trading given the action.
+        """Simulate decision_interval days of trading given the action.
 
         Args:
-            action: a list of 1/0 (action/hold), where ith element shows what to do with ith stock.
+            action: a list of 0/1/2 (sell/hold/buy), where ith element shows what to do with ith
+                    stock, or an integer action id.
 
         Returns:
             observation: a row of data source.
             reward: a number representing the reward associated with the action.
             done: True if the episode is finished
         """
-        curr_date = self.available_dates[self.curr_date_index]
-        next_date = self.available_dates[self.curr_date_index + 1]
-
-        # Load state values
-        stock_prices = self.stock_data[curr_date].to_numpy()
-        num_owned_stocks = np.count_nonzero(self.owned_stocks)
-        if num_owned_stocks < self.max_stock_owned:
-            max_purchase_price = self.balance / (self.max_stock_owned - num_owned_stocks)
-            max_purchase_price /= 1 + self.commission
-        else:
-            max_purchase_price = 0
-
-        # Simulate buy and sell actions
-        sale_return = 0
-        purchase_price = 0
-        for index, sub_action in enumerate(action):
-            if sub_action == 0 and self.owned_stocks[index] > 0:
-                sale_return += self.owned_stocks[index] * stock_prices[index]
-                self.owned_stocks[index] = 0
-            elif (sub_action == 2 and num_owned_stocks < self.max_stock_owned and
-                  self.owned_stocks[index] == 0):
-                num_stock_purchased = math.floor(max_purchase_price / stock_prices[index])
-                if num_stock_purchased > 0:
-                    num_owned_stocks += 1
-                    purchase_price += num_stock_purchased * stock_prices[index]
-                    self.owned_stocks[index] = num_stock_purchased
-        sale_return *= 1 - self.commission
-        purchase_price *= 1 + self.commission
-        self.balance += sale_return - purchase_price
-
-        # Update internal state vales.
-        self.curr_date_index += 1
-        self.net_worth = self.balance + sum(self.owned_stocks * stock_prices)
-        reward = self.reward_function.calculate_value(self.observation, next_date)
-        return self.observation, reward, self.done
+        return self.session.step(action)
+
+    # pylint: disable=too-many-arguments, too-many-locals
+    def replay(self, start_index, start_balance, actions, commission=None, max_stock_owned=None):
+        """Replays whole action sequences, starting with no owned stocks.
+
+        Doesn't change the state of the current episode. Trades are executed exactly as in step,
+        rewards are calculated for all of the sequences at once with calculate_batch of a new
+        reward function set up with reward_config.
+
+        Args:
+            start_index: the index of the first date in the available dates.
+            start_balance: the starting balance (or an array with one per sequence).
+            actions: (num_days, num_stocks) array with the actions for every day, or
+                     (num_sequences, num_days, num_stocks) array with multiple sequences.
+            commission: relative commission for each transcation (default: self.commission).
+            max_stock_owned: a maximum number of different stocks that can be owned
+                             (default: self.max_stock_owned).
+
+        Returns:
+            Dict with histories, every history has num_days + 1 values (with the starting state)
+            except for the reward history. With multiple sequences the first dimension of every
+            value is the sequence:
+                balance_history: (num_days + 1) array with balances.
+                owned_stocks_history: (num_days + 1, num_stocks) array with owned stocks.
+                net_worth_history: (num_days + 1) array with net worths.
+                reward_history: (num_days) array with rewards.
+                overall_reward: the overall reward for the sequence.
+        """
+        actions = np.asarray(actions)
+        single_sequence = actions.ndim == 2
+        if single_sequence:
+            actions = actions[np.newaxis]
+        num_sequences, num_days, num_stocks = actions.shape
+        if start_index < 0 or start_index + num_days >= len(self.available_dates):
+            raise ValueError("Can't replay {} days starting from {}, there are {} dates.".format(
+                num_days, start_index, len(self.available_dates)))
+        if commission is None:
+            commission = self.commission
+        if max_stock_owned is None:
+            max_stock_owned = self.max_stock_owned
+
+        balance_history = np.empty((num_sequences, num_days + 1))
+        owned_stocks_history = np.empty((num_sequences, num_days + 1, num_stocks))
+        net_worth_history = np.empty((num_sequences, num_days + 1))
+        balance_history[:, 0] = start_balance
+        owned_stocks_history[:, 0] = 0
+        net_worth_history[:, 0] = start_balance
+
+        stock_prices = self.data_collection.price_matrix[start_index:start_index + num_days]
+        for day in range(num_days):
+            balance, owned_stocks, net_worth = execute_trades(
+                balance_history[:, day], owned_stocks_history[:, day], stock_prices[day],
+                actions[:, day], commission, max_stock_owned)
+            balance_history[:, day + 1] = balance
+            owned_stocks_history[:, day + 1] = owned_stocks
+            net_worth_history[:, day + 1] = net_worth
+
+        reward_function = create_reward(self.reward_config, self.from_date, self.to_date)
+        dates = self.available_dates[start_index:start_index + num_days + 1]
+        reward_history, overall_reward = reward_function.calculate_batch(net_worth_history, dates)
+        result = {
+            "balance_history": balance_history,
+            "owned_stocks_history": owned_stocks_history,
+            "net_worth_history": net_worth_history,
+            "reward_history": reward_history,
+            "overall_reward": overall_reward,
+        }
+        if single_sequence:
+            result = {key: value[0] for key, value in result.items()}
+        return result
+
+    def _reset_data(self):
+        """Prepares the market data for the next episode, unless it is shared.
+        """
+        if self.owns_market_data:
+            self.market_data.reset()
 
     def reset(self):
         """Resets the simulation environment.
         """
-        self.data_collection.reset()
-        self.data_collection.prepare_data()
+        self._reset_data()
 
-        # Setting from date, to date for the next episode.
+        # Setting from date, to date and balance for the next episode.
         duration = random.randint(self.min_duration, self.max_duration)
-        curr_date_index = random.randint(0, len(self.available_dates) - duration)
-        self.from_date_index = curr_date_index
-        self.curr_date_index = curr_date_index
-        self.to_date_index = curr_date_index + duration - 1
-
-        # Setting balance and net worth for the first day.
-        curr_date = self.available_dates[curr_date_index]
-        self.balance = random.randint(self.min_start_balance, self.max_start_balance)
-        self.net_worth = self.balance
-        self.owned_stocks = np.zeros(len(self.stock_names))
-
-        # Reset observation cache.
-        self.saved_date_index = -1
-        self.saved_observation = None
-
-        # Reset the reward function.
-        self.reward_function.reset(self.observation, curr_date)
-        return self.observation
+        curr_date_index = random.randint(self.min_start_index,
+                                         len(self.available_dates) - duration)
+        balance = random.randint(self.min_start_balance, self.max_start_balance)
+        return self.session.start(curr_date_index, duration, balance)
+
+    def snapshot(self):
+        """Saves the state of the current episode.
+
+        Returns:
+            Token to pass to restore.
+        """
+        return self.session.snapshot()
+
+    def restore(self, token):
+        """Restores the state of the episode saved with snapshot.
+
+        Args:
+            token: the token returned by snapshot.
+        """
+        self.session.restore(token)
+
+    def close(self):
+        """Stops the data prefetch.
+        """
+        if self.owns_market_data:
+            self.market_data.close()
 
     def render(self, mode="human"):
         """Renders current situation.
@@ -0,0 +1,273 @@
+"""Class for running multiple simulations in worker processes.
+"""
+import multiprocessing
+import random
+
+import gym
+import numpy as np
+import pandas as pd
+
+from stock_trading_backend.simulation.action_cache import get_action_cache
+from stock_trading_backend.simulation.stock_market_simulation import StockMarketSimulation
+from stock_trading_backend.simulation.vector_stock_market_simulation import EpisodeView
+
+
+def _worker(connection, seed, simulation_kwargs):
+    """Worker process loop, owns a single StockMarketSimulation.
+
+    Receives (command, data) tuples and sends back (success, result) tuples.
+
+    Args:
+        connection: the worker end of the pipe.
+        seed: the seed for random number generators of the worker.
+        simulation_kwargs: arguments for the StockMarketSimulation.
+    """
+    random.seed(seed)
+    np.random.seed(seed)
+    simulation = None
+    observation = None
+    while True:
+        command, data = connection.recv()
+        try:
+            if command == "init":
+                simulation = StockMarketSimulation(**simulation_kwargs)
+                result = (simulation.stock_names, simulation.action_space,
+                          simulation.observation_space, simulation.feature_index)
+            elif command == "reset":
+                observation = simulation.reset()
+                result = (observation, simulation.done, simulation.owned_stocks)
+            elif command == "step":
+                reward = 0
+                if not simulation.done:
+                    observation, reward, _ = simulation.step(data)
+                result = (observation, reward, simulation.done, simulation.owned_stocks)
+            elif command == "overall_reward":
+                result = simulation.overall_reward
+            elif command == "close":
+                if simulation is not None:
+                    simulation.close()
+                connection.send((True, None))
+                break
+            else:
+                raise ValueError("Unknown command {}".format(command))
+        # pylint: disable=broad-except
+        except Exception as error: # pragma: no cover
+            connection.send((False, error))
+            continue
+        connection.send((True, result))
+    connection.close()
+
+
+# pylint: disable=too-many-instance-attributes
+class SubprocessVectorStockMarketSimulation(gym.Env):
+    """
+    Description:
+        A simulation of the stock market, which runs num_envs independent episodes in worker
+        processes.
+
+        Each worker process owns one StockMarketSimulation built from the same arguments, actions
+        and observations are exchanged over pipes. Observations, rewards and done masks have the
+        same format as in VectorStockMarketSimulation, so the learner in the main process can use
+        either of them.
+
+        Note: call close() (or use the simulation as a context manager) to stop the workers.
+    """
+    def __init__(self, num_envs=4, start_method=None, **simulation_kwargs):
+        """Initializer for the subprocess vector simulation class.
+
+        Args:
+            num_envs: the number of worker processes (episodes run at once).
+            start_method: multiprocessing start method, platform default if None.
+            simulation_kwargs: arguments for StockMarketSimulation in every worker.
+        """
+        if num_envs < 1:
+            raise ValueError("Expected at least 1 environment, got {}".format(num_envs))
+        self.num_envs = num_envs
+        self.observation_mode = simulation_kwargs.get("observation_mode", "series")
+        self.max_stock_owned = simulation_kwargs.get("max_stock_owned", 1)
+
+        context = multiprocessing.get_context(start_method)
+        self.connections = []
+        self.processes = []
+        for _ in range(num_envs):
+            connection, worker_connection = context.Pipe()
+            process = context.Process(target=_worker, daemon=True,
+                                      args=(worker_connection, random.randrange(2 ** 32),
+                                            simulation_kwargs))
+            process.start()
+            worker_connection.close()
+            self.connections.append(connection)
+            self.processes.append(process)
+        self.closed = False
+
+        # Setting up the spaces.
+        results = self._call_all("init")
+        self.stock_names, self.single_action_space, self.single_observation_space, \
+            self.feature_index = results[0]
+        num_stocks = len(self.stock_names)
+        self.action_space = gym.spaces.MultiDiscrete(np.full((num_envs, num_stocks), 3))
+        self.observation_space = gym.spaces.Box(low=-np.inf, high=np.inf,
+                                                shape=(num_envs, len(self.feature_index)),
+                                                dtype=np.float64)
+        if self.observation_mode == "history":
+            self.observation_space = gym.spaces.Dict({
+                key: gym.spaces.Box(low=-np.inf, high=np.inf, shape=(num_envs,) + space.shape,
+                                    dtype=np.float64)
+                for key, space in self.single_observation_space.spaces.items()})
+
+        # Setting up state mirrored from the workers.
+        self.owned_stocks = np.zeros((num_envs, num_stocks))
+        self.done = np.ones(num_envs, dtype=bool)
+        self.observation = None
+
+    def _send_all(self, command, data=None):
+        """Sends the command to all of the workers.
+
+        Args:
+            command: the name of the command.
+            data: a list with data for each worker, or None.
+        """
+        for index, connection in enumerate(self.connections):
+            connection.send((command, None if data is None else data[index]))
+
+    def _receive_all(self):
+        """Receives the results from all of the workers.
+
+        Returns:
+            A list with the result for each worker.
+        """
+        results = []
+        for connection in self.connections:
+            success, result = connection.recv()
+            if not success: # pragma: no cover
+                raise result
+            results.append(result)
+        return results
+
+    def _call_all(self, command, data=None):
+        """Sends the command to all of the workers and waits for the results.
+
+        Args:
+            command: the name of the command.
+            data: a list with data for each worker, or None.
+
+        Returns:
+            A list with the result for each worker.
+        """
+        self._send_all(command, data)
+        return self._receive_all()
+
+    def _stack_observations(self, observations):
+        """Combines observations of the workers into a batched observation.
+
+        Args:
+            observations: a list of observations, one per worker.
+        """
+        if self.observation_mode == "array":
+            return np.stack(observations)
+        if self.observation_mode == "history":
+            return {key: np.stack([observation[key] for observation in observations])
+                    for key in observations[0]}
+        return pd.DataFrame(observations).reset_index(drop=True)
+
+    @property
+    def action_cache(self):
+        """Property, shared cache of legal actions for the simulation set up.
+        """
+        return get_action_cache(len(self.stock_names), self.max_stock_owned)
+
+    def action_space_generator(self, index=0):
+        """Generator for action space of the ith episode.
+
+        Args:
+            index: the index of the episode.
+
+        Returns:
+            Generator obejct with all possible actions.
+        """
+        return iter(self.legal_actions(index).tolist())
+
+    def legal_actions(self, index=0):
+        """Returns all legal actions for the ith episode.
+
+        Args:
+            index: the index of the episode.
+
+        Returns:
+            Read-only (num_actions, num_stocks) array with the actions.
+        """
+        return self.action_cache.legal_actions(self.owned_stocks[index])
+
+    def legal_action_ids(self, index=0):
+        """Returns ids of all legal actions for the ith episode.
+
+        Args:
+            index: the index of the episode.
+
+        Returns:
+            Read-only (num_actions,) array with the action ids.
+        """
+        return self.action_cache.legal_action_ids(self.owned_stocks[index])
+
+    def episode(self, index):
+        """Returns a view of a single episode.
+
+        Args:
+            index: the index of the episode.
+
+        Returns:
+            EpisodeView for the episode.
+        """
+        return EpisodeView(self, index)
+
+    @property
+    def overall_reward(self):
+        """Property, returns array with overall rewards for the current episodes.
+        """
+        return np.array(self._call_all("overall_reward"))
+
+    def step(self, action):
+        """Simulate a single day of trading for all of the unfinished episodes.
+
+        Args:
+            action: (num_envs, num_stocks) array with an action for each episode, or (num_envs,)
+                    array with action ids.
+
+        Returns:
+            observation: batched observations (see VectorStockMarketSimulation).
+            reward: array with the reward for each episode.
+            done: boolean mask, true for the finished episodes.
+        """
+        results = self._call_all("step", list(np.asarray(action)))
+        observations, rewards, dones, owned_stocks = zip(*results)
+        self.observation = self._stack_observations(observations)
+        self.owned_stocks = np.array(owned_stocks)
+        self.done = np.array(dones)
+        return self.observation, np.array(rewards, dtype=np.float64), self.done
+
+    def reset(self):
+        """Resets all of the episodes of the simulation environment.
+        """
+        results = self._call_all("reset")
+        observations, dones, owned_stocks = zip(*results)
+        self.observation = self._stack_observations(observations)
+        self.owned_stocks = np.array(owned_stocks)
+        self.done = np.array(dones)
+        return self.observation
+
+    def close(self):
+        """Stops the worker processes.
+        """
+        if self.closed:
+            return
+        self._call_all("close")
+        for process in self.processes:
+            process.join()
+        self.closed = True
+
+    def render(self, mode="human"):
+        """Renders current situation.
+
+        Args:
+            mode: something
+        """
@@ -0,0 +1,63 @@
+"""Vectorized execution of trades for the stock market simulation.
+"""
+import numpy as np
+
+
+# pylint: disable=too-many-arguments
+def execute_trades(balance, owned_stocks, stock_prices, actions, commission=0, max_stock_owned=1):
+    """Executes sell and buy actions with masked array operations.
+
+    All of the arguments can be batched: stock related arrays have num_stocks as the last
+    dimension, the leading dimensions (if any) are shared with balance, commission and
+    max_stock_owned.
+
+    Semantics:
+        Sell (0) sells all shares of an owned stock. Buy (2) spends up to
+        balance / (max_stock_owned - num_owned_stocks) on a stock that is not owned, where both
+        balance and num_owned_stocks are taken before the trades. Buys are filled in stock order
+        until max_stock_owned is reached, sold stocks still count towards the limit. Stocks with
+        non-positive prices are not bought. Commission is applied on both sides.
+
+    Args:
+        balance: the balance before the trades.
+        owned_stocks: the number of owned shares for each stock.
+        stock_prices: the prices of the stocks.
+        actions: 0/1/2 (sell/hold/buy) for each stock.
+        commission: relative commission for each transcation.
+        max_stock_owned: a maximum number of different stocks that can be owned.
+
+    Returns:
+        balance: the balance after the trades.
+        owned_stocks: the number of owned shares for each stock after the trades.
+        net_worth: the net worth after the trades.
+    """
+    balance = np.asarray(balance, dtype=np.float64)
+    owned_stocks = np.asarray(owned_stocks, dtype=np.float64)
+    stock_prices = np.asarray(stock_prices, dtype=np.float64)
+    actions = np.asarray(actions)
+    commission = np.asarray(commission, dtype=np.float64)
+    max_stock_owned = np.asarray(max_stock_owned)
+
+    # Load state values
+    num_free_slots = max_stock_owned - np.count_nonzero(owned_stocks, axis=-1)
+    max_purchase_price = np.where(num_free_slots > 0, balance / np.maximum(num_free_slots, 1), 0)
+    max_purchase_price = max_purchase_price / (1 + commission)
+
+    # Simulate sell actions
+    sell = (actions == 0) & (owned_stocks > 0)
+    sale_return = np.sum(np.where(sell, owned_stocks * stock_prices, 0), axis=-1)
+
+    # Simulate buy actions
+    buyable = stock_prices > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        num_stock_purchased = np.floor(np.expand_dims(max_purchase_price, -1)
+                                       / np.where(buyable, stock_prices, 1))
+    candidates = (actions == 2) & (owned_stocks == 0) & buyable & (num_stock_purchased > 0)
+    buy = candidates & (np.cumsum(candidates, axis=-1) <= np.expand_dims(num_free_slots, -1))
+    purchase_price = np.sum(np.where(buy, num_stock_purchased * stock_prices, 0), axis=-1)
+
+    # Update state values
+    owned_stocks = np.where(sell, 0, np.where(buy, num_stock_purchased, owned_stocks))
+    balance = balance + sale_return * (1 - commission) - purchase_price * (1 + commission)
+    net_worth = balance + np.sum(owned_stocks * stock_prices, axis=-1)
+    return balance, owned_stocks, net_worth
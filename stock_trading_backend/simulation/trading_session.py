@@ -0,0 +1,287 @@
+"""Class for the state of a single trading episode.
+"""
+import copy
+
+import numpy as np
+import pandas as pd
+
+from stock_trading_backend.simulation.action_cache import get_action_cache
+from stock_trading_backend.simulation.reward_factory import create_reward
+from stock_trading_backend.simulation.trade_execution import execute_trades
+
+OBSERVATION_MODES = ["series", "array", "history"]
+
+
+# pylint: disable=too-many-instance-attributes
+class TradingSession:
+    """The state of a single trading episode over shared market data.
+
+    A session holds only the mutable episode state (dates, balance, net worth, owned stocks,
+    reward state and observation cache), the market data is read from MarketData. Sessions are
+    cheap, so one process can run many of them over a single copy of the prepared data.
+
+    The semantics of observations, actions and rewards are the same as in StockMarketSimulation.
+    """
+    state_attributes = ("curr_date_index", "from_date_index", "to_date_index", "balance",
+                        "net_worth", "owned_stocks")
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, market_data, reward_config=None, commission=0, max_stock_owned=1,
+                 observation_mode="series", decision_interval=1, history_length=1):
+        """Initializer for the trading session class.
+
+        Args:
+            market_data: the MarketData to trade on.
+            reward_config: the configuration for the reward.
+            commission: relative commission for each transcation.
+            max_stock_owned: a maximum number of different stocks that can be owned.
+            observation_mode: "series" for pandas Series observations, "array" for numpy ones,
+                              "history" for windows of features.
+            decision_interval: the number of trading days per step.
+            history_length: the number of days in the history observation.
+        """
+        self.check_settings(observation_mode, decision_interval, history_length)
+        self.market_data = market_data
+        self.stock_names = market_data.stock_names
+        self.observation_mode = observation_mode
+        self.decision_interval = decision_interval
+        self.history_length = history_length
+        self.commission = commission
+        self.max_stock_owned = max_stock_owned
+        self.hold_action = np.ones(len(self.stock_names), dtype=np.int8)
+
+        # Setting episode state.
+        self.balance = 0
+        self.net_worth = 0
+        self.owned_stocks = None
+        self.curr_date_index = -1
+        self.from_date_index = -1
+        self.to_date_index = -1
+
+        # Setting up reward function.
+        if reward_config is None:
+            reward_config = {"name": "net_worth_ratio_reward"}
+        self.reward_config = reward_config
+        self.reward_function = create_reward(reward_config, market_data.from_date,
+                                             market_data.to_date)
+        # Whether step calculates rewards, callers that calculate the rewards of the whole
+        # episode at once with calculate_batch (e.g. backtest) turn it off, step returns 0 then.
+        self.online_rewards = True
+
+        # Setting up observation cache.
+        self.observation_buffer = np.zeros(len(market_data.feature_index))
+        self.saved_date_index = -1
+        self.saved_observation = None
+
+    @staticmethod
+    def check_settings(observation_mode, decision_interval, history_length):
+        """Checks the session settings, raises ValueError if they are not supported.
+
+        Args:
+            observation_mode: the observation mode.
+            decision_interval: the number of trading days per step.
+            history_length: the number of days in the history observation.
+        """
+        if observation_mode not in OBSERVATION_MODES:
+            raise ValueError("Observation mode {} is not supported.".format(observation_mode))
+        if decision_interval < 1:
+            raise ValueError("Expected positive decision interval, got {}".format(
+                decision_interval))
+        if history_length < 1:
+            raise ValueError("Expected positive history length, got {}".format(history_length))
+
+    @property
+    def action_cache(self):
+        """Property, shared cache of legal actions for the session set up.
+        """
+        return get_action_cache(len(self.stock_names), self.max_stock_owned)
+
+    def action_space_generator(self):
+        """Generator for action space.
+
+        Returns:
+            Generator obejct with all possible actions.
+        """
+        return iter(self.legal_actions().tolist())
+
+    def legal_actions(self):
+        """Returns all legal actions for the current owned stocks.
+
+        Returns:
+            Read-only (num_actions, num_stocks) array with the actions.
+        """
+        return self.action_cache.legal_actions(self.owned_stocks)
+
+    def legal_action_ids(self):
+        """Returns ids of all legal actions for the current owned stocks.
+
+        Returns:
+            Read-only (num_actions,) array with the action ids.
+        """
+        return self.action_cache.legal_action_ids(self.owned_stocks)
+
+    @property
+    def overall_reward(self):
+        """Property, returns overall reward for the current episode.
+        """
+        return self.reward_function.calculate_overall_reward()
+
+    @property
+    def done(self):
+        """Property, true if episode finished.
+        """
+        return self.curr_date_index >= self.to_date_index
+
+    @property
+    def observation(self):
+        """Property for current observation.
+
+        History observations are read-only views into the data collection features, which
+        change when the market data is reset, so they have to be copied to be kept.
+        """
+        if self.saved_date_index == self.curr_date_index:
+            return self.saved_observation
+
+        self.saved_date_index = self.curr_date_index
+        data_collection = self.market_data.data_collection
+        if self.observation_mode == "array":
+            num_stocks = len(self.stock_names)
+            buffer = self.observation_buffer
+            np.greater(self.owned_stocks, 0, out=buffer[:num_stocks])
+            buffer[num_stocks] = self.balance
+            buffer[num_stocks + 1] = self.net_worth
+            buffer[num_stocks + 2:] = data_collection.row(self.curr_date_index)
+            self.saved_observation = buffer
+            return buffer
+
+        if self.observation_mode == "history":
+            windows = data_collection.history_windows(self.history_length)
+            portfolio = np.empty(len(self.stock_names) + 2)
+            np.greater(self.owned_stocks, 0, out=portfolio[:-2])
+            portfolio[-2:] = self.balance, self.net_worth
+            self.saved_observation = {
+                "history": windows[self.curr_date_index - self.history_length + 1],
+                "portfolio": portfolio,
+            }
+            return self.saved_observation
+
+        owned_stocks = pd.Series(np.where(self.owned_stocks > 0, 1, 0),
+                                 ["owned_{}".format(name) for name in self.stock_names])
+        balance_and_net_worth = pd.Series([self.balance, self.net_worth], ["balance", "net_worth"])
+        data = pd.Series(data_collection.row(self.curr_date_index), data_collection.feature_names)
+        self.saved_observation = pd.concat([owned_stocks, balance_and_net_worth, data])
+        return self.saved_observation
+
+    @property
+    def reward_observation(self):
+        """Property, observation that is passed to the reward function.
+
+        Rewards look up values by name, so array and history observations are replaced with a
+        dict.
+        """
+        if self.observation_mode != "series":
+            return {"balance": self.balance, "net_worth": self.net_worth}
+        return self.observation
+
+    def start(self, start_index, duration, balance):
+        """Starts a new episode with no owned stocks.
+
+        Args:
+            start_index: the index of the first date in the available dates.
+            duration: the number of dates in the episode.
+            balance: the starting balance.
+
+        Returns:
+            The observation for the first date.
+        """
+        self.from_date_index = start_index
+        self.curr_date_index = start_index
+        self.to_date_index = start_index + duration - 1
+
+        # Setting balance and net worth for the first day.
+        self.balance = balance
+        self.net_worth = balance
+        self.owned_stocks = np.zeros(len(self.stock_names))
+
+        # Reset observation cache.
+        self.saved_date_index = -1
+        self.saved_observation = None
+
+        # Reset the reward function.
+        curr_date = self.market_data.available_dates[start_index]
+        self.reward_function.set_available_dates(self.market_data.available_dates)
+        self.reward_function.reset(self.reward_observation, curr_date)
+        return self.observation
+
+    def step(self, action):
+        """Simulate decision_interval days of trading given the action.
+
+        Args:
+            action: a list of 0/1/2 (sell/hold/buy), where ith element shows what to do with ith
+                    stock, or an integer action id.
+
+        Returns:
+            observation: a row of data source.
+            reward: a number representing the reward associated with the action.
+            done: True if the episode is finished
+        """
+        if np.ndim(action) == 0:
+            action = self.action_cache.decode(action)
+        reward = self._step_day(action)
+        for _ in range(self.decision_interval - 1):
+            if self.done:
+                break
+            reward += self._step_day(self.hold_action)
+        return self.observation, reward, self.done
+
+    def _step_day(self, action):
+        """Simulate a single day of trading given the action.
+
+        Args:
+            action: a list of 0/1/2 (sell/hold/buy).
+
+        Returns:
+            The reward for the day.
+        """
+        next_date = self.market_data.available_dates[self.curr_date_index + 1]
+
+        # Simulate buy and sell actions
+        stock_prices = self.market_data.data_collection.prices(self.curr_date_index)
+        self.balance, self.owned_stocks, self.net_worth = execute_trades(
+            self.balance, self.owned_stocks, stock_prices, action, self.commission,
+            self.max_stock_owned)
+
+        # Update internal state vales.
+        self.curr_date_index += 1
+        if not self.online_rewards:
+            return 0
+        return self.reward_function.calculate_value(self.reward_observation, next_date)
+
+    def snapshot(self):
+        """Saves the state of the current episode.
+
+        Returns:
+            Token to pass to restore.
+        """
+        token = {name: copy.copy(getattr(self, name)) for name in self.state_attributes}
+        token["reward_state"] = self.reward_function.get_state()
+        token["saved_date_index"] = self.saved_date_index
+        token["saved_observation"] = self.saved_observation
+        if isinstance(self.saved_observation, np.ndarray):
+            token["saved_observation"] = self.saved_observation.copy()
+        return token
+
+    def restore(self, token):
+        """Restores the state of the episode saved with snapshot.
+
+        Args:
+            token: the token returned by snapshot.
+        """
+        for name in self.state_attributes:
+            setattr(self, name, copy.copy(token[name]))
+        self.reward_function.set_state(token["reward_state"])
+        self.saved_date_index = token["saved_date_index"]
+        self.saved_observation = token["saved_observation"]
+        if isinstance(self.saved_observation, np.ndarray):
+            np.copyto(self.observation_buffer, self.saved_observation)
+            self.saved_observation = self.observation_buffer
@@ -0,0 +1,366 @@
+"""Class for running multiple simulations at once.
+"""
+import random
+
+import gym
+import numpy as np
+import pandas as pd
+
+from stock_trading_backend.simulation.reward_factory import create_reward
+from stock_trading_backend.simulation.stock_market_simulation import StockMarketSimulation
+from stock_trading_backend.simulation.trade_execution import execute_trades
+
+
+class EpisodeView:
+    """A view of a single episode of the vector simulation.
+
+    Exposes the part of the StockMarketSimulation interface that agents rely on, so that agents
+    can make decisions for a single episode of the vector simulation.
+    """
+    def __init__(self, simulation, index):
+        """Initializer for the episode view.
+
+        Args:
+            simulation: the VectorStockMarketSimulation that runs the episode.
+            index: the index of the episode in the simulation.
+        """
+        self.simulation = simulation
+        self.index = index
+        self.action_space = simulation.single_action_space
+
+    @property
+    def owned_stocks(self):
+        """Property, owned stocks for the episode.
+        """
+        return self.simulation.owned_stocks[self.index]
+
+    @property
+    def max_stock_owned(self):
+        """Property, a maximum number of different stocks that can be owned.
+        """
+        return self.simulation.max_stock_owned
+
+    def action_space_generator(self):
+        """Generator for action space of the episode.
+
+        Returns:
+            Generator obejct with all possible actions.
+        """
+        return self.simulation.action_space_generator(self.index)
+
+    def legal_actions(self):
+        """Returns all legal actions for the episode.
+
+        Returns:
+            Read-only (num_actions, num_stocks) array with the actions.
+        """
+        return self.simulation.legal_actions(self.index)
+
+    def legal_action_ids(self):
+        """Returns ids of all legal actions for the episode.
+
+        Returns:
+            Read-only (num_actions,) array with the action ids.
+        """
+        return self.simulation.legal_action_ids(self.index)
+
+
+# pylint: disable=too-many-instance-attributes
+class VectorStockMarketSimulation(StockMarketSimulation):
+    """
+    Description:
+        A simulation of the stock market, which runs num_envs independent episodes at once.
+
+        Each episode has its own date window, balance and owned stocks. Market data is prepared
+        once and is shared between all of the episodes. Balances and net worths are stored as
+        (num_envs,) arrays, owned stocks are stored as (num_envs, num_stocks) array.
+
+    Observation:
+        DataFrame with num_envs rows, ith row is the observation of the ith episode. Columns are
+        the same as in the StockMarketSimulation observation.
+
+        With observation_mode="array" the observation is a (num_envs, num_features) buffer, ith row
+        has the same layout as the StockMarketSimulation array observation.
+
+    Actions:
+        Type: MultiDiscrete([[3] * len(stock_names)] * num_envs)
+        ith row is the action for the ith episode (see StockMarketSimulation).
+
+    Reward:
+        Array with num_envs rewards, one per episode. Each episode has its own reward function.
+
+    Episode Termination:
+        done is a boolean mask with one value per episode. Actions for the finished episodes are
+        ignored, their reward is 0, and their state is kept until the next reset.
+    """
+    # pylint: disable=too-many-arguments
+    def __init__(self, data_collection_config=None, from_date=None, to_date=None, min_duration=0,
+                 max_duration=0, min_start_balance=1000, max_start_balance=1000, commission=0,
+                 max_stock_owned=1, stock_data_randomization=False, reward_config=None,
+                 observation_mode="series", num_envs=4, prefetch=False, decision_interval=1,
+                 resample_frequency=None):
+        """Initializer for the vector simulation class.
+
+        Args:
+            data_collection_config: configuration of the data configuration.
+            from_date: datetime date for the start of the range
+            to_date: datetime date for the end of the range
+            min_duration: minimum length of the episode.
+            max_duration: maximum length of the episode (if 0 will run for all available dates).
+            min_start_balance: minimum starting balance.
+            max_start_balance: maximum starting balance. Balance selected unifromly.
+            commission: relative commission for each transcation.
+            max_stock_owned: a maximum number of different stocks that can be owned.
+            stock_data_randomization: whether to add stock data randomization.
+            reward_config: the configuration for the reward.
+            observation_mode: "series" for pandas DataFrame observations, "array" for numpy ones.
+            num_envs: the number of episodes to run at once.
+            prefetch: whether to prepare the data for the next episodes in background.
+            decision_interval: the number of trading days per step.
+            resample_frequency: "weekly" or "monthly" to step over coarser bars instead of days.
+        """
+        # Arguments are checked before the data is prepared and the prefetch thread is started.
+        if num_envs < 1:
+            raise ValueError("Expected at least 1 environment, got {}".format(num_envs))
+        if observation_mode == "history":
+            raise ValueError("History observations are not supported by vector simulations.")
+        super(VectorStockMarketSimulation, self).__init__(
+            data_collection_config, from_date, to_date, min_duration, max_duration,
+            min_start_balance, max_start_balance, commission, max_stock_owned,
+            stock_data_randomization, reward_config, observation_mode, prefetch,
+            decision_interval, resample_frequency=resample_frequency)
+        self.num_envs = num_envs
+        num_stocks = len(self.stock_names)
+
+        # Setting up batched state.
+        self.balance = np.zeros(num_envs)
+        self.net_worth = np.zeros(num_envs)
+        self.owned_stocks = np.zeros((num_envs, num_stocks))
+        self.curr_date_index = np.full(num_envs, -1)
+        self.from_date_index = np.full(num_envs, -1)
+        self.to_date_index = np.full(num_envs, -1)
+
+        # Setting up action space.
+        self.single_action_space = self.action_space
+        self.action_space = gym.spaces.MultiDiscrete(np.full((num_envs, num_stocks), 3))
+
+        # Setting up observation space.
+        num_features = len(self.feature_index)
+        self.single_observation_space = self.observation_space
+        self.observation_space = gym.spaces.Box(low=-np.inf, high=np.inf,
+                                                shape=(num_envs, num_features), dtype=np.float64)
+        self.observation_buffer = np.zeros((num_envs, num_features))
+
+        # Setting up reward function for every episode.
+        self.reward_functions = [self.reward_function]
+        for _ in range(num_envs - 1):
+            self.reward_functions.append(create_reward(self.reward_config, self.from_date,
+                                                       self.to_date))
+
+    # pylint: disable=arguments-differ
+    def action_space_generator(self, index=0):
+        """Generator for action space of the ith episode.
+
+        Args:
+            index: the index of the episode.
+
+        Returns:
+            Generator obejct with all possible actions.
+        """
+        return iter(self.legal_actions(index).tolist())
+
+    # pylint: disable=arguments-differ
+    def legal_actions(self, index=0):
+        """Returns all legal actions for the ith episode.
+
+        Args:
+            index: the index of the episode.
+
+        Returns:
+            Read-only (num_actions, num_stocks) array with the actions.
+        """
+        return self.action_cache.legal_actions(self.owned_stocks[index])
+
+    # pylint: disable=arguments-differ
+    def legal_action_ids(self, index=0):
+        """Returns ids of all legal actions for the ith episode.
+
+        Args:
+            index: the index of the episode.
+
+        Returns:
+            Read-only (num_actions,) array with the action ids.
+        """
+        return self.action_cache.legal_action_ids(self.owned_stocks[index])
+
+    def episode(self, index):
+        """Returns a view of a single episode.
+
+        Args:
+            index: the index of the episode.
+
+        Returns:
+            EpisodeView for the episode.
+        """
+        return EpisodeView(self, index)
+
+    @property
+    def overall_reward(self):
+        """Property, returns array with overall rewards for the current episodes.
+        """
+        return np.array([reward_function.calculate_overall_reward()
+                         for reward_function in self.reward_functions])
+
+    @property
+    def done(self):
+        """Property, boolean mask, true for the finished episodes.
+        """
+        return self.curr_date_index >= self.to_date_index
+
+    def _market_rows(self):
+        """Returns the visible data for the current date of every episode.
+        """
+        return self.data_collection.row(self.curr_date_index)
+
+    def _market_prices(self):
+        """Returns the stock prices for the current date of every episode.
+        """
+        return self.data_collection.prices(self.curr_date_index)
+
+    @property
+    def observation(self):
+        """Property for current observations.
+        """
+        if self.saved_observation is not None:
+            return self.saved_observation
+
+        if self.observation_mode == "array":
+            num_stocks = len(self.stock_names)
+            buffer = self.observation_buffer
+            np.greater(self.owned_stocks, 0, out=buffer[:, :num_stocks])
+            buffer[:, num_stocks] = self.balance
+            buffer[:, num_stocks + 1] = self.net_worth
+            buffer[:, num_stocks + 2:] = self._market_rows()
+            self.saved_observation = buffer
+            return buffer
+
+        owned_stocks = pd.DataFrame(np.where(self.owned_stocks > 0, 1, 0),
+                                    columns=["owned_{}".format(name) for name in self.stock_names])
+        balance_and_net_worth = pd.DataFrame({"balance": self.balance,
+                                              "net_worth": self.net_worth})
+        data = pd.DataFrame(self._market_rows(), columns=self.data_collection.feature_names)
+        self.saved_observation = pd.concat([owned_stocks, balance_and_net_worth, data], axis=1)
+        return self.saved_observation
+
+    def _reward_observation(self, index):
+        """Returns the observation of the ith episode that is passed to its reward function.
+
+        Args:
+            index: the index of the episode.
+        """
+        if self.observation_mode != "series":
+            return {"balance": self.balance[index], "net_worth": self.net_worth[index]}
+        return self.observation.iloc[index]
+
+    def step(self, action):
+        """Simulate decision_interval days of trading for all of the unfinished episodes.
+
+        Args:
+            action: (num_envs, num_stocks) array with an action for each episode, or (num_envs,)
+                    array with action ids.
+
+        Returns:
+            observation: DataFrame with a row of data source for each episode.
+            reward: array with the reward for each episode.
+            done: boolean mask, true for the finished episodes.
+        """
+        actions = np.asarray(action)
+        if actions.ndim == 1:
+            actions = self.action_cache.decode(actions)
+        reward = self._step_day(actions)
+        for _ in range(self.decision_interval - 1):
+            if self.done.all():
+                break
+            reward += self._step_day(self.hold_action)
+        return self.observation, reward, self.done
+
+    def _step_day(self, actions):
+        """Simulate a single day of trading for all of the unfinished episodes.
+
+        Args:
+            actions: (num_envs, num_stocks) array with an action for each episode.
+
+        Returns:
+            Array with the reward for each episode for the day.
+        """
+        active = ~self.done
+
+        # Simulate buy and sell actions
+        stock_prices = self._market_prices()
+        balance, owned_stocks, net_worth = execute_trades(
+            self.balance, self.owned_stocks, stock_prices, actions, self.commission,
+            self.max_stock_owned)
+
+        # Update internal state vales.
+        self.balance[active] = balance[active]
+        self.owned_stocks[active] = owned_stocks[active]
+        self.net_worth[active] = net_worth[active]
+        self.curr_date_index[active] += 1
+        self.saved_observation = None
+        reward = np.zeros(self.num_envs)
+        for index in np.flatnonzero(active):
+            next_date = self.available_dates[self.curr_date_index[index]]
+            reward[index] = self.reward_functions[index].calculate_value(
+                self._reward_observation(index), next_date)
+        return reward
+
+    def snapshot(self):
+        """Saves the state of all of the episodes.
+
+        Returns:
+            Token to pass to restore.
+        """
+        token = super(VectorStockMarketSimulation, self).snapshot()
+        token["reward_states"] = [reward_function.get_state()
+                                  for reward_function in self.reward_functions]
+        return token
+
+    def restore(self, token):
+        """Restores the state of the episodes saved with snapshot.
+
+        Args:
+            token: the token returned by snapshot.
+        """
+        super(VectorStockMarketSimulation, self).restore(token)
+        for reward_function, reward_state in zip(self.reward_functions, token["reward_states"]):
+            reward_function.set_state(reward_state)
+
+    def reset(self):
+        """Resets all of the episodes of the simulation environment.
+        """
+        self._reset_data()
+
+        # Setting from date, to date for the next episodes.
+        for index in range(self.num_envs):
+            duration = random.randint(self.min_duration, self.max_duration)
+            curr_date_index = random.randint(self.min_start_index,
+                                             len(self.available_dates) - duration)
+            self.from_date_index[index] = curr_date_index
+            self.curr_date_index[index] = curr_date_index
+            self.to_date_index[index] = curr_date_index + duration - 1
+
+        # Setting balance and net worth for the first day.
+        self.balance = np.array([random.randint(self.min_start_balance, self.max_start_balance)
+                                 for _ in range(self.num_envs)], dtype=np.float64)
+        self.net_worth = self.balance.copy()
+        self.owned_stocks = np.zeros((self.num_envs, len(self.stock_names)))
+
+        # Reset observation cache.
+        self.saved_observation = None
+
+        # Reset the reward functions.
+        for index, reward_function in enumerate(self.reward_functions):
+            curr_date = self.available_dates[self.curr_date_index[index]]
+            reward_function.set_available_dates(self.available_dates)
+            reward_function.reset(self._reward_observation(index), curr_date)
+        return self.observation
@@ -6,13 +6,85 @@ import numpy as np
 import pandas as pd
 import progressbar
 
-from stock_trading_backend.simulation import StockMarketSimulation
+from stock_trading_backend.simulation import StockMarketSimulation, VectorStockMarketSimulation
+from stock_trading_backend.simulation import SubprocessVectorStockMarketSimulation
+
+def _run_episode(agent, simulation, training, kwargs_keys):
+    """Runs a single episode of the simulation.
+
+    Args:
+        agent: the agent that makes decisions.
+        simulation: StockMarketSimulation to run the episode in.
+        training: the param passed to make_decision in the agent.
+        kwargs_keys: the keys of kwargs returned by the agent.
+
+    Returns:
+        A list with a single (observations, actions, rewards, kwargs, overall_reward) tuple.
+    """
+    rewards = []
+    actions = []
+    kwargs = {key: [] for key in kwargs_keys}
+    observation = simulation.reset()
+    observations = pd.DataFrame(columns=observation.index)
+
+    while not simulation.done:
+        action, _kwargs = agent.make_decision(observation, simulation, training)
+        observations = observations.append(observation, ignore_index=True)
+        actions.append(action)
+        for key in _kwargs:
+            kwargs[key].append(_kwargs[key])
+        observation, reward, _ = simulation.step(action)
+        rewards.append(reward)
+
+    return [(observations, actions, rewards, kwargs, simulation.overall_reward)]
+
+def _run_vector_episodes(agent, simulation, training, kwargs_keys):
+    """Runs simulation.num_envs episodes at once in the vector simulation.
+
+    Args:
+        agent: the agent that makes decisions.
+        simulation: VectorStockMarketSimulation (or its subprocess version) to run the episodes.
+        training: the param passed to make_decision in the agent.
+        kwargs_keys: the keys of kwargs returned by the agent.
+
+    Returns:
+        A list with (observations, actions, rewards, kwargs, overall_reward) tuple per episode.
+    """
+    num_envs = simulation.num_envs
+    rewards = [[] for _ in range(num_envs)]
+    actions = [[] for _ in range(num_envs)]
+    observations = [[] for _ in range(num_envs)]
+    kwargs = [{key: [] for key in kwargs_keys} for _ in range(num_envs)]
+    episodes = [simulation.episode(index) for index in range(num_envs)]
+    observation = simulation.reset()
+
+    while not simulation.done.all():
+        active = np.flatnonzero(~simulation.done)
+        action = np.ones(simulation.owned_stocks.shape, dtype=int)
+        for index in active:
+            _action, _kwargs = agent.make_decision(observation.iloc[index], episodes[index],
+                                                   training)
+            observations[index].append(observation.iloc[index])
+            actions[index].append(_action)
+            action[index] = _action
+            for key in _kwargs:
+                kwargs[index][key].append(_kwargs[key])
+        observation, reward, _ = simulation.step(action)
+        for index in active:
+            rewards[index].append(reward[index])
+
+    overall_rewards = simulation.overall_reward
+    return [(pd.DataFrame(observations[index], columns=observation.columns).reset_index(drop=True),
+             actions[index], rewards[index], kwargs[index], overall_rewards[index])
+            for index in range(num_envs)]
 
 # pylint: disable=too-many-arguments
 # pylint: disable=too-many-locals
 def train_agent(agent, from_date=None, to_date=None, min_duration=60, max_duration=90, commission=0,
                 max_stock_owned=1, min_start_balance=1000, max_start_balance=4000, training=True,
-                stock_data_randomization=False, episode_batch_size=5, num_episodes=10):
+                stock_data_randomization=False, episode_batch_size=5, num_episodes=10,
+                num_envs=1, parallel=False, prefetch=False, decision_interval=1,
+                resample_frequency=None):
     """Train an agent with provided params.
 
     Args:
@@ -30,6 +102,11 @@ def train_agent(agent, from_date=None, to_date=None, min_duration=60, max_durati
         episode_batch_size: the number of episodes in a training batch.
         num_episodes: number of episodes that training going to last.
         training: the param passed to make_decision in the agent.
+        num_envs: the number of episodes to simulate at once (uses vector simulation if > 1).
+        parallel: whether to simulate each of num_envs episodes in its own worker process.
+        prefetch: whether to prepare the data for the next episode in background.
+        decision_interval: the number of trading days between decisions of the agent.
+        resample_frequency: "weekly" or "monthly" to train on coarser bars instead of days.
     """
     if not agent.requires_learning:
         raise ValueError("This agent does not need learning")
@@ -40,64 +117,73 @@ def train_agent(agent, from_date=None, to_date=None, min_duration=60, max_durati
         from_date = today - timedelta(days=720)
         to_date = today - timedelta(days=60)
 
-    simulation = StockMarketSimulation(agent.data_collection_config, from_date=from_date,
-                                       to_date=to_date, min_start_balance=min_start_balance,
-                                       max_start_balance=max_start_balance, commission=commission,
-                                       max_stock_owned=max_stock_owned, min_duration=min_duration,
-                                       max_duration=max_duration, reward_config=agent.reward_config,
-                                       stock_data_randomization=stock_data_randomization)
+    simulation_kwargs = dict(from_date=from_date, to_date=to_date,
+                             min_start_balance=min_start_balance,
+                             max_start_balance=max_start_balance, commission=commission,
+                             max_stock_owned=max_stock_owned, min_duration=min_duration,
+                             max_duration=max_duration, reward_config=agent.reward_config,
+                             stock_data_randomization=stock_data_randomization,
+                             prefetch=prefetch, decision_interval=decision_interval,
+                             resample_frequency=resample_frequency)
+    if num_envs > 1 and parallel:
+        simulation = SubprocessVectorStockMarketSimulation(
+            num_envs=num_envs, data_collection_config=agent.data_collection_config,
+            **simulation_kwargs)
+        run_episodes = _run_vector_episodes
+        observation = simulation.reset().iloc[0]
+        decision_env = simulation.episode(0)
+    elif num_envs > 1:
+        simulation = VectorStockMarketSimulation(agent.data_collection_config, num_envs=num_envs,
+                                                 **simulation_kwargs)
+        run_episodes = _run_vector_episodes
+        observation = simulation.reset().iloc[0]
+        decision_env = simulation.episode(0)
+    else:
+        simulation = StockMarketSimulation(agent.data_collection_config, **simulation_kwargs)
+        run_episodes = _run_episode
+        observation = simulation.reset()
+        decision_env = simulation
 
-    num_episodes_run = 0
-    overall_reward_history = []
-    loss_history = []
+    # The simulation is closed even if training fails, e.g. to stop the subprocesses.
+    try:
+        num_episodes_run = 0
+        overall_reward_history = []
+        loss_history = []
 
-    observation = simulation.reset()
-    _, kwargs = agent.make_decision(observation, simulation, False)
-    kwargs_keys = kwargs.keys()
-    batch_kwargs_keys = ["{}s_batch".format(key) for key in kwargs_keys]
-
-    with progressbar.ProgressBar(max_value=num_episodes) as progress_bar:
-        while num_episodes_run < num_episodes:
-            batch_kwargs = {key: [] for key in batch_kwargs_keys}
-            batch_rewards = []
-            batch_observations = []
-            batch_actions = []
-            batch_reward = 0
-            num_episodes_left_in_batch = episode_batch_size
-
-            # Run the simulations in the batch.
-            while num_episodes_left_in_batch > 0 and num_episodes_run < num_episodes:
-                rewards = []
-                actions = []
-                kwargs = {key: [] for key in kwargs_keys}
-                observation = simulation.reset()
-                observations = pd.DataFrame(columns=observation.index)
-
-                while not simulation.done:
-                    action, _kwargs = agent.make_decision(observation, simulation, training)
-                    observations = observations.append(observation, ignore_index=True)
-                    actions.append(action)
-                    for key in _kwargs:
-                        kwargs[key].append(_kwargs[key])
-                    observation, reward, _ = simulation.step(action)
-                    rewards.append(reward)
-
-                overall_reward = simulation.overall_reward
-                overall_reward_history.append(overall_reward)
-                rewards[-2] += overall_reward
-                rewards = np.asarray(rewards)
-                batch_rewards.append(rewards)
-                batch_observations.append(observations)
-                batch_actions.append(actions)
-                for key in kwargs:
-                    batch_kwargs["{}s_batch".format(key)].append(kwargs[key])
-                num_episodes_run += 1
-                num_episodes_left_in_batch -= 1
-                progress_bar.update(num_episodes_run)
-
-            # Utilize data from the simulations to train agents.
-            losses = agent.apply_learning(batch_observations, batch_actions, batch_rewards,
-                                          **batch_kwargs)
-            loss_history.extend(losses)
+        _, kwargs = agent.make_decision(observation, decision_env, False)
+        kwargs_keys = kwargs.keys()
+        batch_kwargs_keys = ["{}s_batch".format(key) for key in kwargs_keys]
+        episodes = []
+
+        with progressbar.ProgressBar(max_value=num_episodes) as progress_bar:
+            while num_episodes_run < num_episodes:
+                batch_kwargs = {key: [] for key in batch_kwargs_keys}
+                batch_rewards = []
+                batch_observations = []
+                batch_actions = []
+                num_episodes_left_in_batch = episode_batch_size
+
+                # Run the simulations in the batch.
+                while num_episodes_left_in_batch > 0 and num_episodes_run < num_episodes:
+                    if not episodes:
+                        episodes = run_episodes(agent, simulation, training, kwargs_keys)
+                    observations, actions, rewards, kwargs, overall_reward = episodes.pop(0)
+                    overall_reward_history.append(overall_reward)
+                    rewards[-2] += overall_reward
+                    rewards = np.asarray(rewards)
+                    batch_rewards.append(rewards)
+                    batch_observations.append(observations)
+                    batch_actions.append(actions)
+                    for key in kwargs:
+                        batch_kwargs["{}s_batch".format(key)].append(kwargs[key])
+                    num_episodes_run += 1
+                    num_episodes_left_in_batch -= 1
+                    progress_bar.update(num_episodes_run)
 
+                # Utilize data from the simulations to train agents.
+                losses = agent.apply_learning(batch_observations, batch_actions, batch_rewards,
+                                              **batch_kwargs)
+                loss_history.extend(losses)
+    finally:
+        simulation.close()
     return overall_reward_history, loss_history
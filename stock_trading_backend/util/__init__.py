@@ -5,3 +5,7 @@ from stock_trading_backend.util.file import read_manifest_file, write_manifest_f
 from stock_trading_backend.util.file import read_csv_file, write_csv_file, save_torch_model
 from stock_trading_backend.util.stock import get_stock_data, get_stock_data_for_single_stock
 from stock_trading_backend.util.stock import STOCK_MANIFEST_FILE_NAME
+from stock_trading_backend.util.benchmark import BenchmarkSeries, get_benchmark
+from stock_trading_backend.util.statistics import DownsideDeviation, MaxDrawdown, RunningMoments
+from stock_trading_backend.util.expression import compile_expression
+from stock_trading_backend.util.rolling_window import RollingWindowEngine
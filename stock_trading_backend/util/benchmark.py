@@ -0,0 +1,97 @@
+"""Shared benchmark series (e.g. SPY) for market-relative rewards.
+"""
+from threading import Lock
+
+import numpy as np
+
+from stock_trading_backend.util.stock import DATA_PATH, get_stock_data
+
+
+class BenchmarkSeries:
+    """Read-only prices of a benchmark for a date range.
+
+    Prices and per-day returns are stored as arrays, dates are looked up through a dict, so
+    reading a value doesn't go through pandas.
+    """
+    def __init__(self, name, data):
+        """Initializer for benchmark series.
+
+        Args:
+            name: the name of the benchmark stock.
+            data: DataFrame with the benchmark prices (one column) indexed by date.
+        """
+        self.name = name
+        self.data = data
+        self.dates = data.index
+        self.values = np.ascontiguousarray(data.to_numpy(dtype=np.float64).reshape(-1))
+        self.values.flags.writeable = False
+        self.returns = np.zeros(len(self.values))
+        self.returns[1:] = self.values[1:] / self.values[:-1] - 1
+        self.returns.flags.writeable = False
+        self.date_to_index = {date: index for index, date in enumerate(self.dates)}
+
+    def index(self, date):
+        """Returns the position of the date, or of the last date before it if it is missing.
+
+        Args:
+            date: the lookup date.
+        """
+        if date in self.date_to_index:
+            return self.date_to_index[date]
+        index = self.dates.searchsorted(date, side="right") - 1
+        if index < 0:
+            raise LookupError("{} is before the first date of {}".format(date, self.name))
+        return index
+
+    def value(self, date):
+        """Returns the benchmark price for the date (the last known price for missing dates).
+
+        Args:
+            date: the lookup date.
+        """
+        return self.values[self.index(date)]
+
+    def align(self, dates, allow_before_start=False):
+        """Returns the benchmark prices aligned to the dates.
+
+        Args:
+            dates: a list of dates, e.g. the available dates of a data collection.
+            allow_before_start: whether the dates before the first date of the series get NaN
+                                prices, instead of raising LookupError.
+
+        Returns:
+            Array with the benchmark price (the last known price for missing dates) for each date.
+        """
+        indexes = self.dates.searchsorted(dates, side="right") - 1
+        before_start = indexes < 0
+        if before_start.any():
+            if not allow_before_start:
+                raise LookupError("Some of the dates are before the first date of {}".format(
+                    self.name))
+            return np.where(before_start, np.nan, self.values[np.maximum(indexes, 0)])
+        return self.values[indexes]
+
+    def __len__(self):
+        """Returns the number of dates in the series.
+        """
+        return len(self.values)
+
+
+BENCHMARKS = {}
+BENCHMARKS_LOCK = Lock()
+
+def get_benchmark(name, from_date, to_date, path=DATA_PATH):
+    """Returns the benchmark series, it is loaded once per process for each date range.
+
+    Args:
+        name: the name of the benchmark stock, e.g. "SPY".
+        from_date: datetime start of the date range.
+        to_date: datetime end of the date range.
+        path: path to manifest and saved stock data.
+    """
+    key = (name, from_date, to_date, path)
+    with BENCHMARKS_LOCK:
+        if key not in BENCHMARKS:
+            BENCHMARKS[key] = BenchmarkSeries(name, get_stock_data([name], from_date, to_date,
+                                                                   path))
+        return BENCHMARKS[key]
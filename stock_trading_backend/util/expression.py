@@ -0,0 +1,179 @@
+"""Compiler of arithmetic expressions into vectorized numpy functions.
+"""
+import ast
+from functools import lru_cache
+import math
+
+import numpy as np
+
+# math functions, the numpy functions they are translated to and their number of arguments.
+MATH_FUNCTIONS = {
+    "sin": ("sin", 1), "cos": ("cos", 1), "tan": ("tan", 1), "asin": ("arcsin", 1),
+    "acos": ("arccos", 1), "atan": ("arctan", 1), "atan2": ("arctan2", 2), "sinh": ("sinh", 1),
+    "cosh": ("cosh", 1), "tanh": ("tanh", 1), "exp": ("exp", 1), "log": ("log", 1),
+    "log10": ("log10", 1), "log2": ("log2", 1), "sqrt": ("sqrt", 1), "floor": ("floor", 1),
+    "ceil": ("ceil", 1), "fabs": ("fabs", 1), "pow": ("power", 2), "hypot": ("hypot", 2),
+}
+MATH_CONSTANTS = {"pi": math.pi, "e": math.e, "tau": math.tau}
+BUILTIN_FUNCTIONS = {"abs": ("abs", 1), "min": ("minimum", 2), "max": ("maximum", 2)}
+OPERATORS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow, ast.UAdd,
+             ast.USub)
+
+
+def _node_name(node):
+    """Returns the dotted name of a name or attribute node, for error messages.
+
+    Args:
+        node: the AST node.
+    """
+    if isinstance(node, ast.Attribute):
+        return "{}.{}".format(_node_name(node.value), node.attr)
+    if isinstance(node, ast.Name):
+        return node.id
+    return type(node).__name__
+
+
+def _numpy_call(name, arguments):
+    """Returns the AST node of a call of the numpy function.
+
+    Args:
+        name: the name of the numpy function.
+        arguments: a list of AST nodes with the arguments.
+    """
+    function = ast.Attribute(value=ast.Name(id="np", ctx=ast.Load()), attr=name, ctx=ast.Load())
+    return ast.Call(func=function, args=arguments, keywords=[])
+
+
+class _ExpressionTranslator(ast.NodeTransformer):
+    """Checks that the expression is arithmetic and translates math calls to numpy calls.
+    """
+    def __init__(self, variables):
+        """Initializer for the translator.
+
+        Args:
+            variables: the names of the variables the expression may use.
+        """
+        self.variables = variables
+
+    def generic_visit(self, node):
+        """Rejects nodes that are not part of an arithmetic expression.
+
+        Args:
+            node: the AST node.
+        """
+        if not isinstance(node, (ast.Expression, ast.BinOp, ast.UnaryOp) + OPERATORS):
+            raise ValueError("{} is not allowed in expressions.".format(type(node).__name__))
+        return super(_ExpressionTranslator, self).generic_visit(node)
+
+    # pylint: disable=invalid-name
+    def visit_Constant(self, node):
+        """Allows numeric constants.
+
+        Args:
+            node: the AST node.
+        """
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise ValueError("Constant {!r} is not allowed in expressions.".format(node.value))
+        return node
+
+    # pylint: disable=invalid-name
+    def visit_Num(self, node):
+        """Allows numbers (Python < 3.8 parses them as Num).
+
+        Args:
+            node: the AST node.
+        """
+        if isinstance(node.n, bool) or not isinstance(node.n, (int, float)):
+            raise ValueError("Constant {!r} is not allowed in expressions.".format(node.n))
+        return node
+
+    # pylint: disable=invalid-name
+    def visit_Name(self, node):
+        """Allows the variables.
+
+        Args:
+            node: the AST node.
+        """
+        if node.id not in self.variables:
+            raise ValueError("Unknown name {} in expression.".format(node.id))
+        return node
+
+    # pylint: disable=invalid-name
+    def visit_Attribute(self, node):
+        """Translates math constants, e.g. math.pi, to their values.
+
+        Args:
+            node: the AST node.
+        """
+        if not (isinstance(node.value, ast.Name) and node.value.id == "math"
+                and node.attr in MATH_CONSTANTS):
+            raise ValueError("Unknown attribute {} in expression.".format(_node_name(node)))
+        return ast.copy_location(ast.Constant(MATH_CONSTANTS[node.attr]), node)
+
+    # pylint: disable=invalid-name
+    def visit_Call(self, node):
+        """Translates math functions, e.g. math.sin, and abs/min/max to numpy functions.
+
+        Args:
+            node: the AST node.
+        """
+        function = node.func
+        function_name = _node_name(function)
+        if (isinstance(function, ast.Attribute) and isinstance(function.value, ast.Name)
+                and function.value.id == "math" and function.attr in MATH_FUNCTIONS):
+            name, num_arguments = MATH_FUNCTIONS[function.attr]
+        elif isinstance(function, ast.Name) and function.id in BUILTIN_FUNCTIONS:
+            name, num_arguments = BUILTIN_FUNCTIONS[function.id]
+        else:
+            raise ValueError("Unknown function {} in expression.".format(function_name))
+        if node.keywords:
+            raise ValueError("Keyword arguments are not allowed in expressions.")
+        arguments = [self.visit(argument) for argument in node.args]
+
+        # numpy ufuncs take out as the next positional argument, so extra arguments are
+        # translated explicitly: math.log(x, base) and min/max of more than two values.
+        if function_name == "math.log" and len(arguments) == 2:
+            result = ast.BinOp(left=_numpy_call("log", arguments[:1]), op=ast.Div(),
+                               right=_numpy_call("log", arguments[1:]))
+        elif function_name in ("min", "max") and len(arguments) > 2:
+            result = _numpy_call(name, arguments[:2])
+            for argument in arguments[2:]:
+                result = _numpy_call(name, [result, argument])
+        elif len(arguments) == num_arguments:
+            result = _numpy_call(name, arguments)
+        else:
+            raise ValueError("{} takes {} arguments in expressions, got {}.".format(
+                function_name, num_arguments, len(arguments)))
+        return ast.copy_location(result, node)
+
+
+@lru_cache(maxsize=None)
+def compile_expression(expression, variables=("diff",)):
+    """Compiles an arithmetic expression into a vectorized function.
+
+    Only numbers, the variables, arithmetic operators, math functions and constants (e.g.
+    math.sin, math.pi) and abs/min/max are allowed. math functions are translated to numpy
+    functions, so the compiled function evaluates the expression for whole arrays at once.
+    Compiled functions are cached by the expression.
+
+    Args:
+        expression: the expression string, e.g. "200 + 100 * math.sin(diff / 10)".
+        variables: a tuple with the names of the arguments of the function.
+
+    Returns:
+        Function that takes the variables as arguments and returns the value of the expression.
+    """
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as error:
+        raise ValueError("Invalid expression {!r}: {}".format(expression, error.msg)) from error
+    tree = ast.fix_missing_locations(_ExpressionTranslator(variables).visit(tree))
+    arguments = {"args": [ast.arg(arg=name) for name in variables], "kwonlyargs": [],
+                 "kw_defaults": [], "defaults": []}
+    if "posonlyargs" in ast.arguments._fields:
+        arguments["posonlyargs"] = []
+    lambda_tree = ast.Expression(body=ast.Lambda(args=ast.arguments(**arguments),
+                                                 body=tree.body))
+    code = compile(ast.fix_missing_locations(lambda_tree), "<expression>", "eval")
+    # pylint: disable=eval-used
+    return eval(code, {"np": np, "__builtins__": {}})
@@ -0,0 +1,132 @@
+"""Rolling window statistics from prefix sums.
+"""
+import numpy as np
+
+
+class RollingWindowEngine:
+    """Rolling sums, means and variances of the columns of a matrix for any window.
+
+    Prefix sums of the values (and, on the first use, of their squares) are computed once, after
+    that a statistic of any window is O(1) for a single row and a single subtraction for all of
+    the rows. Values are centered by the column means before the prefix sums, so the sums of
+    squares keep their precision.
+
+    Windows that contain NaN give NaN, and so do the rows before the first full window, the same
+    as pandas rolling(window) with the default min_periods.
+    """
+    def __init__(self, values):
+        """Initializer for the rolling window engine.
+
+        Args:
+            values: (num_rows, num_columns) or (num_rows,) array.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if values.ndim == 1:
+            values = values[:, np.newaxis]
+        self.num_rows, self.num_columns = values.shape
+
+        nan_mask = np.isnan(values)
+        self.center = np.zeros(self.num_columns)
+        finite_counts = (~nan_mask).sum(axis=0)
+        np.divide(np.where(nan_mask, 0, values).sum(axis=0), finite_counts, out=self.center,
+                  where=finite_counts > 0)
+        self.centered = np.where(nan_mask, 0, values - self.center)
+
+        self.prefix_sums = self._prefix_sums(self.centered)
+        self.nan_counts = self._prefix_sums(nan_mask) if nan_mask.any() else None
+        self.square_prefix_sums = None
+
+    def _prefix_sums(self, values):
+        """Returns prefix sums of the values, starting with a row of zeros.
+
+        Args:
+            values: (num_rows, num_columns) array.
+        """
+        prefix_sums = np.zeros((self.num_rows + 1, self.num_columns))
+        np.cumsum(values, axis=0, out=prefix_sums[1:])
+        return prefix_sums
+
+    def _window_sums(self, prefix_sums, window, index):
+        """Returns the sums of the windows ending at the index (at every row if index is None).
+
+        Args:
+            prefix_sums: prefix sums from _prefix_sums.
+            window: the window length.
+            index: the index of the last row of the window, or None.
+        """
+        if window < 1:
+            raise ValueError("Expected positive window, got {}".format(window))
+        if index is not None:
+            if index < window - 1 or index >= self.num_rows:
+                return np.full(self.num_columns, np.nan)
+            sums = prefix_sums[index + 1] - prefix_sums[index + 1 - window]
+            if self.nan_counts is not None:
+                nan_counts = self.nan_counts[index + 1] - self.nan_counts[index + 1 - window]
+                sums = np.where(nan_counts > 0, np.nan, sums)
+            return sums
+
+        sums = np.full((self.num_rows, self.num_columns), np.nan)
+        if window <= self.num_rows:
+            np.subtract(prefix_sums[window:], prefix_sums[:-window], out=sums[window - 1:])
+            if self.nan_counts is not None:
+                nan_counts = self.nan_counts[window:] - self.nan_counts[:-window]
+                sums[window - 1:][nan_counts > 0] = np.nan
+        return sums
+
+    def sum(self, window, index=None):
+        """Returns rolling sums.
+
+        Args:
+            window: the window length.
+            index: the index of the last row of the window, or None for all of the rows.
+
+        Returns:
+            (num_columns,) array for the index, or (num_rows, num_columns) array.
+        """
+        return self._window_sums(self.prefix_sums, window, index) + window * self.center
+
+    def mean(self, window, index=None):
+        """Returns rolling means.
+
+        Args:
+            window: the window length.
+            index: the index of the last row of the window, or None for all of the rows.
+
+        Returns:
+            (num_columns,) array for the index, or (num_rows, num_columns) array.
+        """
+        return self._window_sums(self.prefix_sums, window, index) / window + self.center
+
+    def variance(self, window, index=None, ddof=1):
+        """Returns rolling variances.
+
+        Args:
+            window: the window length.
+            index: the index of the last row of the window, or None for all of the rows.
+            ddof: delta degrees of freedom, 1 (as in pandas) for the sample variance.
+
+        Returns:
+            (num_columns,) array for the index, or (num_rows, num_columns) array.
+        """
+        if self.square_prefix_sums is None:
+            self.square_prefix_sums = self._prefix_sums(self.centered ** 2)
+        sums = self._window_sums(self.prefix_sums, window, index)
+        squares = self._window_sums(self.square_prefix_sums, window, index)
+        if window <= ddof:
+            return np.full_like(sums, np.nan)
+        variance = (squares - sums ** 2 / window) / (window - ddof)
+        return np.maximum(variance, 0)
+
+    def means(self, windows):
+        """Returns rolling means for multiple windows.
+
+        Args:
+            windows: a list of window lengths.
+
+        Returns:
+            (len(windows), num_rows, num_columns) array, ith element for the ith window.
+        """
+        result = np.empty((len(windows), self.num_rows, self.num_columns))
+        for index, window in enumerate(windows):
+            result[index] = self.mean(window)
+        return result
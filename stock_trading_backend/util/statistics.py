@@ -0,0 +1,97 @@
+"""Streaming statistics with O(1) updates.
+"""
+import numpy as np
+
+
+class RunningMoments:
+    """Running mean and variance (Welford's algorithm).
+
+    Variance is the population variance, the same as np.var of all of the values.
+    """
+    def __init__(self):
+        """Initializer for running moments.
+        """
+        self.count = 0
+        self.mean = 0.0
+        self.sum_of_squares = 0.0
+
+    def update(self, value):
+        """Adds a value.
+
+        Args:
+            value: the new value.
+        """
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.sum_of_squares += delta * (value - self.mean)
+
+    @property
+    def variance(self):
+        """Property, population variance of the values (0 if there are no values).
+        """
+        if self.count == 0:
+            return np.float64(0)
+        return np.float64(self.sum_of_squares / self.count)
+
+    @property
+    def std(self):
+        """Property, population standard deviation of the values.
+        """
+        return np.sqrt(self.variance)
+
+
+class DownsideDeviation:
+    """Running downside deviation: root mean square of the shortfalls below the target.
+    """
+    def __init__(self, target=0):
+        """Initializer for downside deviation.
+
+        Args:
+            target: the target value, only values below it count as shortfalls.
+        """
+        self.target = target
+        self.count = 0
+        self.sum_of_squares = 0.0
+
+    def update(self, value):
+        """Adds a value.
+
+        Args:
+            value: the new value.
+        """
+        self.count += 1
+        shortfall = min(value - self.target, 0)
+        self.sum_of_squares += shortfall * shortfall
+
+    @property
+    def value(self):
+        """Property, the downside deviation (0 if there are no values).
+        """
+        if self.count == 0:
+            return np.float64(0)
+        return np.sqrt(self.sum_of_squares / self.count)
+
+
+class MaxDrawdown:
+    """Running maximum drawdown of a series of values (e.g. net worth).
+
+    Drawdown is the relative drop from the highest value seen so far: 1 - value / peak.
+    """
+    def __init__(self):
+        """Initializer for max drawdown.
+        """
+        self.peak = None
+        self.drawdown = 0.0
+        self.max_drawdown = 0.0
+
+    def update(self, value):
+        """Adds a value.
+
+        Args:
+            value: the new value.
+        """
+        if self.peak is None or value > self.peak:
+            self.peak = value
+        self.drawdown = 1 - value / self.peak if self.peak > 0 else 0.0
+        self.max_drawdown = max(self.max_drawdown, self.drawdown)
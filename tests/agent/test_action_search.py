@@ -0,0 +1,155 @@
+"""Unit tests for action search.
+"""
+import unittest
+
+import numpy as np
+import pandas as pd
+import torch
+from parameterized import parameterized
+
+from stock_trading_backend.agent import BeamActionSearch, ExhaustiveActionSearch
+from stock_trading_backend.agent import ActionSearch, GreedyActionSearch, Model
+from stock_trading_backend.agent.action_search import HOLD, SubActionSearch
+from stock_trading_backend.simulation.action_cache import get_action_cache
+
+
+class LinearTestModel(Model):
+    """Model with fixed weights, the value is additive over the stocks.
+    """
+    name = "linear_test_model"
+
+    def __init__(self, weights):
+        """Initializer for linear test model.
+
+        Args:
+            weights: a list of weights for the observation and action values.
+        """
+        super(LinearTestModel, self).__init__()
+        # pylint: disable=not-callable
+        self.weights = torch.tensor(weights, dtype=torch.float64)
+
+    def _predict(self, state_action_tensor):
+        """Returns weighted sum of the state-action values.
+
+        Args:
+            state_action_tensor: pytorch tensor with state-action values.
+        """
+        return state_action_tensor @ self.weights
+
+
+class FakeEnv:
+    """Environment with the interface used by the action search.
+    """
+    def __init__(self, owned_stocks, max_stock_owned):
+        """Initializer for the fake environment.
+
+        Args:
+            owned_stocks: a list with the number of owned shares for each stock.
+            max_stock_owned: a maximum number of different stocks that can be owned.
+        """
+        self.owned_stocks = np.array(owned_stocks)
+        self.max_stock_owned = max_stock_owned
+
+    def legal_actions(self):
+        """Returns all legal actions for the owned stocks.
+        """
+        action_cache = get_action_cache(len(self.owned_stocks), self.max_stock_owned)
+        return action_cache.legal_actions(self.owned_stocks)
+
+
+class TestActionSearch(unittest.TestCase):
+    """Unit tests for action search.
+    """
+    def test_exhaustive_search(self):
+        """Checks if exhaustive search scores all of the legal actions.
+        """
+        env = FakeEnv([1, 0, 0], 2)
+        model = LinearTestModel([1, 1, 2, 3])
+        actions, values = ExhaustiveActionSearch().search(model, pd.Series([1.0]), env)
+        self.assertTrue((env.legal_actions() == actions).all())
+        self.assertTrue(np.allclose(1 + actions @ [1, 2, 3], values))
+
+    @parameterized.expand([
+        (GreedyActionSearch(), 1),
+        (GreedyActionSearch(num_passes=2), 2),
+        (BeamActionSearch(beam_width=2), 2),
+        (BeamActionSearch(beam_width=4), 4),
+    ])
+    def test_matches_exhaustive_search(self, action_search, bound_factor):
+        """Benchmark against exhaustive search on small universes with additive values.
+
+        Args:
+            action_search: the action search to check.
+            bound_factor: num_passes or beam_width of the action search.
+        """
+        random_state = np.random.RandomState(0)
+        observation = pd.Series([1.0], ["balance"])
+        num_scored = 0
+        num_scored_exhaustive = 0
+        for _ in range(20):
+            num_stocks = random_state.randint(2, 9)
+            max_stock_owned = random_state.randint(1, num_stocks + 1)
+            owned_stocks = random_state.rand(num_stocks) < 0.3
+            owned_stocks[max_stock_owned:] = False
+            random_state.shuffle(owned_stocks)
+            env = FakeEnv(owned_stocks.astype(int), max_stock_owned)
+            model = LinearTestModel(random_state.normal(size=num_stocks + 1))
+
+            legal_actions, legal_values = ExhaustiveActionSearch().search(model, observation, env)
+            actions, values = action_search.search(model, observation, env)
+            legal_actions = set(map(tuple, legal_actions.tolist()))
+            self.assertTrue(all(tuple(action) in legal_actions for action in actions.tolist()))
+            self.assertTrue(np.isclose(legal_values.max(), values.max()))
+            self.assertLessEqual(len(actions), bound_factor * num_stocks * max_stock_owned + 1)
+            num_scored += len(actions)
+            num_scored_exhaustive += len(legal_actions)
+        self.assertLess(num_scored, num_scored_exhaustive)
+
+    def test_scales_to_large_universes(self):
+        """Checks if the number of scored actions is bounded for large universes.
+        """
+        env = FakeEnv([0] * 40, 5)
+        model = LinearTestModel(np.linspace(-1, 1, 41))
+        for action_search in [GreedyActionSearch(), BeamActionSearch(beam_width=3)]:
+            actions, values = action_search.search(model, pd.Series([1.0]), env)
+            self.assertLessEqual(len(actions), 3 * 40 * 5 + 1)
+            best_action = actions[np.argmax(values)]
+            self.assertEqual([2] * 5, best_action[-5:].tolist())
+            self.assertEqual([1] * 35, best_action[:-5].tolist())
+
+    def test_beam_search_scores_unique_actions(self):
+        """Checks if beam search scores every action once.
+        """
+        # Buying the first or the second stock and swapping it for the third gives the same
+        # action.
+        env = FakeEnv([0, 0, 0, 0], 1)
+        model = LinearTestModel([0, 1, 2, 3, 4])
+        actions, values = BeamActionSearch(beam_width=4).search(model, pd.Series([1.0]), env)
+        self.assertEqual(len(actions), len(set(map(tuple, actions.tolist()))))
+        self.assertEqual(5, len(actions))
+        self.assertEqual([1, 1, 1, 2], actions[np.argmax(values)].tolist())
+
+    def test_abstract_search(self):
+        """Checks if the base classes require search.
+        """
+        for action_search_class in [ActionSearch, SubActionSearch]:
+            with self.assertRaises(TypeError):
+                action_search_class()
+        with self.assertRaises(NotImplementedError):
+            ActionSearch.search(GreedyActionSearch(), None, None, None)
+
+    def test_expand(self):
+        """Checks if only the stocks that are held are expanded.
+        """
+        action = np.array([HOLD, 0, 2])
+        owned = np.array([True, True, False])
+        self.assertEqual([], SubActionSearch._expand(action, 1, owned, 1))
+        self.assertEqual([], SubActionSearch._expand(action, 2, owned, 1))
+        self.assertEqual([[0, 0, 2]], [changed_action.tolist() for changed_action
+                                       in SubActionSearch._expand(action, 0, owned, 1)])
+
+    def test_beam_width(self):
+        """Checks if beam search requires positive beam width.
+        """
+        with self.assertRaises(ValueError):
+            BeamActionSearch(beam_width=0)
@@ -0,0 +1,34 @@
+"""Unit tests for action search factory.
+"""
+import unittest
+
+from parameterized import parameterized
+
+from stock_trading_backend.agent import BeamActionSearch, ExhaustiveActionSearch
+from stock_trading_backend.agent import GreedyActionSearch, create_action_search
+
+
+class TestActionSearchFactory(unittest.TestCase):
+    """Unit tests for action search factory.
+    """
+    @parameterized.expand([
+        (None, ExhaustiveActionSearch),
+        ({"name": "exhaustive"}, ExhaustiveActionSearch),
+        ({"name": "greedy", "num_passes": 2}, GreedyActionSearch),
+        ({"name": "beam", "beam_width": 2}, BeamActionSearch),
+    ])
+    def test_creates_action_search(self, config, expected_class):
+        """Checks if created action search is of the right class.
+
+        Args:
+            config: the config for the action search.
+            expected_class: the expected class created from config.
+        """
+        action_search = create_action_search(config)
+        self.assertIsInstance(action_search, expected_class)
+
+    def test_lookup_error(self):
+        """Checks if create action search raises lookup error.
+        """
+        with self.assertRaises(LookupError):
+            _ = create_action_search({"name": "not_the_right_name"})
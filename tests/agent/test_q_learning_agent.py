@@ -41,6 +41,33 @@ class TestQLearningAgent(unittest.TestCase):
         action, _ = agent.make_decision(observation, simulation)
         self.assertEqual(2, len(action))
 
+    def test_make_decision_with_action_search(self):
+        """A test to see if agent makes decisions with configured action search.
+        """
+        data_collection_config = read_config_file("test/simulation.yaml")
+        model_config = read_config_file("model/linear.yaml")
+        agent = QLearningAgent(data_collection_config, model_config=model_config,
+                               action_search_config={"name": "greedy"})
+        simulation = StockMarketSimulation(data_collection_config, reward_config=None)
+        observation = simulation.reset()
+        action, kwargs = agent.make_decision(observation, simulation)
+        self.assertIn(action.tolist(), simulation.legal_actions().tolist())
+        self.assertEqual(kwargs["sa_value"], kwargs["q_value"])
+
+    def test_id_includes_action_search(self):
+        """Checks if agents with different action searches have different ids.
+        """
+        data_collection_config = read_config_file("test/simulation.yaml")
+        model_config = read_config_file("model/linear.yaml")
+        id_strs = [QLearningAgent(data_collection_config, model_config=model_config,
+                                  action_search_config=config).id_str
+                   for config in [None, {"name": "greedy"}, {"name": "beam", "beam_width": 2},
+                                  {"name": "beam", "beam_width": 4}]]
+        self.assertEqual(len(id_strs), len(set(id_strs)))
+        agent = QLearningAgent(data_collection_config, model_config=model_config,
+                               action_search_config={"name": "exhaustive"})
+        self.assertEqual(id_strs[0], agent.id_str)
+
     def test_apply_learning(self):
         """A test to see if q learning agent can apply learning.
         """
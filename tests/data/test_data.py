@@ -1,10 +1,16 @@
 """Unit tests for data.
 """
+from concurrent.futures import ThreadPoolExecutor
+import time
+
 import unittest
+from unittest import mock
 
+import numpy as np
 import pandas as pd
 
 from stock_trading_backend.data import Data
+from stock_trading_backend.util import RollingWindowEngine
 
 
 class TestData(unittest.TestCase):
@@ -77,3 +83,23 @@ class TestData(unittest.TestCase):
         self.assertEqual(0, data.buffer)
         data.buffer_days([0, 10])
         self.assertEqual(10, data.buffer)
+
+    def test_rolling_window_engine_threads(self):
+        """Tests if the rolling window engine is built once when requested by multiple threads.
+        """
+        data = Data()
+        data.data = pd.DataFrame({"STOCK_1": np.arange(50.0)})
+        num_engines = []
+
+        def slow_engine(values):
+            num_engines.append(1)
+            time.sleep(0.01)
+            return RollingWindowEngine(values)
+
+        with mock.patch("stock_trading_backend.data.data.RollingWindowEngine", slow_engine):
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                engines = list(executor.map(lambda _: data.get_rolling_window_engine(),
+                                            range(8)))
+        self.assertEqual(1, len(num_engines))
+        self.assertTrue(all(engine is engines[0] for engine in engines))
+
@@ -0,0 +1,78 @@
+"""Unit tests for the data cache.
+"""
+from datetime import datetime
+import os
+import shutil
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from stock_trading_backend.data import DataCache, GeneratedStockData, RunningAverageAnalysis
+
+CACHE_PATH = "data/test/cache"
+
+
+class TestDataCache(unittest.TestCase):
+    """Unit tests for the data cache.
+    """
+    def tearDown(self):
+        """Removes the cached files.
+        """
+        if os.path.isdir(CACHE_PATH):
+            shutil.rmtree(CACHE_PATH)
+
+    def test_saves_and_loads(self):
+        """Checks if the cached data is the same as the saved data.
+        """
+        data_cache = DataCache(CACHE_PATH)
+        index = pd.date_range(datetime(2016, 1, 1), datetime(2016, 2, 1), name="Date")
+        data_frame = pd.DataFrame({"STOCK_1": np.random.rand(len(index)),
+                                   "STOCK_2": np.random.rand(len(index))}, index=index)
+        self.assertIsNone(data_cache.load("key"))
+        data_cache.save("key", data_frame)
+        pd.testing.assert_frame_equal(data_frame, data_cache.load("key"), check_freq=False)
+        self.assertEqual(["key.npz"], os.listdir(CACHE_PATH))
+
+    def test_get_key(self):
+        """Checks if the key depends on the parameters, dependencies, stocks and date range.
+        """
+        from_date = datetime(2016, 1, 1)
+        to_date = datetime(2016, 2, 1)
+        stock_names = ["STOCK_1", "STOCK_2"]
+        data = RunningAverageAnalysis(dependencies=["stock_data"], num_days=5)
+        key = DataCache.get_key(data, ["dependency"], stock_names, from_date, to_date)
+        same_data = RunningAverageAnalysis(dependencies=["stock_data"], num_days=5)
+        self.assertEqual(key, DataCache.get_key(same_data, ["dependency"], stock_names,
+                                                from_date, to_date))
+        other_keys = [
+            DataCache.get_key(RunningAverageAnalysis(dependencies=["stock_data"], num_days=10),
+                              ["dependency"], stock_names, from_date, to_date),
+            DataCache.get_key(data, ["other_dependency"], stock_names, from_date, to_date),
+            DataCache.get_key(data, ["dependency"], stock_names[:1], from_date, to_date),
+            DataCache.get_key(data, ["dependency"], stock_names, from_date, datetime(2016, 3, 1)),
+        ]
+        self.assertNotIn(key, other_keys)
+        self.assertEqual(len(other_keys), len(set(other_keys)))
+
+    def test_key_ignores_state(self):
+        """Checks if the key of the data doesn't change when the data is used.
+        """
+        from_date = datetime(2016, 1, 1)
+        to_date = datetime(2016, 2, 1)
+        data = GeneratedStockData(evaluation_functions=["diff"])
+        key = DataCache.get_key(data, [], ["STOCK_1"], from_date, to_date)
+        data.prepare_data(from_date, to_date, ["STOCK_1"], [])
+        data.get_rolling_window_engine()
+        data.set_bar_length([7])
+        self.assertEqual(key, DataCache.get_key(data, [], ["STOCK_1"], from_date, to_date))
+
+    def test_get_parameters(self):
+        """Checks if only plain attributes are used as parameters.
+        """
+        data = GeneratedStockData(evaluation_functions=["diff"])
+        parameters = data.get_parameters()
+        self.assertEqual(["diff"], parameters["evaluation_functions"])
+        self.assertNotIn("compiled_functions", parameters)
+        self.assertNotIn("data", parameters)
@@ -1,12 +1,17 @@
 """Unit tests for data collection.
 """
-from datetime import datetime
+from datetime import datetime, timedelta
+import os
+import shutil
 
 import unittest
 
+import numpy as np
+import pandas as pd
 from parameterized import parameterized
 
 from stock_trading_backend.data import create_data_collection, RealStockData
+from stock_trading_backend.data.data_cache import DataCache
 from stock_trading_backend.util import read_config_file
 
 
@@ -149,6 +154,296 @@ class TestDataCollection(unittest.TestCase):
         available_dates = data_collection.get_available_dates()
         self.assertTrue((expected_index == data_collection[available_dates[0]].index.tolist()))
 
+    def test_feature_matrix(self):
+        """Checks if dense feature matrix matches the visible data.
+        """
+        from_date = datetime(2016, 1, 1)
+        to_date = datetime(2016, 2, 1)
+        config = read_config_file("data/generated_1.yaml")
+        data_collection = create_data_collection(config)
+        data_collection.set_date_range(from_date, to_date)
+        data_collection.prepare_data()
+        available_dates = data_collection.get_available_dates()
+        self.assertEqual(available_dates, data_collection.available_dates)
+        self.assertEqual((len(available_dates), 4), data_collection.feature_matrix.shape)
+        self.assertTrue(data_collection.feature_matrix.flags["C_CONTIGUOUS"])
+        self.assertEqual(data_collection.visible_df.columns.tolist(),
+                         data_collection.feature_names)
+        for row, date in enumerate(available_dates):
+            self.assertEqual(row, data_collection.date_to_row[date])
+            self.assertTrue((data_collection[date].to_numpy() == data_collection.row(row)).all())
+        self.assertEqual((3, 4), data_collection.rows(slice(2, 5)).shape)
+        stock_data = data_collection.id_to_data[data_collection.absolute_stock_data_id]
+        self.assertTrue((stock_data[available_dates[0]] == data_collection.prices(0)).all())
+
+    def test_history_windows(self):
+        """Checks if history windows are read-only views of the feature matrix.
+        """
+        config = read_config_file("data/generated_1.yaml")
+        data_collection = create_data_collection(config)
+        data_collection.set_date_range(datetime(2016, 1, 1), datetime(2016, 2, 1))
+        data_collection.prepare_data()
+        num_dates = len(data_collection.available_dates)
+        windows = data_collection.history_windows(5)
+        self.assertEqual((num_dates - 4, 5, 4), windows.shape)
+        self.assertTrue(np.shares_memory(windows, data_collection.feature_matrix))
+        self.assertFalse(windows.flags["WRITEABLE"])
+        self.assertIs(windows, data_collection.history_windows(5))
+        for index in [0, 3, num_dates - 5]:
+            self.assertTrue((data_collection.rows(slice(index, index + 5)) ==
+                             windows[index]).all())
+
+    def test_resample_frequency(self):
+        """Checks if resampled collection uses weekly bars for prices and analyses.
+        """
+        config = read_config_file("data/generated_1.yaml")
+        data_collection = create_data_collection(config)
+        data_collection.set_date_range(datetime(2016, 1, 1), datetime(2016, 4, 1))
+        data_collection.prepare_data()
+        daily_df = data_collection.visible_df
+        daily_stock_data = data_collection.id_to_data[data_collection.absolute_stock_data_id]
+
+        config["resample_frequency"] = "weekly"
+        data_collection = create_data_collection(config)
+        data_collection.set_date_range(datetime(2016, 1, 1), datetime(2016, 4, 1))
+        data_collection.prepare_data()
+        self.assertEqual("weekly_generated_stock_data", data_collection.absolute_stock_data_id)
+        dates = data_collection.available_dates
+        self.assertTrue(all(date.weekday() == 6 for date in dates[:-1]))
+        self.assertEqual(len(dates), len(data_collection.feature_matrix))
+        self.assertTrue((daily_stock_data.data.loc[dates].to_numpy() ==
+                         data_collection.price_matrix).all())
+
+        # Running average is taken over the last 5 weeks, not days.
+        self.assertFalse(np.allclose(daily_df.loc[dates].to_numpy(),
+                                     data_collection.feature_matrix))
+        weekly_average = data_collection.visible_df.iloc[-1, 2:]
+        self.assertTrue(np.allclose(daily_stock_data.data.loc[dates[-5:]].mean().to_numpy(),
+                                    weekly_average.to_numpy()))
+
+    @parameterized.expand([
+        (None,),
+        ("weekly",),
+        ("monthly",),
+    ])
+    def test_resampled_buffer(self, resample_frequency):
+        """Checks if the buffer covers the windows of resampled data from the start date.
+
+        Args:
+            resample_frequency: the resample frequency.
+        """
+        from_date = datetime(2016, 1, 1)
+        config = read_config_file("data/generated_1.yaml")
+        config["data"][1]["num_days"] = 10
+        config["data"].append({"name": "running_average_analysis", "num_days": 20,
+                               "dependencies": ["stock_data"]})
+        config["resample_frequency"] = resample_frequency
+        data_collection = create_data_collection(config)
+        buffer = data_collection.get_buffer()
+        data_collection.set_date_range(from_date - timedelta(days=buffer), datetime(2017, 1, 1))
+        data_collection.prepare_data()
+        self.assertLessEqual(data_collection.available_dates[0], from_date)
+
+    def test_reset_without_randomization(self):
+        """Checks if reset doesn't prepare the data again when nothing changes.
+        """
+        config = read_config_file("data/generated_1.yaml")
+        data_collection = create_data_collection(config)
+        data_collection.set_date_range(datetime(2016, 1, 1), datetime(2016, 2, 1))
+        data_collection.prepare_data()
+        feature_matrix = data_collection.feature_matrix
+        self.assertEqual(set(), data_collection.get_volatile_ids())
+        data_collection.reset()
+        self.assertEqual(0, data_collection.recursive_counter)
+        data_collection.prepare_data()
+        self.assertEqual(0, data_collection.recursive_counter)
+        self.assertIs(feature_matrix, data_collection.feature_matrix)
+
+    def test_reset_updates_randomized_data(self):
+        """Checks if reset updates the randomized data in place.
+        """
+        config = read_config_file("data/generated_1.yaml")
+        config["stock_data_randomization"] = True
+        data_collection = create_data_collection(config)
+        data_collection.set_date_range(datetime(2016, 1, 1), datetime(2016, 2, 1))
+        data_collection.prepare_data()
+        feature_matrix = data_collection.feature_matrix
+        values_before_reset = feature_matrix.copy()
+        self.assertEqual(2, len(data_collection.get_volatile_ids()))
+
+        data_collection.reset()
+        data_collection.prepare_data()
+        self.assertEqual(2, data_collection.recursive_counter)
+        self.assertIs(feature_matrix, data_collection.feature_matrix)
+        self.assertFalse(np.allclose(values_before_reset, feature_matrix))
+        expected = pd.concat([data.data for data in data_collection.visible_data_objects],
+                             axis=1, join="inner")
+        self.assertTrue(np.allclose(expected.to_numpy(), feature_matrix))
+        self.assertTrue(np.allclose(expected.to_numpy(), data_collection.visible_df.to_numpy()))
+        stock_data = data_collection.id_to_data[data_collection.absolute_stock_data_id]
+        stock_prices = stock_data.data.reindex(data_collection.available_dates).to_numpy()
+        self.assertTrue(np.allclose(stock_prices, data_collection.price_matrix))
+
+    def test_randomization_variants(self):
+        """Checks if data derived from the randomization variants is cached.
+        """
+        np.random.seed(0)
+        config = read_config_file("data/generated_1.yaml")
+        config["stock_data_randomization"] = True
+        config["randomization_variants"] = 2
+        data_collection = create_data_collection(config)
+        data_collection.set_date_range(datetime(2016, 1, 1), datetime(2016, 2, 1))
+        data_collection.prepare_data()
+        randomization_layer = data_collection.data_objects[0]
+        variant_features = {randomization_layer.variant: data_collection.feature_matrix.copy()}
+        for _ in range(10):
+            data_collection.reset()
+            data_collection.prepare_data()
+            if randomization_layer.variant in variant_features:
+                # Only the randomization layer is prepared.
+                self.assertEqual(1, data_collection.recursive_counter)
+                self.assertTrue(np.array_equal(variant_features[randomization_layer.variant],
+                                               data_collection.feature_matrix))
+            else:
+                self.assertEqual(2, data_collection.recursive_counter)
+                variant_features[randomization_layer.variant] = (
+                    data_collection.feature_matrix.copy())
+        self.assertEqual(2, len(variant_features))
+        self.assertEqual(2, len(data_collection.variant_cache))
+
+    def test_execution_plan(self):
+        """Checks if the data is arranged into levels of a topological execution plan.
+        """
+        config = read_config_file("data/generated_1.yaml")
+        config["data"].append({"name": "running_average_analysis", "num_days": 10,
+                               "dependencies": ["stock_data"]})
+        config["stock_data_randomization"] = True
+        data_collection = create_data_collection(config)
+        plan = data_collection.execution_plan()
+        self.assertEqual(3, len(plan))
+        self.assertEqual(["generated_stock_data"], plan[0])
+        self.assertEqual([data_collection.stock_data_id], plan[1])
+        self.assertEqual(2, len(plan[2]))
+        self.assertIs(plan, data_collection.execution_plan())
+
+    def test_parallel_preparation(self):
+        """Checks if preparing the data with multiple workers gives the same data.
+        """
+        config = read_config_file("data/generated_1.yaml")
+        for num_days in [10, 20, 30]:
+            config["data"].append({"name": "running_average_analysis", "num_days": num_days,
+                                   "dependencies": ["stock_data"]})
+        feature_matrices = []
+        for num_workers in [1, 4]:
+            config["num_workers"] = num_workers
+            data_collection = create_data_collection(config)
+            data_collection.set_date_range(datetime(2016, 1, 1), datetime(2016, 3, 1))
+            data_collection.prepare_data()
+            self.assertEqual(5, data_collection.recursive_counter)
+            for data in data_collection.data_objects:
+                self.assertTrue(data.ready)
+            feature_matrices.append(data_collection.feature_matrix)
+        self.assertTrue(np.array_equal(feature_matrices[0], feature_matrices[1]))
+
+        config["num_workers"] = 0
+        with self.assertRaises(ValueError):
+            create_data_collection(config)
+
+    def test_data_cache(self):
+        """Checks if prepared data is loaded from the data cache by another data collection.
+        """
+        cache_path = "data/test/data_collection_cache"
+        config = read_config_file("data/generated_1.yaml")
+        config["cache_path"] = cache_path
+        try:
+            feature_matrices = []
+            for expected_counter in [2, 0]:
+                data_collection = create_data_collection(config)
+                data_collection.set_date_range(datetime(2016, 1, 1), datetime(2016, 3, 1))
+                data_collection.prepare_data()
+                self.assertEqual(expected_counter, data_collection.recursive_counter)
+                feature_matrices.append(data_collection.feature_matrix)
+            self.assertTrue(np.array_equal(feature_matrices[0], feature_matrices[1]))
+
+            # Randomized data and the data depending on it is not cached.
+            config["stock_data_randomization"] = True
+            for _ in range(2):
+                data_collection = create_data_collection(config)
+                data_collection.set_date_range(datetime(2016, 1, 1), datetime(2016, 3, 1))
+                data_collection.prepare_data()
+                self.assertEqual(2, data_collection.recursive_counter)
+            self.assertEqual(2, len(os.listdir(cache_path)))
+        finally:
+            shutil.rmtree(cache_path)
+
+    @parameterized.expand([("dates",), ("columns",)])
+    def test_rebuilds_matrices(self, change):
+        """Checks if the matrices are rebuilt when the prepared data changes dates or columns.
+
+        Args:
+            change: what changes in the running averages prepared again.
+        """
+        def build(data_collection):
+            running_average = data_collection.visible_data_objects[1]
+            prepare_data = running_average.prepare_data
+
+            def changed_prepare_data(*args):
+                prepare_data(*args)
+                if change == "dates":
+                    running_average.data = running_average.data.iloc[:-3]
+                else:
+                    running_average.data = running_average.data.assign(extra=1.0)
+
+            running_average.prepare_data = changed_prepare_data
+            running_average.ready = False
+            data_collection.prepare_data()
+
+        config = read_config_file("data/generated_1.yaml")
+        data_collection = create_data_collection(config)
+        data_collection.set_date_range(datetime(2016, 1, 1), datetime(2016, 2, 1))
+        data_collection.prepare_data()
+        feature_matrix = data_collection.feature_matrix
+        build(data_collection)
+        self.assertIsNot(feature_matrix, data_collection.feature_matrix)
+
+        fresh_data_collection = create_data_collection(config)
+        fresh_data_collection.set_date_range(datetime(2016, 1, 1), datetime(2016, 2, 1))
+        build(fresh_data_collection)
+        self.assertEqual(fresh_data_collection.available_dates, data_collection.available_dates)
+        self.assertEqual(fresh_data_collection.feature_names, data_collection.feature_names)
+        num_dates = len(data_collection.available_dates)
+        self.assertEqual(25 if change == "dates" else 28, num_dates)
+        for index in range(num_dates):
+            self.assertTrue(np.array_equal(fresh_data_collection.row(index),
+                                           data_collection.row(index)))
+            self.assertTrue(np.array_equal(fresh_data_collection.prices(index),
+                                           data_collection.prices(index)))
+        self.assertTrue(np.array_equal(fresh_data_collection.rows(slice(2, 5)),
+                                       data_collection.rows(slice(2, 5))))
+
+    def test_cache_keys_of_uncached_data(self):
+        """Checks if data that isn't cached gets a content key and data depending on data
+        without a key isn't cached.
+        """
+        cache_path = "data/test/data_collection_cache"
+        config = read_config_file("data/generated_1.yaml")
+        config["cache_path"] = cache_path
+        try:
+            data_collection = create_data_collection(config)
+            data_collection.set_date_range(datetime(2016, 1, 1), datetime(2016, 3, 1))
+            stock_data = data_collection.id_to_data[data_collection.stock_data_id]
+            stock_data.cacheable = False
+            data_collection.prepare_data()
+            self.assertEqual(1, len(os.listdir(cache_path)))
+            stock_key = data_collection.cache_keys[data_collection.stock_data_id]
+            self.assertEqual(DataCache.get_content_key(stock_data.data), stock_key)
+
+            running_average = data_collection.visible_data_objects[1]
+            del data_collection.cache_keys[data_collection.stock_data_id]
+            self.assertIsNone(data_collection._cache_key(running_average))
+        finally:
+            shutil.rmtree(cache_path)
+
     def test_hash(self):
         """Checks if __hash__ works.
         """
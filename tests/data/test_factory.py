@@ -7,6 +7,7 @@ from parameterized import parameterized
 from stock_trading_backend.data import create_data, GeneratedStockData, RandomizedStockData
 from stock_trading_backend.data import RealStockData, DataCollection, ComparatorAnalysis
 from stock_trading_backend.data import RunningAverageAnalysis, create_data_collection
+from stock_trading_backend.data import TechnicalIndicatorBank
 from stock_trading_backend.util import read_config_file
 
 
@@ -19,6 +20,7 @@ class TestDataFactory(unittest.TestCase):
         ("test/randomized_stock_data.yaml", RandomizedStockData),
         ("test/real_stock_data.yaml", RealStockData),
         ("test/running_average_analysis.yaml", RunningAverageAnalysis),
+        ("test/technical_indicator_bank.yaml", TechnicalIndicatorBank),
     ])
     def test_creates_data(self, config_filename, expected_class):
         """Checks if created data class is of the right class.
@@ -2,6 +2,7 @@
 """
 from datetime import datetime
 
+import math
 import unittest
 
 from stock_trading_backend.data import GeneratedStockData
@@ -46,3 +47,32 @@ class TestGeneratedStockData(unittest.TestCase):
         self.assertTrue(data.ready)
         data.reset([])
         self.assertTrue(data.ready)
+
+    def test_evaluates_expressions(self):
+        """Tests if the expressions are evaluated for every day.
+        """
+        from_date = datetime(2016, 1, 1)
+        to_date = datetime(2016, 2, 1)
+        expression = "200 + 100 * math.sin(math.pi * 2 * diff / 40)"
+        data = GeneratedStockData(evaluation_functions=[expression, "diff"])
+        data.prepare_data(from_date, to_date, ["STOCK_1", "STOCK_2"], [])
+        first_diff = (from_date - data.anchor_date).days
+        for day_index, values in enumerate(data.data.values):
+            diff = first_diff + day_index
+            self.assertAlmostEqual(200 + 100 * math.sin(math.pi * 2 * diff / 40), values[0])
+            self.assertEqual(diff, values[1])
+
+    def test_rejects_unsafe_expressions(self):
+        """Tests if raises exception for expressions that are not arithmetic.
+        """
+        with self.assertRaises(ValueError):
+            _ = GeneratedStockData(evaluation_functions=["__import__('os').getcwd()"])
+
+    def test_large_powers(self):
+        """Tests if large powers of diff don't overflow.
+        """
+        date = datetime(2016, 1, 1)
+        data = GeneratedStockData(evaluation_functions=["diff ** 6"])
+        data.prepare_data(date, date, ["STOCK_1"], [])
+        diff = (date - data.anchor_date).days
+        self.assertAlmostEqual(1, data[date][0] / diff ** 6)
@@ -2,10 +2,13 @@
 """
 from datetime import datetime
 
+import os
+import tempfile
 import unittest
 import numpy as np
 
 from stock_trading_backend.data import RandomizedStockData, GeneratedStockData
+from stock_trading_backend.data.randomized_stock_data import _replace_file
 
 
 class TestRandomizedStockData(unittest.TestCase):
@@ -59,3 +62,75 @@ class TestRandomizedStockData(unittest.TestCase):
         data.prepare_data(from_date, to_date, stock_names, [dependency])
         data_after_reset = data.data["STOCK_1"]
         self.assertFalse(data_before_reset.equals(data_after_reset))
+
+    def test_noise_bank(self):
+        """Tests if the data is prepared from the noise bank.
+        """
+        from_date = datetime(2016, 1, 1)
+        to_date = datetime(2016, 3, 1)
+        stock_names = ["STOCK_1", "STOCK_2"]
+        dependency = GeneratedStockData(evaluation_functions=["100", "200"])
+        data = RandomizedStockData(dependencies=["stock_data"], num_variants=3)
+        dependency.prepare_data(from_date, to_date, stock_names, [])
+
+        variant_data = {}
+        for _ in range(20):
+            data.reset([True])
+            data.prepare_data(from_date, to_date, stock_names, [dependency])
+            self.assertEqual((3, len(dependency.data), 2), data.noise_bank.shape)
+            self.assertIn(data.variant, range(3))
+            expected = dependency.data.to_numpy() * data.noise_bank[data.variant]
+            self.assertTrue(np.allclose(expected, data.data.to_numpy()))
+            variant_data.setdefault(data.variant, data.data)
+            self.assertTrue(variant_data[data.variant].equals(data.data))
+        self.assertEqual(3, len(variant_data))
+
+    def test_noise_bank_memory_map(self):
+        """Tests if the noise bank is stored in and loaded from the file.
+        """
+        from_date = datetime(2016, 1, 1)
+        to_date = datetime(2016, 3, 1)
+        stock_names = ["STOCK_1"]
+        dependency = GeneratedStockData(evaluation_functions=["100"])
+        dependency.prepare_data(from_date, to_date, stock_names, [])
+        with tempfile.TemporaryDirectory() as directory:
+            bank_path = os.path.join(directory, "noise_bank.npy")
+            data = RandomizedStockData(dependencies=["stock_data"], num_variants=2,
+                                       bank_path=bank_path)
+            data.prepare_data(from_date, to_date, stock_names, [dependency])
+            self.assertTrue(os.path.isfile(bank_path))
+
+            other_data = RandomizedStockData(dependencies=["stock_data"], num_variants=2,
+                                             bank_path=bank_path)
+            other_data.prepare_data(from_date, to_date, stock_names, [dependency])
+            self.assertIsInstance(other_data.noise_bank, np.memmap)
+            self.assertTrue(np.array_equal(data.noise_bank, other_data.noise_bank))
+
+            # A bank generated with other parameters is not used.
+            other_data = RandomizedStockData(dependencies=["stock_data"], num_variants=2,
+                                             stdev=0.5, bank_path=bank_path)
+            other_data.prepare_data(from_date, to_date, stock_names, [dependency])
+            self.assertGreater(np.std(other_data.noise_bank), 0.1)
+            other_data.stdev = 0.025
+            other_data.prepare_data(from_date, to_date, stock_names, [dependency])
+            self.assertLess(np.std(other_data.noise_bank), 0.1)
+            self.assertEqual(["noise_bank.npy", "noise_bank.npy.json"],
+                             sorted(os.listdir(directory)))
+            del data, other_data
+
+    def test_replace_file(self):
+        """Tests if files are replaced atomically.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "file.json")
+            _replace_file(path, lambda file: file.write("old"), mode="w")
+
+            def failing_write(file):
+                file.write("new")
+                raise RuntimeError("Write failed.")
+
+            with self.assertRaises(RuntimeError):
+                _replace_file(path, failing_write, mode="w")
+            self.assertEqual(["file.json"], os.listdir(directory))
+            with open(path, encoding="utf-8") as file:
+                self.assertEqual("old", file.read())
@@ -0,0 +1,54 @@
+"""Unit tests for resampled stock data.
+"""
+from datetime import datetime
+
+import unittest
+
+from stock_trading_backend.data import ResampledStockData, GeneratedStockData
+
+
+class TestResampledStockData(unittest.TestCase):
+    """Unit tests for resampled stock data.
+    """
+    def test_initializes(self):
+        """Tests if initializes properly.
+        """
+        data = ResampledStockData(dependencies=["stock_data"])
+        self.assertEqual("weekly_stock_data", data.id_str)
+        self.assertFalse(data.visible)
+        data = ResampledStockData(dependencies=["stock_data"], frequency="monthly")
+        self.assertEqual("monthly_stock_data", data.id_str)
+        with self.assertRaises(ValueError):
+            _ = ResampledStockData(dependencies=["stock_data"], frequency="hourly")
+
+    def test_prepare_data(self):
+        """Tests if the data is prepared properly.
+        """
+        from_date = datetime(2016, 1, 1)
+        to_date = datetime(2016, 3, 2)
+        stock_names = ["STOCK_1"]
+        dependency = GeneratedStockData(evaluation_functions=["diff"])
+        dependency.prepare_data(from_date, to_date, stock_names, [])
+
+        data = ResampledStockData(dependencies=["stock_data"])
+        data.prepare_data(from_date, to_date, stock_names, [dependency])
+        self.assertTrue(data.ready)
+        self.assertEqual(stock_names, data.data.columns.tolist())
+        # Weeks end on Sunday, the last week is cut by the date range.
+        self.assertEqual([datetime(2016, 1, 3), datetime(2016, 1, 10)],
+                         data.data.index[:2].tolist())
+        self.assertEqual(to_date, data.data.index[-1])
+        self.assertEqual(10, len(data))
+        self.assertTrue((dependency.data.loc[data.data.index] == data.data).all().all())
+
+        data = ResampledStockData(dependencies=["stock_data"], frequency="monthly")
+        data.prepare_data(from_date, to_date, stock_names, [dependency])
+        self.assertEqual([datetime(2016, 1, 31), datetime(2016, 2, 29), to_date],
+                         data.data.index.tolist())
+
+    def test_get_buffer(self):
+        """Tests if the buffer is calculated properly.
+        """
+        data = ResampledStockData(dependencies=["stock_data"])
+        data.buffer_days([5])
+        self.assertEqual(12, data.buffer)
@@ -4,6 +4,8 @@ from datetime import datetime
 
 import unittest
 
+import numpy as np
+
 from stock_trading_backend.data import RunningAverageAnalysis, GeneratedStockData
 
 
@@ -56,3 +58,26 @@ class TestRunningAverageAnalysis(unittest.TestCase):
         data = RunningAverageAnalysis(dependencies=["stock_data"], num_days=30)
         data.buffer_days([0])
         self.assertEqual(30, data.buffer)
+
+    def test_backends(self):
+        """Tests if the prefix sum backend gives the same data as the pandas backend.
+        """
+        from_date = datetime(2016, 1, 1)
+        to_date = datetime(2016, 6, 1)
+        stock_names = ["STOCK_1", "STOCK_2"]
+        dependency = GeneratedStockData(evaluation_functions=[
+            "200 + 100 * math.sin(diff / 7)", "100 + diff"])
+        dependency.prepare_data(from_date, to_date, stock_names, [])
+        for num_days in [1, 5, 30]:
+            data = RunningAverageAnalysis(dependencies=["stock_data"], num_days=num_days)
+            pandas_data = RunningAverageAnalysis(dependencies=["stock_data"], num_days=num_days,
+                                                 backend="pandas")
+            data.prepare_data(from_date, to_date, stock_names, [dependency])
+            pandas_data.prepare_data(from_date, to_date, stock_names, [dependency])
+            self.assertTrue(data.data.index.equals(pandas_data.data.index))
+            self.assertEqual(pandas_data.data.columns.tolist(), data.data.columns.tolist())
+            self.assertTrue(np.allclose(pandas_data.data.to_numpy(), data.data.to_numpy()))
+        self.assertIs(dependency.get_rolling_window_engine(),
+                      dependency.get_rolling_window_engine())
+        with self.assertRaises(ValueError):
+            _ = RunningAverageAnalysis(dependencies=["stock_data"], backend="unknown")
@@ -0,0 +1,98 @@
+"""Unit tests for technical indicator bank.
+"""
+from datetime import datetime
+
+import unittest
+
+import numpy as np
+
+from stock_trading_backend.data import GeneratedStockData, TechnicalIndicatorBank
+
+
+class TestTechnicalIndicatorBank(unittest.TestCase):
+    """Unit tests for technical indicator bank.
+    """
+    def setUp(self):
+        """Prepares the stock data the indicators are computed from.
+        """
+        self.stock_names = ["STOCK_1", "STOCK_2"]
+        self.dependency = GeneratedStockData(evaluation_functions=[
+            "200 + 100 * math.sin(diff / 7) + diff", "1000 + 3 * math.cos(diff / 3)"])
+        self.dependency.prepare_data(datetime(2016, 1, 1), datetime(2016, 6, 1),
+                                     self.stock_names, [])
+
+    def _feature(self, data, indicator):
+        """Returns the values of the indicator for all of the stocks.
+
+        Args:
+            data: the prepared indicator bank.
+            indicator: the name of the indicator, e.g. "sma_5".
+        """
+        columns = ["{}_stock_data_{}".format(indicator, name) for name in self.stock_names]
+        return data.data[columns].to_numpy()
+
+    def test_initializes(self):
+        """Tests if initializes properly.
+        """
+        data = TechnicalIndicatorBank(dependencies=["stock_data"], sma_windows=[5, 20],
+                                      macd=[12, 26, 9])
+        self.assertEqual("indicators_sma_5_20_macd_12_26_9_for_stock_data", data.id_str)
+        self.assertTrue(data.visible)
+        with self.assertRaises(ValueError):
+            _ = TechnicalIndicatorBank(dependencies=["stock_data"])
+        with self.assertRaises(ValueError):
+            _ = TechnicalIndicatorBank(dependencies=["stock_data"], macd=[12, 26])
+
+    def test_prepare_data(self):
+        """Tests if the indicators match the pandas computations.
+        """
+        data = TechnicalIndicatorBank(dependencies=["stock_data"], sma_windows=[5, 20],
+                                      ema_windows=[12], bollinger_windows=[10], rsi_windows=[14],
+                                      macd=[12, 26, 9], roc_windows=[10])
+        data.prepare_data(None, None, self.stock_names, [self.dependency])
+        self.assertTrue(data.ready)
+        self.assertEqual(2 * 10, len(data.data.columns))
+        self.assertEqual(len(self.dependency) - 19, len(data))
+
+        stock_data = self.dependency.data
+        index = data.data.index
+        sma_10 = stock_data.rolling(10).mean()
+        std_10 = stock_data.rolling(10).std()
+        diffs = stock_data.diff()
+        gains = diffs.clip(lower=0).rolling(14).mean()
+        losses = (-diffs).clip(lower=0).rolling(14).mean()
+        macd = (stock_data.ewm(span=12, adjust=False).mean()
+                - stock_data.ewm(span=26, adjust=False).mean())
+        expected = {
+            "sma_5": stock_data.rolling(5).mean(),
+            "sma_20": stock_data.rolling(20).mean(),
+            "ema_12": stock_data.ewm(span=12, adjust=False).mean(),
+            "std_10": std_10,
+            "bb_upper_10": sma_10 + 2 * std_10,
+            "bb_lower_10": sma_10 - 2 * std_10,
+            "rsi_14": 100 * gains / (gains + losses),
+            "macd_12_26": macd,
+            "macd_signal_12_26_9": macd.ewm(span=9, adjust=False).mean(),
+            "roc_10": stock_data / stock_data.shift(10) - 1,
+        }
+        for indicator, values in expected.items():
+            self.assertTrue(np.allclose(values.loc[index].to_numpy(),
+                                        self._feature(data, indicator)), indicator)
+
+    def test_rsi_of_constant_prices(self):
+        """Tests if RSI is neutral when the prices don't change.
+        """
+        dependency = GeneratedStockData(evaluation_functions=["100"])
+        dependency.prepare_data(datetime(2016, 1, 1), datetime(2016, 2, 1), ["STOCK_1"], [])
+        data = TechnicalIndicatorBank(dependencies=["stock_data"], rsi_windows=[5])
+        data.prepare_data(None, None, ["STOCK_1"], [dependency])
+        self.assertEqual(len(dependency) - 5, len(data))
+        self.assertTrue(np.all(data.data.to_numpy() == 50))
+
+    def test_buffer_days(self):
+        """Tests if number of buffer days is calculated.
+        """
+        data = TechnicalIndicatorBank(dependencies=["stock_data"], sma_windows=[5, 20],
+                                      rsi_windows=[14], macd=[12, 26, 9])
+        data.buffer_days([3])
+        self.assertEqual(3 + 26 + 9, data.buffer)
@@ -0,0 +1,63 @@
+"""Unit tests for action cache.
+"""
+import unittest
+
+import numpy as np
+
+from stock_trading_backend.simulation.action_cache import ActionCache, generate_actions
+from stock_trading_backend.simulation.action_cache import get_action_cache
+
+
+class TestActionCache(unittest.TestCase):
+    """Unit tests for action cache.
+    """
+    def test_generate_actions(self):
+        """Checks if all legal actions are generated.
+        """
+        possible_actions = list(generate_actions([1, 0, 0], 2))
+        self.assertEqual(6, len(possible_actions))
+        for action in [[0, 1, 1], [1, 1, 1], [0, 2, 1], [1, 2, 1], [0, 1, 2], [1, 1, 2]]:
+            self.assertIn(action, possible_actions)
+
+    def test_legal_actions(self):
+        """Checks if cached legal actions match the generated ones.
+        """
+        action_cache = ActionCache(4, 2)
+        for owned_stocks in [[0, 0, 0, 0], [3, 0, 0, 1], [0, 5, 0, 0]]:
+            expected_actions = list(generate_actions(owned_stocks, 2))
+            actions = action_cache.legal_actions(owned_stocks)
+            self.assertEqual(expected_actions, actions.tolist())
+            self.assertFalse(actions.flags.writeable)
+
+        # Same ownership mask returns the same array.
+        self.assertIs(action_cache.legal_actions([3, 0, 0, 1]),
+                      action_cache.legal_actions([1, 0, 0, 7]))
+        self.assertEqual(3, len(action_cache.actions))
+
+    def test_encode_decode(self):
+        """Checks if actions are encoded and decoded properly.
+        """
+        action_cache = ActionCache(3, 1)
+        self.assertEqual(0, action_cache.encode([0, 0, 0]))
+        self.assertEqual(1 + 3 * 2, action_cache.encode([1, 2, 0]))
+        self.assertEqual([1, 2, 0], action_cache.decode(7).tolist())
+
+        actions = action_cache.legal_actions([0, 1, 0])
+        action_ids = action_cache.legal_action_ids([0, 1, 0])
+        self.assertEqual(len(actions), len(action_ids))
+        self.assertTrue((action_cache.decode(action_ids) == actions).all())
+
+    def test_too_many_stocks_to_encode(self):
+        """Checks if encoding too many stocks raises error.
+        """
+        action_cache = ActionCache(40, 1)
+        with self.assertRaises(ValueError):
+            action_cache.encode(np.ones(40))
+        with self.assertRaises(ValueError):
+            action_cache.decode(0)
+
+    def test_get_action_cache(self):
+        """Checks if action caches are shared.
+        """
+        self.assertIs(get_action_cache(2, 1), get_action_cache(2, 1))
+        self.assertIsNot(get_action_cache(2, 1), get_action_cache(2, 2))
@@ -2,6 +2,8 @@
 """
 import unittest
 
+import numpy as np
+
 from stock_trading_backend.simulation.constant_reward import ConstantReward
 
 class TestConstantReward(unittest.TestCase):
@@ -30,3 +32,11 @@ class TestConstantReward(unittest.TestCase):
         """
         reward = ConstantReward()
         self.assertEqual(0, reward.calculate_overall_reward())
+
+    def test_calculate_batch(self):
+        """Checks if calculate batch gives the constant for every step.
+        """
+        reward = ConstantReward(5)
+        rewards, overall_rewards = reward.calculate_batch(np.ones((2, 4)))
+        np.testing.assert_array_equal(np.full((2, 3), 5), rewards)
+        np.testing.assert_array_equal([5, 5], overall_rewards)
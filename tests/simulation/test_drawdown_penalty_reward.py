@@ -0,0 +1,68 @@
+"""Unit tests for Drawdown Penalty Reward class.
+"""
+import unittest
+
+import numpy as np
+
+from stock_trading_backend.simulation.drawdown_penalty_reward import DrawdownPenaltyReward
+
+class TestDrawdownPenaltyReward(unittest.TestCase):
+    """Unit test for Drawdown Penalty Reward class.
+    """
+    def test_initializes(self):
+        """Checks if the reward is initialized properly.
+        """
+        reward = DrawdownPenaltyReward()
+        self.assertIsInstance(reward, DrawdownPenaltyReward)
+        self.assertEqual("drawdown_penalty_reward_1_1_0", reward.id_str)
+
+    def test_calculate_value(self):
+        """Checks if only the growth of the max drawdown is penalized.
+        """
+        reward = DrawdownPenaltyReward(penalty=2)
+        reward.reset({"net_worth": 100}, None)
+        self.assertEqual(1, reward.calculate_value({"net_worth": 200}, None))
+        # Drawdown of 0.25: -0.25 - 2 * 0.25.
+        self.assertAlmostEqual(-0.75, reward.calculate_value({"net_worth": 150}, None))
+        # Smaller drawdown is not penalized again.
+        self.assertAlmostEqual(0.2, reward.calculate_value({"net_worth": 180}, None))
+
+    def test_overall_reward(self):
+        """Checks if overall reward works properly.
+        """
+        reward = DrawdownPenaltyReward(penalty=2)
+        reward.reset({"net_worth": 100}, None)
+        for net_worth in [200, 150, 180, 200]:
+            reward.calculate_value({"net_worth": net_worth}, None)
+        self.assertAlmostEqual((1 - 2 * 0.25) / 4, reward.calculate_overall_reward())
+
+    def test_handles_zero(self):
+        """Checks if calculate value handles zero properly.
+        """
+        reward = DrawdownPenaltyReward()
+        reward.reset({"net_worth": 100}, None)
+        self.assertEqual(-2, reward.calculate_value({"net_worth": 0}, None))
+        self.assertEqual(-1, reward.calculate_value({"net_worth": 0}, None))
+
+    def test_resets(self):
+        """Checks if resets properly.
+        """
+        reward = DrawdownPenaltyReward()
+        reward.reset({"net_worth": 100}, None)
+        reward.calculate_value({"net_worth": 50}, None)
+        reward.reset({"net_worth": 100}, None)
+        self.assertEqual(1, reward.calculate_value({"net_worth": 200}, None))
+        self.assertEqual(0, reward.drawdown.max_drawdown)
+
+    def test_calculate_batch(self):
+        """Checks if calculate batch matches calculate value.
+        """
+        reward = DrawdownPenaltyReward(penalty=2)
+        net_worth = 100 * np.cumprod(1 + np.random.uniform(-0.1, 0.1, (4, 10)), axis=1)
+        rewards, overall_rewards = reward.calculate_batch(net_worth)
+        for index, episode_net_worth in enumerate(net_worth):
+            reward.reset({"net_worth": episode_net_worth[0]}, None)
+            for day, value in enumerate(episode_net_worth[1:]):
+                self.assertAlmostEqual(reward.calculate_value({"net_worth": value}, None),
+                                       rewards[index, day])
+            self.assertAlmostEqual(reward.calculate_overall_reward(), overall_rewards[index])
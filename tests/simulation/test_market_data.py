@@ -0,0 +1,63 @@
+"""Unit tests for market data.
+"""
+from datetime import datetime
+
+import unittest
+
+from stock_trading_backend.simulation import MarketData
+from stock_trading_backend.util import read_config_file
+
+
+class TestMarketData(unittest.TestCase):
+    """Unit tests for market data.
+    """
+    def test_initializes(self):
+        """Test for market data initialization.
+        """
+        data_collection_config = read_config_file("data/generated_1.yaml")
+        market_data = MarketData(data_collection_config, datetime(2016, 1, 1),
+                                 datetime(2016, 2, 1))
+        self.assertEqual(["STOCK_1", "STOCK_2"], market_data.stock_names)
+        # Running average of 5 days needs 5 buffer days.
+        self.assertEqual(datetime(2015, 12, 27), market_data.from_date)
+        self.assertEqual(market_data.data_collection.available_dates, market_data.available_dates)
+        self.assertEqual(0, market_data.feature_index["owned_STOCK_1"])
+        self.assertEqual(3, market_data.feature_index["net_worth"])
+        self.assertEqual(4 + len(market_data.data_collection.feature_names),
+                         len(market_data.feature_index))
+        self.assertIs(market_data.data_collection.id_to_data["generated_stock_data"],
+                      market_data.stock_data)
+        with self.assertRaises(ValueError):
+            _ = MarketData(data_collection_config, from_date=datetime(2016, 1, 1))
+
+    def test_keeps_config(self):
+        """Test if the config of the caller isn't changed by the market data settings.
+        """
+        data_collection_config = read_config_file("data/generated_1.yaml")
+        expected_config = read_config_file("data/generated_1.yaml")
+        market_data = MarketData(data_collection_config, datetime(2016, 1, 1),
+                                 datetime(2016, 3, 1), stock_data_randomization=True,
+                                 resample_frequency="weekly")
+        self.assertEqual(expected_config, data_collection_config)
+        self.assertEqual("weekly", market_data.data_collection_config["resample_frequency"])
+        weekly_dates = market_data.available_dates
+
+        market_data = MarketData(data_collection_config, datetime(2016, 1, 1),
+                                 datetime(2016, 3, 1))
+        self.assertNotIn("resample_frequency", market_data.data_collection_config)
+        self.assertGreater(len(market_data.available_dates), len(weekly_dates))
+
+    def test_reset(self):
+        """Test if reset prepares new randomized data, swapping in the prefetched data.
+        """
+        data_collection_config = read_config_file("test/simulation.yaml")
+        market_data = MarketData(data_collection_config, datetime(2016, 1, 1),
+                                 datetime(2016, 1, 10), stock_data_randomization=True,
+                                 prefetch=True)
+        data_collection = market_data.data_collection
+        prices = data_collection.price_matrix.copy()
+        market_data.reset()
+        self.assertIs(market_data.prefetch_collection, data_collection)
+        self.assertFalse((prices == market_data.data_collection.price_matrix).all())
+        market_data.close()
+        self.assertIsNone(market_data.prefetch_executor)
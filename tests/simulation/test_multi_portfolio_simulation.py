@@ -0,0 +1,75 @@
+"""Unit tests for multi-portfolio stock market simulation.
+"""
+from datetime import datetime
+
+import unittest
+
+import gym
+import numpy as np
+
+from stock_trading_backend.simulation import MultiPortfolioSimulation, StockMarketSimulation
+from stock_trading_backend.util import read_config_file
+
+
+class TestMultiPortfolioSimulation(unittest.TestCase):
+    """Unit tests for multi-portfolio stock market simulation.
+    """
+    def test_initializes(self):
+        """Test for multi-portfolio simulation initialization.
+        """
+        simulation = MultiPortfolioSimulation(num_portfolios=3)
+        self.assertEqual(3, simulation.num_portfolios)
+        self.assertEqual((3, 2), simulation.action_space.shape)
+        simulation = MultiPortfolioSimulation(start_balances=[100, 200])
+        self.assertEqual(2, simulation.num_portfolios)
+        self.assertEqual(2, len(simulation.reward_functions))
+
+    def test_initializes_from_gym(self):
+        """Test if multi-portfolio simulation can be initialized with gym.make()
+        """
+        simulation = gym.make("stock-market-multi-portfolio-v0", num_portfolios=2)
+        self.assertIsInstance(simulation, MultiPortfolioSimulation)
+
+    def test_resets(self):
+        """Test if all of the portfolios share the date window.
+        """
+        from_date = datetime(2016, 1, 1)
+        to_date = datetime(2016, 3, 1)
+        data_collection_config = read_config_file("test/simulation.yaml")
+        simulation = MultiPortfolioSimulation(data_collection_config, from_date, to_date,
+                                              min_duration=5, max_duration=10,
+                                              start_balances=[100, 200, 300])
+        observation = simulation.reset()
+        self.assertEqual([100, 200, 300], observation["balance"].tolist())
+        self.assertEqual(1, len(set(simulation.curr_date_index)))
+        self.assertEqual(1, len(set(simulation.to_date_index)))
+        self.assertEqual(1, len(observation.drop_duplicates(["GOOG", "AMZN"])))
+
+    def test_step_matches_single_simulation(self):
+        """Test if every portfolio matches the single simulation.
+        """
+        from_date = datetime(2016, 1, 1)
+        to_date = datetime(2016, 1, 5)
+        data_collection_config = read_config_file("test/simulation.yaml")
+        start_balances = [50, 100]
+        singles = [StockMarketSimulation(data_collection_config, from_date, to_date,
+                                         min_start_balance=balance, max_start_balance=balance,
+                                         max_stock_owned=2, commission=0.01)
+                   for balance in start_balances]
+        for observation_mode in ["series", "array"]:
+            simulation = MultiPortfolioSimulation(data_collection_config, from_date, to_date,
+                                                  max_stock_owned=2, commission=0.01,
+                                                  observation_mode=observation_mode,
+                                                  start_balances=start_balances)
+            for single in singles:
+                single.reset()
+            simulation.reset()
+
+            for actions in [[[2, 1], [1, 2]], [[0, 2], [2, 1]], [[1, 0], [0, 1]]]:
+                observation, reward, done = simulation.step(actions)
+                for index, single in enumerate(singles):
+                    single_observation, single_reward, single_done = single.step(actions[index])
+                    self.assertTrue(np.allclose(single_observation.to_numpy(dtype=np.float64),
+                                                np.asarray(observation, dtype=np.float64)[index]))
+                    self.assertEqual(single_reward, reward[index])
+                    self.assertEqual(single_done, done[index])
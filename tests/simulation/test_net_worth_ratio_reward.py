@@ -2,6 +2,8 @@
 """
 import unittest
 
+import numpy as np
+
 from stock_trading_backend.simulation.net_worth_ratio_reward import NetWorthRatioReward
 
 class TestNetWorthRatioReward(unittest.TestCase):
@@ -48,3 +50,35 @@ class TestNetWorthRatioReward(unittest.TestCase):
         self.assertEqual(1, reward.calculate_value({"net_worth": 200}, None))
         reward.reset({"net_worth": 100}, None)
         self.assertEqual(1, reward.calculate_value({"net_worth": 200}, None))
+
+    def test_state(self):
+        """Checks if reward state can be saved and restored.
+        """
+        reward = NetWorthRatioReward(bias=0)
+        reward.reset({"net_worth": 100}, None)
+        state = reward.get_state()
+        self.assertEqual(1, reward.calculate_value({"net_worth": 200}, None))
+        reward.set_state(state)
+        self.assertEqual(0, reward.num_days)
+        self.assertEqual(-0.5, reward.calculate_value({"net_worth": 50}, None))
+        self.assertEqual(-0.5, reward.calculate_overall_reward())
+
+    def test_calculate_batch(self):
+        """Checks if calculate batch matches calculate value.
+        """
+        reward = NetWorthRatioReward()
+        net_worth = np.array([[100, 200, 200, 100],
+                              [100, 50, 0, 10],
+                              [100, 110, 121, 133.1]])
+        rewards, overall_rewards = reward.calculate_batch(net_worth)
+        self.assertEqual((3, 3), rewards.shape)
+        for index, episode_net_worth in enumerate(net_worth):
+            reward.reset({"net_worth": episode_net_worth[0]}, None)
+            for day, value in enumerate(episode_net_worth[1:]):
+                self.assertAlmostEqual(reward.calculate_value({"net_worth": value}, None),
+                                       rewards[index, day])
+            self.assertAlmostEqual(reward.calculate_overall_reward(), overall_rewards[index])
+
+        rewards, overall_reward = reward.calculate_batch(net_worth[0])
+        self.assertEqual((3,), rewards.shape)
+        self.assertAlmostEqual(overall_rewards[0], overall_reward)
@@ -0,0 +1,84 @@
+"""Unit tests for the base reward class.
+"""
+import unittest
+
+import numpy as np
+
+from stock_trading_backend.simulation.reward import Reward
+
+
+class StepReturnReward(Reward):
+    """Reward that implements only the online methods, the relative change of the net worth.
+    """
+    name = "step_return_reward"
+    state_attributes = ("first_net_worth", "prev_net_worth")
+
+    def __init__(self):
+        """Initializer for the step return reward.
+        """
+        super(StepReturnReward, self).__init__()
+        self.first_net_worth = 1
+        self.prev_net_worth = 1
+
+    def calculate_value(self, observation, date):
+        """Returns the relative change of the net worth.
+
+        Args:
+            observation: observation from the environemnt.
+            date: datetime current date in the environment
+        """
+        result = observation["net_worth"] / self.prev_net_worth - 1
+        self.prev_net_worth = observation["net_worth"]
+        return result
+
+    def calculate_overall_reward(self):
+        """Returns the relative change of the net worth over the episode.
+        """
+        return self.prev_net_worth / self.first_net_worth - 1
+
+    def reset(self, observation, date):
+        """Resets the internal reward state.
+
+        Args:
+            observation: state of the reset environment.
+            date: datetime current date in the environment
+        """
+        self.first_net_worth = observation["net_worth"]
+        self.prev_net_worth = observation["net_worth"]
+
+
+class TestReward(unittest.TestCase):
+    """Unit tests for the base reward class.
+    """
+    def test_requires_online_methods(self):
+        """Checks if the base class requires the online methods.
+        """
+        with self.assertRaises(TypeError):
+            Reward()
+        reward = StepReturnReward()
+        with self.assertRaises(NotImplementedError):
+            Reward.calculate_value(reward, {"net_worth": 100}, None)
+        with self.assertRaises(NotImplementedError):
+            Reward.calculate_overall_reward(reward)
+
+    def test_calculate_batch(self):
+        """Checks if the default calculate batch matches the online calculation.
+        """
+        reward = StepReturnReward()
+        reward.reset({"net_worth": 50}, None)
+        state = reward.get_state()
+        net_worth = 100 * np.cumprod(1 + np.random.uniform(-0.1, 0.1, (3, 10)), axis=1)
+        rewards, overall_rewards = reward.calculate_batch(net_worth)
+        self.assertEqual((3, 9), rewards.shape)
+        self.assertEqual(state, reward.get_state())
+
+        for episode, episode_net_worth in enumerate(net_worth):
+            reward.reset({"net_worth": episode_net_worth[0]}, None)
+            for day, value in enumerate(episode_net_worth[1:]):
+                self.assertEqual(reward.calculate_value({"net_worth": value}, None),
+                                 rewards[episode, day])
+            self.assertEqual(reward.calculate_overall_reward(), overall_rewards[episode])
+
+        episode_rewards, overall_reward = reward.calculate_batch(net_worth[0])
+        np.testing.assert_array_equal(rewards[0], episode_rewards)
+        self.assertEqual(overall_rewards[0], overall_reward)
@@ -8,8 +8,10 @@ from parameterized import parameterized
 
 from stock_trading_backend.simulation import create_reward
 from stock_trading_backend.simulation.constant_reward import ConstantReward
+from stock_trading_backend.simulation.drawdown_penalty_reward import DrawdownPenaltyReward
 from stock_trading_backend.simulation.net_worth_ratio_reward import NetWorthRatioReward
 from stock_trading_backend.simulation.sharpe_ratio_reward import SharpeRatioReward
+from stock_trading_backend.simulation.sortino_ratio_reward import SortinoRatioReward
 
 class TestRewardFactory(unittest.TestCase):
     """Tests for reward factory.
@@ -18,6 +20,8 @@ class TestRewardFactory(unittest.TestCase):
         ({"name": "constant_reward"}, ConstantReward),
         ({"name": "net_worth_ratio_reward"}, NetWorthRatioReward),
         ({"name": "sharpe_ratio_reward"}, SharpeRatioReward),
+        ({"name": "sortino_ratio_reward"}, SortinoRatioReward),
+        ({"name": "drawdown_penalty_reward"}, DrawdownPenaltyReward),
     ])
     def test_creates_correct_class(self, reward_config, expected_class):
         """Tests if creat_reward creates the correct class.
@@ -4,7 +4,12 @@ from datetime import datetime
 
 import unittest
 
+import numpy as np
+import pandas as pd
+
 from stock_trading_backend.simulation.sharpe_ratio_reward import SharpeRatioReward
+from stock_trading_backend.util.benchmark import BENCHMARKS, BenchmarkSeries
+from stock_trading_backend.util.stock import DATA_PATH
 
 class TestSharpeRatioReward(unittest.TestCase):
     """Unit test for Sharpe Ratio Reward class.
@@ -68,3 +73,99 @@ class TestSharpeRatioReward(unittest.TestCase):
         self.assertEqual(1, reward.calculate_value({"net_worth": 200}, date))
         reward.reset({"net_worth": 100}, date)
         self.assertEqual(1, reward.calculate_value({"net_worth": 200}, date))
+
+    def test_shares_benchmark(self):
+        """Checks if rewards load the benchmark lazily and share it.
+        """
+        from_date = datetime(2016, 1, 1)
+        to_date = datetime(2016, 2, 1)
+        index = pd.date_range(from_date, to_date)
+        data = pd.DataFrame({"SPY": np.linspace(100, 110, len(index))}, index=index)
+        key = ("SPY", from_date, to_date, DATA_PATH)
+        BENCHMARKS[key] = BenchmarkSeries("SPY", data)
+        try:
+            rewards = [SharpeRatioReward(from_date, to_date) for _ in range(3)]
+            self.assertIsNone(rewards[0].benchmark_series)
+            for reward in rewards:
+                reward.reset({"net_worth": 100}, index[0])
+                self.assertIs(BENCHMARKS[key], reward.benchmark)
+            market_return = data["SPY"].iloc[1] / data["SPY"].iloc[0] - 1
+            self.assertAlmostEqual(0.1 - market_return,
+                                   rewards[0].calculate_value({"net_worth": 110}, index[1]))
+        finally:
+            del BENCHMARKS[key]
+
+    def test_calculate_batch(self):
+        """Checks if calculate batch matches calculate value.
+        """
+        from_date = datetime(2016, 1, 1)
+        to_date = datetime(2016, 2, 1)
+        index = pd.date_range(from_date, to_date)
+        data = pd.DataFrame({"SPY": 100 * np.cumprod(1 + np.random.uniform(-0.05, 0.05,
+                                                                           len(index)))},
+                            index=index)
+        reward = SharpeRatioReward(from_date, to_date)
+        reward.benchmark_series = BenchmarkSeries("SPY", data)
+        net_worth = 100 * np.cumprod(1 + np.random.uniform(-0.1, 0.1, (3, 10)), axis=1)
+        rewards, overall_rewards = reward.calculate_batch(net_worth, index[:10])
+        for episode, episode_net_worth in enumerate(net_worth):
+            reward.reset({"net_worth": episode_net_worth[0]}, index[0])
+            for day, value in enumerate(episode_net_worth[1:]):
+                self.assertAlmostEqual(reward.calculate_value({"net_worth": value},
+                                                              index[day + 1]),
+                                       rewards[episode, day])
+            self.assertAlmostEqual(reward.calculate_overall_reward(), overall_rewards[episode])
+
+        batch_rewards, _ = reward.calculate_batch(net_worth, benchmark=data["SPY"][:10])
+        np.testing.assert_allclose(rewards, batch_rewards)
+
+    def test_aligns_benchmark(self):
+        """Checks if rewards with the benchmark aligned to the dates match the unaligned ones.
+        """
+        from_date = datetime(2016, 1, 1)
+        to_date = datetime(2016, 2, 1)
+        index = pd.bdate_range(from_date, to_date)
+        data = pd.DataFrame({"SPY": 100 * np.cumprod(1 + np.random.uniform(-0.05, 0.05,
+                                                                           len(index)))},
+                            index=index)
+        dates = list(pd.date_range(from_date, to_date))
+        net_worth = 100 * np.cumprod(1 + np.random.uniform(-0.1, 0.1, len(dates)))
+        rewards = []
+        for align in [False, True]:
+            reward = SharpeRatioReward(from_date, to_date)
+            reward.benchmark_series = BenchmarkSeries("SPY", data)
+            if align:
+                reward.set_available_dates(dates)
+                np.testing.assert_allclose(reward.aligned_values,
+                                           reward.benchmark.align(dates))
+            reward.reset({"net_worth": net_worth[3]}, dates[3])
+            rewards.append([reward.calculate_value({"net_worth": value}, date)
+                            for value, date in zip(net_worth[4:], dates[4:])])
+            rewards[-1].append(reward.calculate_overall_reward())
+        np.testing.assert_allclose(rewards[0], rewards[1])
+
+    def test_raises_before_benchmark(self):
+        """Checks if online and batch rewards raise for dates the benchmark doesn't cover.
+        """
+        from_date = datetime(2016, 1, 1)
+        to_date = datetime(2016, 2, 1)
+        index = pd.date_range(datetime(2016, 1, 4), to_date)
+        data = pd.DataFrame({"SPY": np.linspace(100, 110, len(index))}, index=index)
+        dates = list(pd.date_range(from_date, to_date))
+        reward = SharpeRatioReward(from_date, to_date)
+        reward.benchmark_series = BenchmarkSeries("SPY", data)
+
+        # Dates before the benchmark can be available, but not used.
+        reward.set_available_dates(dates)
+        with self.assertRaises(LookupError):
+            reward.reset({"net_worth": 100}, dates[0])
+        reward.reset({"net_worth": 100}, dates[3])
+        reward.calculate_value({"net_worth": 110}, dates[4])
+        with self.assertRaises(LookupError):
+            reward.calculate_value({"net_worth": 110}, dates[2])
+
+        with self.assertRaises(LookupError):
+            reward.calculate_batch(np.full(5, 100.0), dates[:5])
+        rewards, _ = reward.calculate_batch(np.full(5, 100.0), dates[3:8])
+        self.assertEqual((4,), rewards.shape)
+
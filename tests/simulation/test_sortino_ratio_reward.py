@@ -0,0 +1,70 @@
+"""Unit tests for Sortino Ratio Reward class.
+"""
+import unittest
+
+import numpy as np
+
+from stock_trading_backend.simulation.sortino_ratio_reward import SortinoRatioReward
+
+class TestSortinoRatioReward(unittest.TestCase):
+    """Unit test for Sortino Ratio Reward class.
+    """
+    def test_initializes(self):
+        """Checks if the reward is initialized properly.
+        """
+        reward = SortinoRatioReward()
+        self.assertIsInstance(reward, SortinoRatioReward)
+        self.assertEqual("sortino_ratio_reward_1_0", reward.id_str)
+
+    def test_calculate_value(self):
+        """Checks if calculate value works properly.
+        """
+        reward = SortinoRatioReward()
+        reward.reset({"net_worth": 100}, None)
+        self.assertEqual(1, reward.calculate_value({"net_worth": 200}, None))
+        # Returns [1, -0.5]: mean 0.25, downside deviation sqrt(0.25 / 2).
+        self.assertAlmostEqual(0.25 / np.sqrt(0.125),
+                               reward.calculate_value({"net_worth": 100}, None))
+        self.assertAlmostEqual(0.25 / np.sqrt(0.125), reward.calculate_overall_reward())
+
+    def test_matches_batch_computation(self):
+        """Checks if the running ratio matches the ratio of all of the returns.
+        """
+        net_worths = 100 * np.cumprod(1 + np.random.RandomState(0).normal(0, 0.02, 200))
+        reward = SortinoRatioReward(scaling_factor=2)
+        reward.reset({"net_worth": 100}, None)
+        for net_worth in net_worths:
+            value = reward.calculate_value({"net_worth": net_worth}, None)
+        returns = np.diff(np.concatenate([[100], net_worths])) / np.concatenate(
+            [[100], net_worths[:-1]])
+        expected = 2 * np.mean(returns) / np.sqrt(np.mean(np.minimum(returns, 0) ** 2))
+        self.assertAlmostEqual(expected, value)
+
+    def test_handles_zero(self):
+        """Checks if calculate value handles zero properly.
+        """
+        reward = SortinoRatioReward()
+        reward.reset({"net_worth": 0}, None)
+        self.assertEqual(-1, reward.calculate_value({"net_worth": 0}, None))
+
+    def test_resets(self):
+        """Checks if resets properly.
+        """
+        reward = SortinoRatioReward()
+        reward.reset({"net_worth": 100}, None)
+        reward.calculate_value({"net_worth": 50}, None)
+        reward.reset({"net_worth": 100}, None)
+        self.assertEqual(1, reward.calculate_value({"net_worth": 200}, None))
+
+    def test_calculate_batch(self):
+        """Checks if calculate batch matches calculate value.
+        """
+        reward = SortinoRatioReward(target_return=0.01)
+        net_worth = 100 * np.cumprod(1 + np.random.uniform(-0.1, 0.1, (4, 10)), axis=1)
+        rewards, overall_rewards = reward.calculate_batch(net_worth)
+        for index, episode_net_worth in enumerate(net_worth):
+            reward.reset({"net_worth": episode_net_worth[0]}, None)
+            for day, value in enumerate(episode_net_worth[1:]):
+                self.assertAlmostEqual(reward.calculate_value({"net_worth": value}, None),
+                                       rewards[index, day])
+            self.assertAlmostEqual(reward.calculate_overall_reward(), overall_rewards[index])
@@ -5,6 +5,7 @@ from datetime import datetime
 import unittest
 
 import gym
+import numpy as np
 
 from stock_trading_backend.simulation import StockMarketSimulation
 from stock_trading_backend.util import read_config_file
@@ -55,6 +56,34 @@ class TestStockMarketSimulation(unittest.TestCase):
         for action in [[1, 1], [0, 1], [1, 2], [0, 2]]:
             self.assertIn(action, possible_actions)
 
+    def test_legal_actions(self):
+        """Test if legal actions and their ids match action space generator.
+        """
+        simulation = StockMarketSimulation(max_stock_owned=2)
+        simulation.reset()
+        simulation.owned_stocks[1] = 3
+        actions = simulation.legal_actions()
+        self.assertEqual(list(simulation.action_space_generator()), actions.tolist())
+        action_ids = simulation.legal_action_ids()
+        self.assertTrue((simulation.action_cache.decode(action_ids) == actions).all())
+
+    def test_step_with_action_id(self):
+        """Test if simulation accepts integer action ids.
+        """
+        from_date = datetime(2016, 1, 1)
+        to_date = datetime(2016, 1, 5)
+        data_collection_config = read_config_file("test/simulation.yaml")
+        simulation = StockMarketSimulation(data_collection_config, from_date, to_date,
+                                           min_start_balance=100, max_start_balance=100,
+                                           max_stock_owned=2)
+        _ = simulation.reset()
+
+        # Buy GOOG: [2, 1] -> 2 + 1 * 3
+        observation, _, _ = simulation.step(5)
+        self.assertEqual(60, observation["balance"])
+        self.assertEqual(1, observation["owned_GOOG"])
+        self.assertEqual(0, observation["owned_AMZN"])
+
     def test_initializes_from_gym(self):
         """Test if simulation can be initialized with gym.make()
         """
@@ -172,3 +201,209 @@ class TestStockMarketSimulation(unittest.TestCase):
         self.assertEqual(0, observation["owned_GOOG"])
         self.assertEqual(1, observation["owned_AMZN"])
         self.assertFalse(done)
+
+    def test_array_observation(self):
+        """Test if array observation matches series observation.
+        """
+        from_date = datetime(2016, 1, 1)
+        to_date = datetime(2016, 1, 5)
+        data_collection_config = read_config_file("test/simulation.yaml")
+        kwargs = dict(min_start_balance=100, max_start_balance=100, max_stock_owned=2)
+        series_simulation = StockMarketSimulation(data_collection_config, from_date, to_date,
+                                                  **kwargs)
+        simulation = StockMarketSimulation(data_collection_config, from_date, to_date,
+                                           observation_mode="array", **kwargs)
+        self.assertEqual(list(series_simulation.reset().index), list(simulation.feature_index))
+        observation = simulation.reset()
+        self.assertIsInstance(observation, np.ndarray)
+        self.assertEqual(simulation.observation_space.shape, observation.shape)
+        self.assertTrue(simulation.observation_space.contains(observation))
+
+        for action in [[2, 1], [1, 2], [0, 1], [1, 0]]:
+            series_observation, series_reward, _ = series_simulation.step(action)
+            observation, reward, _ = simulation.step(action)
+            self.assertTrue(np.allclose(series_observation.to_numpy(dtype=np.float64),
+                                        observation))
+            self.assertEqual(series_reward, reward)
+        self.assertEqual(100, observation[simulation.feature_index["balance"]])
+
+    def test_history_observation(self):
+        """Test if history observation is a view of the last days of the feature matrix.
+        """
+        from_date = datetime(2016, 1, 1)
+        to_date = datetime(2016, 1, 20)
+        data_collection_config = read_config_file("test/simulation.yaml")
+        simulation = StockMarketSimulation(data_collection_config, from_date, to_date,
+                                           min_start_balance=100, max_start_balance=100,
+                                           observation_mode="history", history_length=3)
+        feature_matrix = simulation.data_collection.feature_matrix
+        for _ in range(5):
+            observation = simulation.reset()
+            self.assertTrue(simulation.curr_date_index >= 2)
+            self.assertTrue(simulation.observation_space.contains(observation))
+        history = observation["history"]
+        self.assertTrue(np.shares_memory(history, feature_matrix))
+        self.assertFalse(history.flags["WRITEABLE"])
+        index = simulation.curr_date_index
+        self.assertTrue((feature_matrix[index - 2:index + 1] == history).all())
+        self.assertEqual([0, 0, 100, 100], observation["portfolio"].tolist())
+
+        observation, _, _ = simulation.step([2, 1])
+        index = simulation.curr_date_index
+        self.assertTrue((feature_matrix[index - 2:index + 1] == observation["history"]).all())
+        self.assertEqual([1, 0], observation["portfolio"][:2].tolist())
+
+        with self.assertRaises(ValueError):
+            _ = StockMarketSimulation(data_collection_config, from_date, to_date,
+                                      observation_mode="history", history_length=100)
+        with self.assertRaises(ValueError):
+            _ = StockMarketSimulation(observation_mode="history", history_length=0)
+
+    def test_resample_frequency(self):
+        """Test if resampled simulation steps over weekly bars.
+        """
+        from_date = datetime(2016, 1, 1)
+        to_date = datetime(2016, 3, 1)
+        data_collection_config = read_config_file("test/simulation.yaml")
+        simulation = StockMarketSimulation(data_collection_config, from_date, to_date,
+                                           resample_frequency="weekly")
+        # Bars from the week of the buffer date (2015-12-25) to 2016-03-01.
+        self.assertEqual(11, len(simulation.available_dates))
+        simulation.reset()
+        steps = 0
+        done = False
+        while not done:
+            _, _, done = simulation.step([1, 1])
+            steps += 1
+        self.assertTrue(steps < len(simulation.available_dates))
+        self.assertEqual(simulation.to_date_index, simulation.curr_date_index)
+
+    def test_unsupported_observation_mode(self):
+        """Test if unsupported observation mode raises error.
+        """
+        with self.assertRaises(ValueError):
+            _ = StockMarketSimulation(observation_mode="dict")
+
+    def test_snapshot_and_restore(self):
+        """Test if restored simulation repeats the steps after the snapshot.
+        """
+        from_date = datetime(2016, 1, 1)
+        to_date = datetime(2016, 1, 5)
+        data_collection_config = read_config_file("test/simulation.yaml")
+        for observation_mode in ["series", "array"]:
+            simulation = StockMarketSimulation(data_collection_config, from_date, to_date,
+                                               min_start_balance=100, max_start_balance=100,
+                                               max_stock_owned=2,
+                                               observation_mode=observation_mode)
+            simulation.reset()
+            simulation.step([2, 1])
+            token = simulation.snapshot()
+            expected = [simulation.step(action) for action in [[1, 2], [0, 1]]]
+            expected_overall_reward = simulation.overall_reward
+            expected = [(np.array(observation), reward, done)
+                        for observation, reward, done in expected]
+
+            # Restoring the same token twice, exploring another branch in between.
+            for actions in [[[0, 2]], [[1, 2], [0, 1]]]:
+                simulation.restore(token)
+                self.assertEqual(2, simulation.owned_stocks[0])
+                self.assertEqual(0, simulation.observation[simulation.feature_index["owned_AMZN"]])
+                results = [simulation.step(action) for action in actions]
+            for (observation, reward, done), expected_result in zip(results, expected):
+                self.assertTrue(np.allclose(expected_result[0], observation))
+                self.assertEqual(expected_result[1], reward)
+                self.assertEqual(expected_result[2], done)
+            self.assertEqual(expected_overall_reward, simulation.overall_reward)
+
+    def test_prefetch(self):
+        """Test if the data for the next episode is prepared in background.
+        """
+        from_date = datetime(2016, 1, 1)
+        to_date = datetime(2016, 3, 1)
+        data_collection_config = read_config_file("test/simulation.yaml")
+        simulation = StockMarketSimulation(data_collection_config, from_date, to_date,
+                                           prefetch=True)
+        self.assertIsNone(simulation.prefetch_executor)
+
+        simulation = StockMarketSimulation(data_collection_config, from_date, to_date,
+                                           stock_data_randomization=True, prefetch=True)
+        data_collections = [simulation.data_collection, simulation.prefetch_collection]
+        for index in range(4):
+            observation = simulation.reset()
+            self.assertIs(data_collections[(index + 1) % 2], simulation.data_collection)
+            self.assertEqual(simulation.available_dates, simulation.data_collection.available_dates)
+            row = simulation.data_collection.row(simulation.curr_date_index)
+            self.assertTrue((row == observation[simulation.data_collection.feature_names]).all())
+            simulation.step([1, 1])
+        simulation.close()
+        self.assertIsNone(simulation.prefetch_executor)
+        simulation.close()
+
+    def test_replay(self):
+        """Test if replay matches the step by step simulation.
+        """
+        from_date = datetime(2016, 1, 1)
+        to_date = datetime(2016, 1, 10)
+        data_collection_config = read_config_file("test/simulation.yaml")
+        simulation = StockMarketSimulation(data_collection_config, from_date, to_date,
+                                           min_start_balance=100, max_start_balance=100,
+                                           max_stock_owned=2, commission=0.01)
+        simulation.reset()
+        actions = np.array([[2, 1], [1, 2], [0, 1], [2, 0], [1, 1]])
+        balance_history = [simulation.balance]
+        net_worth_history = [simulation.net_worth]
+        reward_history = []
+        for action in actions:
+            _, reward, _ = simulation.step(action)
+            balance_history.append(simulation.balance)
+            net_worth_history.append(simulation.net_worth)
+            reward_history.append(reward)
+
+        result = simulation.replay(0, 100, actions)
+        self.assertTrue(np.allclose(balance_history, result["balance_history"]))
+        self.assertTrue(np.allclose(net_worth_history, result["net_worth_history"]))
+        self.assertTrue(np.allclose(reward_history, result["reward_history"]))
+        self.assertTrue((simulation.owned_stocks == result["owned_stocks_history"][-1]).all())
+        self.assertAlmostEqual(simulation.overall_reward, result["overall_reward"])
+        self.assertEqual(len(actions), simulation.curr_date_index)
+
+        # Replaying multiple sequences with different commissions.
+        result = simulation.replay(0, 100, np.stack([actions, actions]),
+                                   commission=np.array([0.01, 0]))
+        self.assertEqual((2, len(actions) + 1), result["net_worth_history"].shape)
+        self.assertTrue(np.allclose(net_worth_history, result["net_worth_history"][0]))
+        self.assertTrue((result["net_worth_history"][0] <= result["net_worth_history"][1]).all())
+
+        with self.assertRaises(ValueError):
+            simulation.replay(len(simulation.available_dates) - 2, 100, actions)
+
+    def test_decision_interval(self):
+        """Test if the position is held between decisions and the rewards are summed.
+        """
+        from_date = datetime(2016, 1, 1)
+        to_date = datetime(2016, 1, 10)
+        data_collection_config = read_config_file("test/simulation.yaml")
+        kwargs = dict(min_start_balance=100, max_start_balance=100, max_stock_owned=2)
+        daily_simulation = StockMarketSimulation(data_collection_config, from_date, to_date,
+                                                 **kwargs)
+        simulation = StockMarketSimulation(data_collection_config, from_date, to_date,
+                                           decision_interval=3, **kwargs)
+        daily_simulation.reset()
+        simulation.reset()
+
+        done = False
+        while not done:
+            expected_reward = 0
+            for action in [[2, 0], [1, 1], [1, 1]]:
+                expected_observation, daily_reward, daily_done = daily_simulation.step(action)
+                expected_reward += daily_reward
+                if daily_done:
+                    break
+            observation, reward, done = simulation.step([2, 0])
+            self.assertTrue(expected_observation.equals(observation))
+            self.assertAlmostEqual(expected_reward, reward)
+            self.assertEqual(daily_done, done)
+        self.assertAlmostEqual(daily_simulation.overall_reward, simulation.overall_reward)
+
+        with self.assertRaises(ValueError):
+            _ = StockMarketSimulation(decision_interval=0)
@@ -0,0 +1,102 @@
+"""Unit tests for subprocess vector stock market simulation.
+"""
+from datetime import datetime
+
+import unittest
+
+import gym
+import numpy as np
+
+from stock_trading_backend.simulation import SubprocessVectorStockMarketSimulation
+from stock_trading_backend.simulation import VectorStockMarketSimulation
+from stock_trading_backend.util import read_config_file
+
+
+class TestSubprocessVectorStockMarketSimulation(unittest.TestCase):
+    """Unit tests for subprocess vector stock market simulation.
+    """
+    def test_initializes(self):
+        """Test for subprocess vector simulation initialization.
+        """
+        with SubprocessVectorStockMarketSimulation(num_envs=2) as simulation:
+            self.assertEqual(2, simulation.num_envs)
+            self.assertEqual((2, 2), simulation.owned_stocks.shape)
+            self.assertEqual((2, 2), simulation.action_space.shape)
+            self.assertEqual(2, len(simulation.processes))
+        self.assertTrue(simulation.closed)
+        self.assertFalse(any(process.is_alive() for process in simulation.processes))
+        with self.assertRaises(ValueError):
+            _ = SubprocessVectorStockMarketSimulation(num_envs=0)
+
+    def test_initializes_from_gym(self):
+        """Test if subprocess vector simulation can be initialized with gym.make()
+        """
+        simulation = gym.make("stock-market-subprocess-v0", num_envs=2)
+        self.assertIsInstance(simulation, SubprocessVectorStockMarketSimulation)
+        simulation.close()
+
+    def test_step_matches_vector_simulation(self):
+        """Test if subprocess simulation matches the in-process vector simulation.
+        """
+        kwargs = dict(data_collection_config=read_config_file("test/simulation.yaml"),
+                      from_date=datetime(2016, 1, 1), to_date=datetime(2016, 1, 5),
+                      min_start_balance=100, max_start_balance=100, max_stock_owned=2)
+        vector_simulation = VectorStockMarketSimulation(num_envs=2, **kwargs)
+        with SubprocessVectorStockMarketSimulation(num_envs=2, **kwargs) as simulation:
+            vector_observation = vector_simulation.reset()
+            observation = simulation.reset()
+            self.assertTrue(np.allclose(vector_observation, observation))
+            self.assertFalse(simulation.done.any())
+
+            for action in [[[2, 1], [1, 2]], [[0, 1], [1, 1]], [5, 7], [[1, 1], [1, 1]]]:
+                vector_observation, vector_reward, vector_done = vector_simulation.step(action)
+                observation, reward, done = simulation.step(action)
+                self.assertTrue(np.allclose(vector_observation, observation))
+                self.assertTrue(np.allclose(vector_reward, reward))
+                self.assertTrue((vector_done == done).all())
+                self.assertTrue((vector_simulation.owned_stocks == simulation.owned_stocks).all())
+            self.assertTrue(done.all())
+            self.assertTrue(np.allclose(vector_simulation.overall_reward,
+                                        simulation.overall_reward))
+
+            # Finished episodes are frozen.
+            observation, reward, _ = simulation.step([[0, 0], [0, 0]])
+            self.assertTrue((reward == 0).all())
+            self.assertTrue(np.allclose(vector_observation, observation))
+
+    def test_action_space(self):
+        """Test if subprocess simulation exposes action space of each episode.
+        """
+        with SubprocessVectorStockMarketSimulation(num_envs=2) as simulation:
+            simulation.reset()
+            simulation.owned_stocks[1, 0] = 1
+            self.assertEqual(3, len(list(simulation.action_space_generator(0))))
+            self.assertEqual(2, len(simulation.legal_actions(1)))
+            self.assertEqual(2, len(simulation.legal_action_ids(1)))
+            episode = simulation.episode(1)
+            self.assertTrue((episode.owned_stocks == [1, 0]).all())
+            self.assertEqual(2, len(list(episode.action_space_generator())))
+
+    def test_array_observation(self):
+        """Test for subprocess simulation with array observations.
+        """
+        kwargs = dict(data_collection_config=read_config_file("test/simulation.yaml"),
+                      from_date=datetime(2016, 1, 1), to_date=datetime(2016, 1, 5),
+                      observation_mode="array")
+        with SubprocessVectorStockMarketSimulation(num_envs=2, **kwargs) as simulation:
+            observation = simulation.reset()
+            self.assertEqual(simulation.observation_space.shape, observation.shape)
+            observation, _, _ = simulation.step([[2, 1], [1, 2]])
+            self.assertEqual(simulation.observation_space.shape, observation.shape)
+
+    def test_history_observation(self):
+        """Test for subprocess simulation with history observations.
+        """
+        kwargs = dict(data_collection_config=read_config_file("test/simulation.yaml"),
+                      from_date=datetime(2016, 1, 1), to_date=datetime(2016, 1, 10),
+                      observation_mode="history", history_length=2)
+        with SubprocessVectorStockMarketSimulation(num_envs=2, **kwargs) as simulation:
+            observation = simulation.reset()
+            self.assertTrue(simulation.observation_space.contains(observation))
+            observation, _, _ = simulation.step([[2, 1], [1, 2]])
+            self.assertTrue(simulation.observation_space.contains(observation))
@@ -0,0 +1,115 @@
+"""Unit tests for trade execution.
+"""
+import math
+import unittest
+
+import numpy as np
+
+from stock_trading_backend.simulation.trade_execution import execute_trades
+
+
+# pylint: disable=too-many-arguments
+def execute_trades_loop(balance, owned_stocks, stock_prices, action, commission, max_stock_owned):
+    """Reference implementation of the per-stock trade execution loop.
+    """
+    owned_stocks = list(owned_stocks)
+    num_owned_stocks = np.count_nonzero(owned_stocks)
+    if num_owned_stocks < max_stock_owned:
+        max_purchase_price = balance / (max_stock_owned - num_owned_stocks)
+        max_purchase_price /= 1 + commission
+    else:
+        max_purchase_price = 0
+
+    sale_return = 0
+    purchase_price = 0
+    for index, sub_action in enumerate(action):
+        if sub_action == 0 and owned_stocks[index] > 0:
+            sale_return += owned_stocks[index] * stock_prices[index]
+            owned_stocks[index] = 0
+        elif (sub_action == 2 and num_owned_stocks < max_stock_owned and
+              owned_stocks[index] == 0):
+            num_stock_purchased = math.floor(max_purchase_price / stock_prices[index])
+            if num_stock_purchased > 0:
+                num_owned_stocks += 1
+                purchase_price += num_stock_purchased * stock_prices[index]
+                owned_stocks[index] = num_stock_purchased
+    sale_return *= 1 - commission
+    purchase_price *= 1 + commission
+    balance += sale_return - purchase_price
+    net_worth = balance + sum(np.array(owned_stocks) * stock_prices)
+    return balance, owned_stocks, net_worth
+
+
+class TestTradeExecution(unittest.TestCase):
+    """Unit tests for trade execution.
+    """
+    def test_buy_and_sell(self):
+        """Checks if simple buy and sell actions are executed.
+        """
+        balance, owned_stocks, net_worth = execute_trades(100, [0, 0], [40, 60], [2, 1], 0, 2)
+        self.assertEqual(60, balance)
+        self.assertEqual([1, 0], owned_stocks.tolist())
+        self.assertEqual(100, net_worth)
+
+        balance, owned_stocks, net_worth = execute_trades(60, [1, 0], [50, 60], [0, 1], 0.1, 2)
+        self.assertAlmostEqual(105, balance)
+        self.assertEqual([0, 0], owned_stocks.tolist())
+        self.assertAlmostEqual(105, net_worth)
+
+    def test_buys_are_filled_in_stock_order(self):
+        """Checks if buys stop when max stock owned is reached.
+        """
+        _, owned_stocks, _ = execute_trades(100, [0, 0, 0], [10, 10, 10], [2, 2, 2], 0, 2)
+        self.assertEqual([5, 5, 0], owned_stocks.tolist())
+
+        # Too expensive stocks don't take the slot.
+        _, owned_stocks, _ = execute_trades(10, [0, 0], [20, 10], [2, 2], 0, 1)
+        self.assertEqual([0, 1], owned_stocks.tolist())
+
+        # Stocks with non-positive prices are not bought.
+        _, owned_stocks, _ = execute_trades(10, [0, 0], [0, 10], [2, 2], 0, 1)
+        self.assertEqual([0, 1], owned_stocks.tolist())
+
+    def test_matches_loop(self):
+        """Property test: vectorized execution matches the per-stock loop on random inputs.
+        """
+        random_state = np.random.RandomState(0)
+        for _ in range(500):
+            num_stocks = random_state.randint(1, 9)
+            max_stock_owned = random_state.randint(1, num_stocks + 1)
+            owned_stocks = random_state.randint(0, 4, num_stocks)
+            owned_stocks[random_state.rand(num_stocks) < 0.5] = 0
+            stock_prices = random_state.uniform(1, 300, num_stocks)
+            action = random_state.randint(0, 3, num_stocks)
+            balance = random_state.uniform(0, 2000)
+            commission = random_state.choice([0, 0.001, 0.05])
+
+            expected = execute_trades_loop(balance, owned_stocks, stock_prices, action,
+                                           commission, max_stock_owned)
+            result = execute_trades(balance, owned_stocks, stock_prices, action, commission,
+                                    max_stock_owned)
+            self.assertTrue(np.isclose(expected[0], result[0]))
+            self.assertEqual(list(expected[1]), result[1].tolist())
+            self.assertTrue(np.isclose(expected[2], result[2]))
+
+    def test_batched(self):
+        """Checks if batched execution matches execution of every row.
+        """
+        random_state = np.random.RandomState(1)
+        num_envs, num_stocks = 16, 5
+        balance = random_state.uniform(0, 2000, num_envs)
+        owned_stocks = random_state.randint(0, 3, (num_envs, num_stocks))
+        stock_prices = random_state.uniform(1, 300, (num_envs, num_stocks))
+        actions = random_state.randint(0, 3, (num_envs, num_stocks))
+        commission = random_state.uniform(0, 0.05, num_envs)
+        max_stock_owned = random_state.randint(1, num_stocks + 1, num_envs)
+
+        result = execute_trades(balance, owned_stocks, stock_prices, actions, commission,
+                                max_stock_owned)
+        for index in range(num_envs):
+            expected = execute_trades_loop(balance[index], owned_stocks[index],
+                                           stock_prices[index], actions[index],
+                                           commission[index], max_stock_owned[index])
+            self.assertTrue(np.isclose(expected[0], result[0][index]))
+            self.assertEqual(list(expected[1]), result[1][index].tolist())
+            self.assertTrue(np.isclose(expected[2], result[2][index]))
@@ -0,0 +1,93 @@
+"""Unit tests for trading session.
+"""
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import unittest
+
+import numpy as np
+
+from stock_trading_backend.simulation import MarketData, StockMarketSimulation, TradingSession
+from stock_trading_backend.util import read_config_file
+
+
+class TestTradingSession(unittest.TestCase):
+    """Unit tests for trading session.
+    """
+    def setUp(self):
+        """Set up for the tests, prepares the shared market data.
+        """
+        data_collection_config = read_config_file("test/simulation.yaml")
+        self.market_data = MarketData(data_collection_config, datetime(2016, 1, 1),
+                                      datetime(2016, 1, 10))
+
+    def test_initializes(self):
+        """Test for trading session initialization.
+        """
+        session = TradingSession(self.market_data, max_stock_owned=2)
+        self.assertIs(self.market_data, session.market_data)
+        self.assertEqual(-1, session.curr_date_index)
+        self.assertEqual("net_worth_ratio_reward", session.reward_config["name"])
+        with self.assertRaises(ValueError):
+            _ = TradingSession(self.market_data, observation_mode="dict")
+        with self.assertRaises(ValueError):
+            _ = TradingSession(self.market_data, decision_interval=0)
+
+    def test_start_and_step(self):
+        """Test if session starts an episode and trades as the simulation.
+        """
+        session = TradingSession(self.market_data, max_stock_owned=2)
+        observation = session.start(2, 3, 100)
+        self.assertEqual(100, observation["balance"])
+        self.assertEqual(4, session.to_date_index)
+        self.assertEqual(4, len(session.legal_actions()))
+
+        observation, _, done = session.step([2, 1])
+        self.assertEqual(1, observation["owned_GOOG"])
+        self.assertEqual(60, observation["balance"])
+        self.assertFalse(done)
+        _, _, done = session.step([0, 2])
+        self.assertEqual(40, session.balance)
+        self.assertEqual([0, 6], session.owned_stocks.tolist())
+        self.assertEqual(100, session.net_worth)
+        self.assertTrue(done)
+
+    def test_without_online_rewards(self):
+        """Test if session skips the rewards on steps when online rewards are off.
+        """
+        session = TradingSession(self.market_data, max_stock_owned=2)
+        session.online_rewards = False
+        session.start(2, 3, 100)
+        reward_state = session.reward_function.get_state()
+        observation, reward, _ = session.step([2, 1])
+        self.assertEqual(0, reward)
+        self.assertEqual(60, observation["balance"])
+        self.assertEqual(reward_state, session.reward_function.get_state())
+
+    def test_shared_market_data(self):
+        """Test if sessions over shared market data run independently.
+        """
+        sessions = [TradingSession(self.market_data, max_stock_owned=2) for _ in range(8)]
+
+        def run(index):
+            session = sessions[index]
+            session.start(index % 3, 5, 100 * (index + 1))
+            for _ in range(4):
+                session.step([2, 2] if index % 2 else [1, 1])
+            return session.overall_reward
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            rewards = list(executor.map(run, range(8)))
+        self.assertTrue(all(session.done for session in sessions))
+        self.assertEqual([0, 0], sessions[0].owned_stocks.tolist())
+        self.assertEqual([5, 10], sessions[1].owned_stocks.tolist())
+        self.assertEqual(200, sessions[1].net_worth)
+        self.assertEqual(300, sessions[2].balance)
+        self.assertTrue(np.allclose(-0.05, rewards))
+
+        # Simulations can share the market data too.
+        simulation = StockMarketSimulation(market_data=self.market_data)
+        self.assertIs(self.market_data.data_collection, simulation.data_collection)
+        simulation.reset()
+        self.assertIsNot(sessions[0], simulation.session)
+        simulation.close()
@@ -0,0 +1,207 @@
+"""Unit tests for vector stock market simulation.
+"""
+from datetime import datetime
+import threading
+
+import unittest
+
+import gym
+import numpy as np
+
+from stock_trading_backend.simulation import StockMarketSimulation, VectorStockMarketSimulation
+from stock_trading_backend.util import read_config_file
+
+
+class TestVectorStockMarketSimulation(unittest.TestCase):
+    """Unit tests for vector stock market simulation.
+    """
+    def test_initializes(self):
+        """Test for vector simulation initialization.
+        """
+        simulation = VectorStockMarketSimulation(num_envs=3)
+        self.assertEqual(3, simulation.num_envs)
+        self.assertEqual((3, 2), simulation.owned_stocks.shape)
+        self.assertEqual((3, 2), simulation.action_space.shape)
+        self.assertEqual(3, len(simulation.reward_functions))
+        with self.assertRaises(ValueError):
+            _ = VectorStockMarketSimulation(num_envs=0)
+
+    def test_checks_arguments_before_preparing(self):
+        """Test if invalid arguments are rejected before the data is prepared and prefetched.
+        """
+        num_threads = threading.active_count()
+        with self.assertRaises(ValueError):
+            _ = VectorStockMarketSimulation(num_envs=0, stock_data_randomization=True,
+                                            prefetch=True)
+        with self.assertRaises(ValueError):
+            _ = VectorStockMarketSimulation(observation_mode="history",
+                                            stock_data_randomization=True, prefetch=True)
+        self.assertEqual(num_threads, threading.active_count())
+
+    def test_initializes_from_gym(self):
+        """Test if vector simulation can be initialized with gym.make()
+        """
+        simulation = gym.make("stock-market-vector-v0", num_envs=2)
+        self.assertIsInstance(simulation, VectorStockMarketSimulation)
+        self.assertEqual(2, simulation.num_envs)
+
+    def test_resets(self):
+        """Test for vector simulation reset.
+        """
+        from_date = datetime(2016, 1, 1)
+        to_date = datetime(2016, 3, 1)
+        data_collection_config = read_config_file("test/simulation.yaml")
+        simulation = VectorStockMarketSimulation(data_collection_config, from_date, to_date,
+                                                 min_duration=5, max_duration=10,
+                                                 min_start_balance=100, max_start_balance=200,
+                                                 num_envs=4)
+        observation = simulation.reset()
+        self.assertEqual(4, len(observation))
+        self.assertFalse(simulation.done.any())
+        self.assertTrue((simulation.curr_date_index == simulation.from_date_index).all())
+        durations = simulation.to_date_index - simulation.from_date_index + 1
+        self.assertTrue(((5 <= durations) & (durations <= 10)).all())
+        self.assertTrue(((100 <= simulation.balance) & (simulation.balance <= 200)).all())
+        self.assertTrue((observation["balance"].to_numpy() == simulation.balance).all())
+
+    def test_step_matches_single_simulation(self):
+        """Test if every episode of the vector simulation matches the single simulation.
+        """
+        from_date = datetime(2016, 1, 1)
+        to_date = datetime(2016, 1, 5)
+        data_collection_config = read_config_file("test/simulation.yaml")
+        single = StockMarketSimulation(data_collection_config, from_date, to_date,
+                                       min_start_balance=100, max_start_balance=100,
+                                       max_stock_owned=2)
+        simulation = VectorStockMarketSimulation(data_collection_config, from_date, to_date,
+                                                 min_start_balance=100, max_start_balance=100,
+                                                 max_stock_owned=2, num_envs=2)
+        single.reset()
+        simulation.reset()
+
+        for action in [[2, 1], [1, 2], [0, 1], [1, 0]]:
+            single_observation, single_reward, single_done = single.step(action)
+            observation, reward, done = simulation.step([action, action])
+            for index in range(2):
+                self.assertTrue(single_observation.equals(observation.iloc[index]
+                                                          .rename(None)))
+                self.assertEqual(single_reward, reward[index])
+                self.assertEqual(single_done, done[index])
+
+    def test_finished_episodes_are_frozen(self):
+        """Test if actions for finished episodes are ignored.
+        """
+        from_date = datetime(2016, 1, 1)
+        to_date = datetime(2016, 1, 5)
+        data_collection_config = read_config_file("test/simulation.yaml")
+        simulation = VectorStockMarketSimulation(data_collection_config, from_date, to_date,
+                                                 min_start_balance=100, max_start_balance=100,
+                                                 num_envs=2)
+        simulation.reset()
+        simulation.to_date_index[0] = simulation.from_date_index[0] + 1
+        _, _, done = simulation.step([[2, 1], [2, 1]])
+        self.assertTrue((done == [True, False]).all())
+        observation, reward, done = simulation.step([[0, 1], [0, 1]])
+        self.assertEqual(0, reward[0])
+        self.assertEqual(1, observation["owned_GOOG"][0])
+        self.assertEqual(0, observation["owned_GOOG"][1])
+        self.assertEqual(2, len(simulation.overall_reward))
+
+    def test_step_with_action_ids(self):
+        """Test if vector simulation accepts integer action ids.
+        """
+        from_date = datetime(2016, 1, 1)
+        to_date = datetime(2016, 1, 5)
+        data_collection_config = read_config_file("test/simulation.yaml")
+        simulation = VectorStockMarketSimulation(data_collection_config, from_date, to_date,
+                                                 min_start_balance=100, max_start_balance=100,
+                                                 num_envs=2)
+        simulation.reset()
+        observation, _, _ = simulation.step([5, 7])
+        self.assertEqual([1, 0], observation["owned_GOOG"].tolist())
+        self.assertEqual([0, 1], observation["owned_AMZN"].tolist())
+        self.assertEqual(2, len(simulation.legal_action_ids(0)))
+        self.assertEqual(2, len(simulation.episode(1).legal_actions()))
+        self.assertEqual(2, len(simulation.episode(1).legal_action_ids()))
+
+    def test_episode_view(self):
+        """Test if episode view exposes the action space of a single episode.
+        """
+        simulation = VectorStockMarketSimulation(num_envs=2)
+        simulation.reset()
+        simulation.owned_stocks[1, 0] = 1
+        episode = simulation.episode(1)
+        self.assertEqual(1, episode.max_stock_owned)
+        self.assertTrue((episode.owned_stocks == [1, 0]).all())
+        self.assertEqual(2, len(episode.action_space.sample()))
+        possible_actions = list(episode.action_space_generator())
+        self.assertEqual(2, len(possible_actions))
+        for action in [[0, 1], [1, 1]]:
+            self.assertIn(action, possible_actions)
+        self.assertEqual(3, len(list(simulation.action_space_generator(0))))
+        self.assertIsInstance(simulation.observation, type(simulation.reset()))
+
+    def test_array_observation(self):
+        """Test if array observation matches series observation.
+        """
+        from_date = datetime(2016, 1, 1)
+        to_date = datetime(2016, 1, 5)
+        data_collection_config = read_config_file("test/simulation.yaml")
+        kwargs = dict(min_start_balance=100, max_start_balance=100, num_envs=2)
+        series_simulation = VectorStockMarketSimulation(data_collection_config, from_date,
+                                                        to_date, **kwargs)
+        simulation = VectorStockMarketSimulation(data_collection_config, from_date, to_date,
+                                                 observation_mode="array", **kwargs)
+        series_simulation.reset()
+        observation = simulation.reset()
+        self.assertEqual(simulation.observation_space.shape, observation.shape)
+        self.assertEqual((observation.shape[1],), simulation.single_observation_space.shape)
+
+        for action in [[[2, 1], [1, 2]], [[0, 1], [1, 1]]]:
+            series_observation, series_reward, _ = series_simulation.step(action)
+            observation, reward, _ = simulation.step(action)
+            self.assertTrue(np.allclose(series_observation.to_numpy(dtype=np.float64),
+                                        observation))
+            self.assertTrue((series_reward == reward).all())
+
+    def test_snapshot_and_restore(self):
+        """Test if restored vector simulation repeats the steps after the snapshot.
+        """
+        from_date = datetime(2016, 1, 1)
+        to_date = datetime(2016, 1, 5)
+        data_collection_config = read_config_file("test/simulation.yaml")
+        simulation = VectorStockMarketSimulation(data_collection_config, from_date, to_date,
+                                                 min_start_balance=100, max_start_balance=100,
+                                                 num_envs=2)
+        simulation.reset()
+        token = simulation.snapshot()
+        observation, reward, _ = simulation.step([[2, 1], [1, 2]])
+        expected_observation = observation.copy()
+        expected_overall_reward = simulation.overall_reward
+
+        simulation.step([[0, 0], [0, 0]])
+        simulation.restore(token)
+        self.assertTrue((simulation.owned_stocks == 0).all())
+        observation, restored_reward, _ = simulation.step([[2, 1], [1, 2]])
+        self.assertTrue(expected_observation.equals(observation))
+        self.assertTrue((reward == restored_reward).all())
+        self.assertTrue((expected_overall_reward == simulation.overall_reward).all())
+
+    def test_decision_interval(self):
+        """Test if vector simulation holds the positions between decisions.
+        """
+        from_date = datetime(2016, 1, 1)
+        to_date = datetime(2016, 1, 10)
+        data_collection_config = read_config_file("test/simulation.yaml")
+        kwargs = dict(min_start_balance=100, max_start_balance=100, num_envs=2)
+        daily_simulation = VectorStockMarketSimulation(data_collection_config, from_date,
+                                                       to_date, **kwargs)
+        simulation = VectorStockMarketSimulation(data_collection_config, from_date, to_date,
+                                                 decision_interval=2, **kwargs)
+        daily_simulation.reset()
+        simulation.reset()
+        _, first_reward, _ = daily_simulation.step([[2, 1], [1, 2]])
+        expected_observation, second_reward, _ = daily_simulation.step([[1, 1], [1, 1]])
+        observation, reward, _ = simulation.step([[2, 1], [1, 2]])
+        self.assertTrue(expected_observation.equals(observation))
+        self.assertTrue(np.allclose(first_reward + second_reward, reward))
@@ -41,10 +41,12 @@ class TestAPI(unittest.TestCase):
         """Checks if get_available_rewards works properly
         """
         available_rewards = api.get_available_rewards()
-        self.assertEqual(3, len(available_rewards))
+        self.assertEqual(5, len(available_rewards))
         self.assertIn("constant", available_rewards)
         self.assertIn("sharpe_ratio", available_rewards)
         self.assertIn("net_worth_ratio", available_rewards)
+        self.assertIn("sortino_ratio", available_rewards)
+        self.assertIn("drawdown_penalty", available_rewards)
 
     def test_get_reward_config(self):
         """Checks if get_reward_config works properly.
@@ -1,10 +1,12 @@
 """Unit tests for training.
 """
 import unittest
+from unittest import mock
 
 from parameterized import parameterized
 
 from stock_trading_backend import api
+from stock_trading_backend.simulation import StockMarketSimulation
 from stock_trading_backend.train import train_agent
 
 
@@ -29,6 +31,44 @@ class TestTraining(unittest.TestCase):
         self.assertTrue(loss_history[0] > loss_history[-1])
         self.assertTrue(agent.usable)
 
+    def test_training_with_vector_simulation(self):
+        """Checks if training works with multiple episodes simulated at once.
+        """
+        agent = api.get_agent_object("sarsa_learning_agent_0", "generated_1", "net_worth_ratio",
+                                     "linear")
+        reward_history, loss_history = train_agent(agent, episode_batch_size=2, num_episodes=5,
+                                                   min_duration=10, max_duration=20, num_envs=3)
+        self.assertEqual(5, len(reward_history))
+        self.assertTrue(loss_history[0] > loss_history[-1])
+        self.assertTrue(agent.usable)
+
+    def test_training_with_parallel_simulation(self):
+        """Checks if training works with episodes simulated in worker processes.
+        """
+        agent = api.get_agent_object("sarsa_learning_agent_0", "generated_1", "net_worth_ratio",
+                                     "linear")
+        reward_history, _ = train_agent(agent, episode_batch_size=2, num_episodes=4,
+                                        min_duration=10, max_duration=20, num_envs=2,
+                                        parallel=True)
+        self.assertEqual(4, len(reward_history))
+        self.assertTrue(agent.usable)
+
+    def test_closes_simulation_on_error(self):
+        """Checks if the simulation is closed when training fails.
+        """
+        agent = api.get_agent_object("sarsa_learning_agent_0", "generated_1", "net_worth_ratio",
+                                     "linear")
+
+        def failing_apply_learning(*args, **kwargs):
+            raise RuntimeError("Training failed.")
+
+        agent.apply_learning = failing_apply_learning
+        with mock.patch.object(StockMarketSimulation, "close", autospec=True) as close:
+            with self.assertRaises(RuntimeError):
+                train_agent(agent, episode_batch_size=2, num_episodes=2, min_duration=10,
+                            max_duration=20)
+        close.assert_called_once()
+
     def test_non_trainable_agent(self):
         """Test if providing non-trainable agent raises error.
         """
@@ -0,0 +1,71 @@
+"""Unit tests for benchmark series.
+"""
+import shutil
+import unittest
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from stock_trading_backend.util import BenchmarkSeries, get_benchmark
+from stock_trading_backend.util import write_csv_file, write_manifest_file
+from stock_trading_backend.util import STOCK_MANIFEST_FILE_NAME
+
+
+class TestBenchmark(unittest.TestCase):
+    """Unit tests for benchmark series.
+    """
+    def setUp(self):
+        """Set up for the tests, benchmark prices on the business days of January 2016.
+        """
+        index = pd.bdate_range(datetime(2016, 1, 1), datetime(2016, 1, 31), name="Date")
+        self.data = pd.DataFrame({"BENCH": 100 + np.arange(len(index), dtype=np.float64)},
+                                 index=index)
+
+    def test_series(self):
+        """Checks if values and returns are served from arrays.
+        """
+        benchmark = BenchmarkSeries("BENCH", self.data)
+        self.assertEqual(len(self.data), len(benchmark))
+        self.assertEqual(0, benchmark.returns[0])
+        self.assertAlmostEqual(101 / 100 - 1, benchmark.returns[1])
+        self.assertFalse(benchmark.values.flags["WRITEABLE"])
+        self.assertEqual(100, benchmark.value(datetime(2016, 1, 1)))
+        self.assertEqual(101, benchmark.value(datetime(2016, 1, 4)))
+        # Weekend uses the price of Friday.
+        self.assertEqual(100, benchmark.value(datetime(2016, 1, 3)))
+        with self.assertRaises(LookupError):
+            benchmark.value(datetime(2015, 12, 31))
+
+    def test_align(self):
+        """Checks if the prices are aligned to the dates.
+        """
+        benchmark = BenchmarkSeries("BENCH", self.data)
+        dates = pd.date_range(datetime(2016, 1, 1), datetime(2016, 1, 10)).tolist()
+        expected = [benchmark.value(date) for date in dates]
+        self.assertEqual(expected, benchmark.align(dates).tolist())
+        with self.assertRaises(LookupError):
+            benchmark.align([datetime(2015, 12, 31)])
+        aligned = benchmark.align([datetime(2015, 12, 31), datetime(2016, 1, 1)],
+                                  allow_before_start=True)
+        self.assertTrue(np.isnan(aligned[0]))
+        self.assertEqual(benchmark.value(datetime(2016, 1, 1)), aligned[1])
+
+    def test_get_benchmark(self):
+        """Checks if the benchmark is loaded once and shared.
+        """
+        from_date = datetime(2016, 1, 1)
+        to_date = datetime(2016, 1, 31)
+        path = "data/test/benchmark"
+        write_csv_file(self.data, "{}/BENCH.csv".format(path))
+        write_manifest_file({"BENCH": {"from_date": from_date, "to_date": to_date}},
+                            "{}/{}".format(path, STOCK_MANIFEST_FILE_NAME))
+        try:
+            benchmark = get_benchmark("BENCH", from_date, to_date, path)
+            self.assertEqual(self.data["BENCH"].tolist(), benchmark.values.tolist())
+            self.assertIs(benchmark, get_benchmark("BENCH", from_date, to_date, path))
+            self.assertIsNot(benchmark, get_benchmark("BENCH", from_date, datetime(2016, 1, 15),
+                                                      path))
+        finally:
+            shutil.rmtree(path)
@@ -0,0 +1,62 @@
+"""Unit tests for the expression compiler.
+"""
+import math
+import unittest
+
+import numpy as np
+from parameterized import parameterized
+
+from stock_trading_backend.util import compile_expression
+
+
+class TestCompileExpression(unittest.TestCase):
+    """Unit tests for the expression compiler.
+    """
+    @parameterized.expand([
+        ("100",),
+        ("200 + 100 * math.sin(math.pi * 2 * diff / 300)",),
+        ("200 + 100 * math.cos(math.pi * 2 * diff / 40)",),
+        ("abs(diff - 5) ** 0.5 % 3",),
+        ("max(diff, 3) // 2 - -diff",),
+        ("math.exp(diff / 100) + math.sqrt(diff) * math.e",),
+        ("math.log(diff + 1, 10)",),
+        ("math.log(diff + 1)",),
+        ("min(diff, 10, 20 - diff)",),
+        ("max(diff, 3, 15 - diff, 7)",),
+        ("math.atan2(diff, 3) + math.pow(diff, 0.5)",),
+    ])
+    def test_matches_math(self, expression):
+        """Checks if the compiled function gives the same values as evaluating with math.
+        """
+        diff = np.arange(20)
+        function = compile_expression(expression)
+        # pylint: disable=eval-used
+        expected = [eval(expression, {"math": math}, {"diff": int(value)}) for value in diff]
+        np.testing.assert_allclose(expected, np.broadcast_to(function(diff), diff.shape))
+
+    @parameterized.expand([
+        ("__import__('os')",),
+        ("diff.__class__",),
+        ("open('file')",),
+        ("'text'",),
+        ("[diff]",),
+        ("math.sin(x=diff)",),
+        ("(lambda: 1)()",),
+        ("unknown * 2",),
+        ("diff +",),
+        ("math.sin(diff, 2)",),
+        ("math.log(diff, 2, 3)",),
+        ("min(diff)",),
+        ("abs(diff, 1)",),
+        ("math.sin(*diff)",),
+    ])
+    def test_rejects_expression(self, expression):
+        """Checks if expressions with anything but arithmetic are rejected.
+        """
+        with self.assertRaises(ValueError):
+            compile_expression(expression)
+
+    def test_caches_functions(self):
+        """Checks if compiled functions are cached by the expression.
+        """
+        self.assertIs(compile_expression("diff * 2"), compile_expression("diff * 2"))
@@ -0,0 +1,63 @@
+"""Unit tests for the rolling window engine.
+"""
+import unittest
+
+import numpy as np
+import pandas as pd
+from parameterized import parameterized
+
+from stock_trading_backend.util import RollingWindowEngine
+
+
+class TestRollingWindowEngine(unittest.TestCase):
+    """Unit tests for the rolling window engine.
+    """
+    def setUp(self):
+        """Sets up random walk prices with a missing value.
+        """
+        values = 100 + np.random.normal(size=(200, 3)).cumsum(axis=0)
+        values[50, 1] = np.nan
+        self.data_frame = pd.DataFrame(values)
+        self.engine = RollingWindowEngine(values)
+
+    @parameterized.expand([
+        ("sum",),
+        ("mean",),
+        ("variance",),
+    ])
+    def test_matches_pandas(self, statistic):
+        """Checks if the statistics match pandas rolling for all rows and single rows.
+
+        Args:
+            statistic: the name of the statistic.
+        """
+        for window in [1, 2, 10, 200, 201]:
+            rolling = self.data_frame.rolling(window)
+            expected = getattr(rolling, "var" if statistic == "variance" else statistic)()
+            expected = expected.to_numpy()
+            result = getattr(self.engine, statistic)(window)
+            self.assertTrue(np.allclose(expected, result, equal_nan=True), window)
+            for index in [0, 49, 50, 120, 199]:
+                result = getattr(self.engine, statistic)(window, index)
+                self.assertTrue(np.allclose(expected[index], result, equal_nan=True),
+                                (window, index))
+
+    def test_means(self):
+        """Checks if means for multiple windows match the means for single windows.
+        """
+        means = self.engine.means([3, 5, 8])
+        self.assertEqual((3, 200, 3), means.shape)
+        self.assertTrue(np.allclose(self.engine.mean(5), means[1], equal_nan=True))
+
+    def test_one_dimensional_values(self):
+        """Checks if a single series of values is handled as a single column.
+        """
+        engine = RollingWindowEngine(np.arange(10))
+        self.assertEqual((10, 1), engine.mean(3).shape)
+        self.assertEqual(8, engine.mean(3, 9)[0])
+
+    def test_rejects_window(self):
+        """Checks if non-positive windows are rejected.
+        """
+        with self.assertRaises(ValueError):
+            self.engine.mean(0)
@@ -0,0 +1,65 @@
+"""Unit tests for streaming statistics.
+"""
+import copy
+import unittest
+
+import numpy as np
+
+from stock_trading_backend.util import DownsideDeviation, MaxDrawdown, RunningMoments
+
+
+class TestStatistics(unittest.TestCase):
+    """Unit tests for streaming statistics.
+    """
+    def test_running_moments(self):
+        """Checks if running moments match numpy on random values.
+        """
+        values = np.random.RandomState(0).normal(0.001, 0.02, 1000)
+        moments = RunningMoments()
+        self.assertEqual(0, moments.std)
+        for index, value in enumerate(values):
+            moments.update(value)
+            if index % 100 == 0:
+                self.assertAlmostEqual(np.mean(values[:index + 1]), moments.mean)
+                self.assertAlmostEqual(np.std(values[:index + 1]), moments.std)
+        self.assertEqual(1000, moments.count)
+        self.assertAlmostEqual(np.var(values), moments.variance)
+
+        # Copies are independent.
+        moments_copy = copy.copy(moments)
+        moments_copy.update(100)
+        self.assertEqual(1000, moments.count)
+        self.assertAlmostEqual(np.mean(values), moments.mean)
+
+    def test_downside_deviation(self):
+        """Checks if downside deviation only counts shortfalls below the target.
+        """
+        values = np.random.RandomState(1).normal(0, 0.02, 500)
+        downside_deviation = DownsideDeviation()
+        self.assertEqual(0, downside_deviation.value)
+        for value in values:
+            downside_deviation.update(value)
+        expected = np.sqrt(np.mean(np.minimum(values, 0) ** 2))
+        self.assertAlmostEqual(expected, downside_deviation.value)
+
+        downside_deviation = DownsideDeviation(target=0.01)
+        for value in [0.02, 0.01, -0.01]:
+            downside_deviation.update(value)
+        self.assertAlmostEqual(np.sqrt(0.0004 / 3), downside_deviation.value)
+
+    def test_max_drawdown(self):
+        """Checks if max drawdown tracks the largest drop from a peak.
+        """
+        drawdown = MaxDrawdown()
+        for value in [100, 120, 90, 110, 130, 117]:
+            drawdown.update(value)
+        self.assertEqual(130, drawdown.peak)
+        self.assertAlmostEqual(0.1, drawdown.drawdown)
+        self.assertAlmostEqual(0.25, drawdown.max_drawdown)
+
+        values = np.random.RandomState(2).uniform(50, 150, 300)
+        drawdown = MaxDrawdown()
+        for value in values:
+            drawdown.update(value)
+        expected = np.max(1 - values / np.maximum.accumulate(values))
+        self.assertAlmostEqual(expected, drawdown.max_drawdown)